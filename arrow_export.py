@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Optionaler Spaltenexport: Blatt-Grids und Charakterdaten als Arrow- und Parquet-Dateien"""
+import os
+import sys
+
+from ods_core import SheetGrid, iter_rows, is_workbook_file
+from layout_detect import detect_characters, load_cache, save_cache
+from dice_codes import d6_to_blips
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+# Zellen pro Record-Batch; begrenzt den Speicherbedarf beim Streamen
+BATCH_CELLS = 64 * 1024
+NUMERIC_TYPES = {'float', 'percentage', 'currency'}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Bitte installieren Sie pyarrow: pip install pyarrow")
+
+
+def grid_schema():
+    return pa.schema([
+        ('workbook', pa.dictionary(pa.int32(), pa.string())),
+        ('sheet', pa.dictionary(pa.int32(), pa.string())),
+        ('row', pa.int32()),
+        ('col', pa.int32()),
+        ('text', pa.string()),
+        ('value_type', pa.dictionary(pa.int8(), pa.string())),
+        ('number', pa.float64()),
+        ('value', pa.string()),
+        ('formula', pa.string()),
+    ])
+
+
+def character_schema():
+    return pa.schema([
+        ('workbook', pa.dictionary(pa.int32(), pa.string())),
+        ('sheet', pa.dictionary(pa.int32(), pa.string())),
+        ('name', pa.string()),
+        ('player_name', pa.string()),
+        ('class_name', pa.string()),
+        ('race', pa.string()),
+        ('level', pa.int32()),
+        ('layout', pa.string()),
+    ])
+
+
+def attribute_schema():
+    return pa.schema([
+        ('workbook', pa.dictionary(pa.int32(), pa.string())),
+        ('sheet', pa.dictionary(pa.int32(), pa.string())),
+        ('attribute', pa.string()),
+        ('code', pa.string()),
+        ('blips', pa.int32()),
+    ])
+
+
+def skill_schema():
+    return pa.schema([
+        ('workbook', pa.dictionary(pa.int32(), pa.string())),
+        ('sheet', pa.dictionary(pa.int32(), pa.string())),
+        ('row', pa.int32()),
+        ('attribute', pa.string()),
+        ('name', pa.string()),
+        ('base', pa.string()),
+        ('bonus', pa.string()),
+        ('total', pa.string()),
+        ('level', pa.string()),
+        ('cost', pa.string()),
+        ('base_blips', pa.int32()),
+        ('total_blips', pa.int32()),
+    ])
+
+
+def to_number(cell):
+    if cell.value_type not in NUMERIC_TYPES:
+        return None
+    try:
+        return float(cell.value)
+    except ValueError:
+        return None
+
+
+def iter_grid_batches(filepath, batch_cells=BATCH_CELLS, on_sheet=None):
+    """Liefert Record-Batches aus dem Zeilenstrom, ohne die Mappe komplett zu laden
+
+    Mit `on_sheet` wird jedes Blatt nach seiner letzten Zeile als
+    on_sheet(Blattname, SheetGrid) übergeben, damit die Charaktererkennung
+    die Mappe nicht erneut parst. Gehalten wird immer nur das laufende Blatt.
+    """
+    require_pyarrow()
+    schema = grid_schema()
+    workbook = os.path.basename(filepath)
+    columns = {name: [] for name in schema.names}
+    current = grid = None
+    for sheet_name, row_idx, cells in iter_rows(filepath):
+        if on_sheet is not None:
+            if sheet_name != current:
+                if grid is not None:
+                    on_sheet(current, grid)
+                current, grid = sheet_name, SheetGrid()
+            grid.add_row(row_idx, cells)
+        for col, cell in cells.items():
+            columns['workbook'].append(workbook)
+            columns['sheet'].append(sheet_name)
+            columns['row'].append(row_idx)
+            columns['col'].append(col)
+            columns['text'].append(cell.text)
+            columns['value_type'].append(cell.value_type)
+            columns['number'].append(to_number(cell))
+            columns['value'].append(cell.value)
+            columns['formula'].append(cell.formula or None)
+        if len(columns['row']) >= batch_cells:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {name: [] for name in schema.names}
+    if columns['row']:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+    if grid is not None:
+        on_sheet(current, grid)
+
+
+def character_tables(characters, workbook):
+    """Charaktere, Attribute und Fertigkeiten als drei flache Arrow-Tabellen
+
+    Die Schemas sind fest: auch ohne Charaktere (nur None-Werte) bleiben die
+    Spaltentypen gleich, so dass pyarrow.dataset alle Dateien zusammen liest.
+    """
+    require_pyarrow()
+    chars = {'workbook': [], 'sheet': [], 'name': [], 'player_name': [], 'class_name': [],
+             'race': [], 'level': [], 'layout': []}
+    attributes = {'workbook': [], 'sheet': [], 'attribute': [], 'code': [], 'blips': []}
+    skills = {'workbook': [], 'sheet': [], 'row': [], 'attribute': [], 'name': [], 'base': [],
+              'bonus': [], 'total': [], 'level': [], 'cost': [], 'base_blips': [], 'total_blips': []}
+    for char in characters:
+        level = str(char.get('level') or '').strip()
+        chars['workbook'].append(workbook)
+        chars['sheet'].append(char['sheet'])
+        chars['name'].append(char.get('name') or None)
+        chars['player_name'].append(char.get('playerName') or None)
+        chars['class_name'].append(char.get('class') or None)
+        chars['race'].append(char.get('race') or None)
+        chars['level'].append(int(level) if level.isdigit() else None)
+        chars['layout'].append(char.get('layout'))
+        for attr, code in char['attributes'].items():
+            attributes['workbook'].append(workbook)
+            attributes['sheet'].append(char['sheet'])
+            attributes['attribute'].append(attr)
+            attributes['code'].append(code)
+            attributes['blips'].append(d6_to_blips(code))
+        for skill in char.get('skills', []):
+            skills['workbook'].append(workbook)
+            skills['sheet'].append(char['sheet'])
+            skills['row'].append(skill['row'])
+            skills['attribute'].append(skill.get('attribute') or None)
+            skills['name'].append(skill['name'])
+            for key in ('base', 'bonus', 'total', 'level', 'cost'):
+                skills[key].append(skill.get(key) or None)
+            skills['base_blips'].append(d6_to_blips(skill.get('base')))
+            skills['total_blips'].append(d6_to_blips(skill.get('total')))
+    return {
+        'characters': pa.table(chars, schema=character_schema()),
+        'attributes': pa.table(attributes, schema=attribute_schema()),
+        'skills': pa.table(skills, schema=skill_schema()),
+    }
+
+
+def write_table(table, output_dir, name):
+    """Schreibt eine Tabelle als Parquet und als Arrow-IPC-Datei (memory-mapbar)"""
+    pq.write_table(table, os.path.join(output_dir, name + '.parquet'))
+    with pa.OSFile(os.path.join(output_dir, name + '.arrow'), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def export_workbook(filepath, output_dir, cache=None):
+    """Exportiert das Grid gestreamt und die Charakterdatensätze; liefert {Name: Zeilen}"""
+    require_pyarrow()
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    schema = grid_schema()
+    counts = {}
+
+    cells = 0
+    characters = []
+
+    def detect_sheet(sheet_name, grid):
+        characters.extend(detect_characters({sheet_name: grid}, cache))
+
+    with pq.ParquetWriter(os.path.join(output_dir, stem + '.cells.parquet'), schema) as parquet_writer, \
+            pa.OSFile(os.path.join(output_dir, stem + '.cells.arrow'), 'wb') as sink, \
+            pa.ipc.new_file(sink, schema) as ipc_writer:
+        for batch in iter_grid_batches(filepath, on_sheet=detect_sheet):
+            parquet_writer.write_batch(batch)
+            ipc_writer.write_batch(batch)
+            cells += batch.num_rows
+    counts[stem + '.cells'] = cells
+
+    for name, table in character_tables(characters, os.path.basename(filepath)).items():
+        write_table(table, output_dir, f"{stem}.{name}")
+        counts[f"{stem}.{name}"] = table.num_rows
+    return counts
+
+
+def load_cells(path, columns=None):
+    """Lädt nur die gewünschten Spalten; .arrow-Dateien werden per mmap gelesen"""
+    require_pyarrow()
+    if path.endswith('.arrow'):
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns)
+
+
+if __name__ == "__main__":
+    if pa is None:
+        print("Bitte installieren Sie pyarrow: pip install pyarrow")
+        exit(1)
+
+    output_dir = 'arrow_export'
+    files = sys.argv[1:] or [os.path.join('FM', name) for name in sorted(os.listdir('FM'))
+                             if is_workbook_file(name)]
+    cache = load_cache()
+    for filepath in files:
+        print(f"Exportiere {filepath} ...")
+        for name, rows in export_workbook(filepath, output_dir, cache).items():
+            print(f"  {name}: {rows} Zeilen")
+    save_cache(cache)
+    print(f"\nDateien in {output_dir}/ gespeichert")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Überwachter Stapellauf über viele Arbeitsmappen mit Zeit- und Speicherbudget
+
+Jede Arbeitsmappe wird in einem eigenen Arbeitsprozess verarbeitet. Der
+Aufseher beendet Prozesse, die das Zeitlimit oder das RSS-Limit
+überschreiten, ersetzt abgestürzte Prozesse und startet jeden Prozess nach
+einer festen Zahl von Aufgaben neu. Fehlgeschlagene Dateien werden einmal
+wiederholt, der Rest des Stapels läuft weiter. Jedes Ergebnis landet sofort
+in einer JSONL-Checkpoint-Datei; ein abgebrochener Lauf setzt dort wieder an.
+"""
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from multiprocessing.connection import wait
+
+from sheet_store import archive_files
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+CHECKPOINT_FILE = 'batch_checkpoint.jsonl'
+OUTPUT_FILE = 'batch_results.json'
+DEFAULT_TASK = 'sheet_layouts:read_characters_with_layouts'
+
+TIMEOUT_SECONDS = 60.0
+MEMORY_LIMIT_MB = 1024
+TASKS_PER_WORKER = 20
+MAX_ATTEMPTS = 2
+POLL_INTERVAL = 0.05
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def rss_bytes(pid):
+    """Resident Set Size eines Prozesses laut /proc; None, wo es kein /proc gibt (Windows)"""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def file_stamp(filepath):
+    """Größe und Änderungszeit; eine geänderte Datei wird trotz Checkpoint neu verarbeitet"""
+    stat = os.stat(filepath)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def resolve_task(spec):
+    """'modul:funktion' -> Funktion"""
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def worker_main(conn, task_spec, max_tasks):
+    """Arbeitsprozess: verarbeitet bis zu max_tasks Dateien und beendet sich dann"""
+    task = resolve_task(task_spec)
+    for _ in range(max_tasks):
+        try:
+            filepath = conn.recv()
+        except EOFError:
+            break
+        if filepath is None:
+            break
+        started = time.perf_counter()
+        try:
+            result = task(filepath)
+            conn.send(('ok', result, None, time.perf_counter() - started))
+        except MemoryError:
+            conn.send(('fehler', None, 'MemoryError', time.perf_counter() - started))
+        except Exception as e:
+            detail = traceback.format_exception_only(type(e), e)[-1].strip()
+            conn.send(('fehler', None, detail, time.perf_counter() - started))
+    conn.close()
+
+
+class Worker:
+    """Ein Arbeitsprozess mit Pipe und der gerade laufenden Aufgabe"""
+
+    def __init__(self, context, task_spec, max_tasks):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn, task_spec, max_tasks), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.remaining = max_tasks
+        self.job = None
+        self.started = None
+
+    def assign(self, job):
+        self.conn.send(job['file'])
+        self.remaining -= 1
+        self.job = job
+        self.started = time.monotonic()
+
+    def finish(self):
+        job, self.job = self.job, None
+        return job
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def retire(self):
+        """Regulär beenden (Aufgabenkontingent erschöpft oder Stapel fertig)"""
+        if self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(1.0)
+        self.kill()
+
+
+def load_checkpoint(filepath=CHECKPOINT_FILE):
+    """{Datei: letzter Eintrag}; eine beim Abbruch halb geschriebene letzte Zeile wird ignoriert"""
+    done = {}
+    if not os.path.exists(filepath):
+        return done
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[entry['file']] = entry
+    return done
+
+
+def append_checkpoint(entry, filepath=CHECKPOINT_FILE):
+    with open(filepath, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run_batch(files, task_spec=DEFAULT_TASK, workers=None, timeout=TIMEOUT_SECONDS,
+              memory_limit_mb=MEMORY_LIMIT_MB, tasks_per_worker=TASKS_PER_WORKER,
+              checkpoint=CHECKPOINT_FILE, log=print):
+    """Verarbeitet alle Dateien, die laut Checkpoint noch offen sind; liefert den Checkpoint-Stand"""
+    done = load_checkpoint(checkpoint)
+    pending = []
+    for filepath in files:
+        stamp = file_stamp(filepath)
+        entry = done.get(filepath)
+        if entry and entry['stamp'] == stamp and (entry['status'] == 'ok' or entry['attempts'] >= MAX_ATTEMPTS):
+            continue
+        pending.append({'file': filepath, 'stamp': stamp, 'attempts': 0})
+    if not pending:
+        return done
+
+    context = multiprocessing.get_context()
+    memory_limit = memory_limit_mb * 1024 * 1024
+    slots = [None] * min(workers or os.cpu_count() or 1, len(pending))
+
+    def record(job, status, result, error, seconds):
+        job['attempts'] += 1
+        if status != 'ok' and job['attempts'] < MAX_ATTEMPTS:
+            log(f"  {job['file']}: {error} - neuer Versuch folgt")
+            pending.append(job)
+            return
+        entry = {'file': job['file'], 'stamp': job['stamp'], 'status': status, 'attempts': job['attempts'],
+                 'error': error, 'seconds': round(seconds, 3), 'result': result}
+        append_checkpoint(entry, checkpoint)
+        done[job['file']] = entry
+        log(f"  {job['file']}: {status}" + (f" ({error})" if error else f" in {seconds:.2f} s"))
+
+    try:
+        while pending or any(slot and slot.job for slot in slots):
+            for index, slot in enumerate(slots):
+                if slot is not None and slot.job is None and (slot.remaining == 0 or not pending):
+                    slot.retire()
+                    slots[index] = slot = None
+                if slot is None and pending:
+                    slots[index] = slot = Worker(context, task_spec, tasks_per_worker)
+                if slot is not None and slot.job is None and pending:
+                    slot.assign(pending.pop(0))
+
+            busy = [slot for slot in slots if slot and slot.job]
+            ready = wait([slot.conn for slot in busy], timeout=POLL_INTERVAL)
+            now = time.monotonic()
+            for index, slot in enumerate(slots):
+                if slot is None or slot.job is None:
+                    continue
+                elapsed = now - slot.started
+                if slot.conn in ready:
+                    try:
+                        status, result, error, seconds = slot.conn.recv()
+                    except (EOFError, OSError):
+                        slot.kill()
+                        slots[index] = None
+                        record(slot.finish(), 'fehler', None,
+                               f"Arbeitsprozess abgestürzt (Exitcode {slot.process.exitcode})", elapsed)
+                        continue
+                    record(slot.finish(), status, result, error, seconds)
+                    continue
+                rss = rss_bytes(slot.process.pid)
+                if elapsed > timeout:
+                    reason = f"Zeitlimit {timeout:g} s überschritten"
+                elif rss is not None and rss > memory_limit:
+                    reason = f"Speicherlimit {memory_limit_mb} MB überschritten ({rss // (1024 * 1024)} MB)"
+                else:
+                    continue
+                # Hängende oder ausufernde Prozesse werden hart beendet und später ersetzt
+                slot.kill()
+                slots[index] = None
+                record(slot.finish(), 'fehler', None, reason, elapsed)
+    finally:
+        for slot in slots:
+            if slot is not None:
+                slot.kill()
+    return done
+
+
+def _option(args, name, default, convert):
+    if name in args:
+        index = args.index(name)
+        value = convert(args[index + 1])
+        del args[index:index + 2]
+        return value
+    return default
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    workers = _option(args, '--workers', None, int)
+    timeout = _option(args, '--timeout', TIMEOUT_SECONDS, float)
+    memory_limit_mb = _option(args, '--memory', MEMORY_LIMIT_MB, int)
+    tasks_per_worker = _option(args, '--tasks-per-worker', TASKS_PER_WORKER, int)
+    task_spec = _option(args, '--task', DEFAULT_TASK, str)
+    archive = args[0] if args else "FM"
+
+    files = archive_files(archive) if os.path.isdir(archive) else [archive]
+    started = time.perf_counter()
+    done = run_batch(files, task_spec, workers, timeout, memory_limit_mb, tasks_per_worker)
+    elapsed = time.perf_counter() - started
+
+    results = {filepath: done[filepath]['result'] for filepath in files
+               if filepath in done and done[filepath]['status'] == 'ok'}
+    failed = [done[filepath] for filepath in files if filepath in done and done[filepath]['status'] != 'ok']
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"\n{len(results)} von {len(files)} Dateien verarbeitet in {elapsed:.1f} s, {len(failed)} fehlgeschlagen")
+    for entry in failed:
+        print(f"  {entry['file']}: {entry['error']}")
+    print(f"Ergebnisse in {OUTPUT_FILE}, Fortschritt in {CHECKPOINT_FILE}")
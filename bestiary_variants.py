@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Erzeugt Gegner-Varianten aus dem Bestiarium, skaliert auf eine Zielstufe (Blip-Arithmetik)"""
+import json
+import random
+import re
+import sys
+
+from dice_codes import d6_to_blips, format_d6_value
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+SOURCES = ['standard_enemies.json', 'fallcrest_bestiary.json']
+SYLLABLES_FILE = 'naming_syllables.json'
+OUTPUT_FILE = 'bestiary_variants.jsonl'
+
+# Pro Stufe über/unter der Vorlage: Blips auf die Attribute verteilt
+ATTRIBUTE_BLIPS_PER_LEVEL = 2
+# Alle n Stufen ein Bonuswürfel mehr auf jede Fertigkeit
+LEVELS_PER_SKILL_DIE = 3
+# Zufällige Abweichung pro Attribut in Blips (±)
+ATTRIBUTE_JITTER = 1
+
+# Rasse -> Schlüssel in naming_syllables.json; ohne Treffer 'human'
+# (Oberbegriffe wie "Humanoid" sagen nichts über die Rasse)
+RACE_KEYS = {
+    'mensch': 'human',
+    'elf': 'elf',
+    'zwerg': 'dwarf',
+    'duergar': 'dwarf',
+    'halbling': 'halfling',
+    'ork': 'halforc',
+    'halbork': 'halforc',
+    'gnom': 'gnome',
+    'kobold': 'gnome',
+}
+RACE_PATTERNS = [(re.compile(rf'\b{word}\b'), key) for word, key in RACE_KEYS.items()]
+
+
+def load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def normalize_enemy(enemy):
+    """Bringt beide Bestiariums-Formate auf die Form von standard_enemies.json"""
+    return {
+        'name': enemy.get('name', ''),
+        'type': enemy.get('type', ''),
+        'race': enemy.get('race') or '',
+        'level': int(enemy.get('level') or 1),
+        'description': enemy.get('description') or enemy.get('desc') or '',
+        'special': enemy.get('special') or enemy.get('fallcrestTwist') or '',
+        'attributes': dict(enemy.get('attributes') or enemy.get('stats') or {}),
+        'skills': [dict(skill) for skill in enemy.get('skills') or []],
+        'inventory': list(enemy.get('inventory') or []),
+        'maxHP': enemy.get('maxHP'),
+    }
+
+
+def hp_per_strength_blip(enemies):
+    """Verhältnis maxHP / (Stärke-Blips * Stufe) aus den Gegnern, die maxHP angeben"""
+    ratios = []
+    for enemy in enemies:
+        strength = d6_to_blips(enemy['attributes'].get('Stärke'))
+        if enemy['maxHP'] and strength:
+            ratios.append(enemy['maxHP'] / (strength * enemy['level']))
+    return sum(ratios) / len(ratios) if ratios else 2.0
+
+
+def race_key(enemy, syllables):
+    """Rasse vor Name vor Typ, jeweils nur ganze Wörter ('Dunkel-Zwerg (Duergar)' -> dwarf)"""
+    for field in ('race', 'name', 'type'):
+        text = str(enemy[field]).lower()
+        for pattern, key in RACE_PATTERNS:
+            if key in syllables and pattern.search(text):
+                return key
+    return 'human'
+
+
+def generate_name(rng, syllables, key):
+    """Wie NameGenerator.tsx: Vorsilbe + Endsilbe, Nachname falls vorhanden"""
+    gender = syllables[key][rng.choice(['male', 'female'])]
+    name = rng.choice(gender['prefix']) + rng.choice(gender['suffix'])
+    surnames = syllables.get(f"{key}_surnames")
+    if surnames and surnames.get('part1') and surnames.get('part2'):
+        name += ' ' + rng.choice(surnames['part1']) + rng.choice(surnames['part2'])
+    return name
+
+
+class VariantGenerator:
+    """Hält die Vorlagen als Blip-Listen, damit jede Variante nur Integer-Arithmetik kostet"""
+
+    def __init__(self, enemies, syllables, seed=None):
+        self.templates = [normalize_enemy(enemy) for enemy in enemies]
+        self.syllables = syllables
+        self.rng = random.Random(seed)
+        self.hp_ratio = hp_per_strength_blip(self.templates)
+        self.compiled = []
+        for template in self.templates:
+            attribute_names = list(template['attributes'])
+            blips = [d6_to_blips(code) or 0 for code in template['attributes'].values()]
+            self.compiled.append({
+                'template': template,
+                'attribute_names': attribute_names,
+                'blips': blips,
+                # Stärkere Attribute wachsen bevorzugt (Gewicht = Blips + 1)
+                'weights': [value + 1 for value in blips],
+                'race_key': race_key(template, syllables),
+            })
+
+    def variant(self, compiled, target_level):
+        rng = self.rng
+        template = compiled['template']
+        level_delta = target_level - template['level']
+        blips = list(compiled['blips'])
+        names = compiled['attribute_names']
+
+        budget = level_delta * ATTRIBUTE_BLIPS_PER_LEVEL
+        if names and budget:
+            step = 1 if budget > 0 else -1
+            for index in rng.choices(range(len(names)), weights=compiled['weights'], k=abs(budget)):
+                blips[index] = max(0, blips[index] + step)
+        for index in range(len(blips)):
+            if blips[index] > 0:
+                blips[index] = max(1, blips[index] + rng.randint(-ATTRIBUTE_JITTER, ATTRIBUTE_JITTER))
+
+        skill_delta = int(level_delta / LEVELS_PER_SKILL_DIE)
+        skills = []
+        for skill in template['skills']:
+            scaled = dict(skill)
+            scaled['bonusDice'] = max(0, int(skill.get('bonusDice') or 0) + skill_delta)
+            skills.append(scaled)
+
+        attributes = {name: format_d6_value(value) for name, value in zip(names, blips)}
+        strength = blips[names.index('Stärke')] if 'Stärke' in names else 0
+        if template['maxHP']:
+            max_hp = max(1, round(template['maxHP'] * target_level / template['level']))
+        else:
+            max_hp = max(1, round(self.hp_ratio * max(strength, 1) * target_level))
+
+        first_name = generate_name(rng, self.syllables, compiled['race_key'])
+        return {
+            'name': f"{first_name} ({template['name']})",
+            'template': template['name'],
+            'type': template['type'],
+            'race': template['race'],
+            'level': target_level,
+            'description': template['description'],
+            'special': template['special'],
+            'attributes': attributes,
+            'skills': skills,
+            'inventory': template['inventory'],
+            'maxHP': max_hp,
+            'currentHP': max_hp,
+        }
+
+    def generate(self, count, levels, templates=None):
+        """Liefert `count` Varianten als Generator; Stufen werden aus `levels` gezogen"""
+        pool = [compiled for compiled in self.compiled
+                if templates is None or compiled['template']['name'] in templates]
+        if not pool:
+            return
+        for _ in range(count):
+            yield self.variant(self.rng.choice(pool), self.rng.choice(levels))
+
+
+def write_jsonl(variants, filepath):
+    written = 0
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for variant in variants:
+            f.write(json.dumps(variant, ensure_ascii=False) + '\n')
+            written += 1
+    return written
+
+
+def parse_levels(text):
+    """'3' -> [3], '2-5' -> [2, 3, 4, 5]; ValueError bei ungültigen Stufen"""
+    match = re.match(r'^(\d+)(?:-(\d+))?$', text.strip())
+    if not match:
+        raise ValueError(f"ungültige Stufenangabe {text!r} (erwartet z.B. 3 oder 2-5)")
+    low = int(match.group(1))
+    high = int(match.group(2) or low)
+    if low < 1 or high < low:
+        raise ValueError(f"ungültiger Stufenbereich {text!r} (Stufen ab 1, aufsteigend)")
+    return list(range(low, high + 1))
+
+
+if __name__ == "__main__":
+    try:
+        count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+        levels = parse_levels(sys.argv[2]) if len(sys.argv) > 2 else [1, 2, 3, 4, 5]
+        seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        print("Aufruf: python bestiary_variants.py [ANZAHL] [STUFE|VON-BIS] [SEED]")
+        exit(1)
+
+    enemies = []
+    for filepath in SOURCES:
+        enemies.extend(load_json(filepath))
+    generator = VariantGenerator(enemies, load_json(SYLLABLES_FILE), seed)
+
+    written = write_jsonl(generator.generate(count, levels), OUTPUT_FILE)
+    print(f"{written} Varianten aus {len(generator.templates)} Vorlagen (Stufen {levels[0]}-{levels[-1]}, "
+          f"Seed {seed}) in {OUTPUT_FILE} gespeichert")
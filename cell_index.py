@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Persistenter Volltextindex über alle Zellen aller Arbeitsmappen (SQLite FTS5)"""
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from ods_core import read_workbook, format_address, is_workbook_file, sheet_hash, READ_ERRORS
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+INDEX_FILE = 'cell_index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workbooks (
+  path TEXT PRIMARY KEY,
+  stamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sheets (
+  id INTEGER PRIMARY KEY,
+  workbook TEXT NOT NULL,
+  sheet TEXT NOT NULL,
+  hash TEXT NOT NULL,
+  UNIQUE (workbook, sheet)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS cells USING fts5(
+  folded,
+  text UNINDEXED,
+  sheet_id UNINDEXED,
+  row UNINDEXED,
+  col UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+"""
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def fold(text):
+    """Umlaute wie in normalize_key ausschreiben, damit 'Stärke' und 'Staerke' gleich sind"""
+    return (text.lower()
+            .replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss'))
+
+
+def connect(db_path=INDEX_FILE):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    # Ältere Indizes führten Blätter unter dem Dateinamen statt dem Pfad: dann alles neu indizieren
+    if conn.execute("SELECT 1 FROM sheets WHERE workbook NOT IN (SELECT path FROM workbooks) LIMIT 1").fetchone():
+        with conn:
+            conn.execute("DELETE FROM cells")
+            conn.execute("DELETE FROM sheets")
+            conn.execute("DELETE FROM workbooks")
+    return conn
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def index_workbook(conn, path):
+    """Indiziert nur Blätter, deren Inhaltshash sich geändert hat; liefert (neu, entfernt)
+
+    Blätter hängen am vollen Pfad wie in `workbooks`: gleichnamige Stände in
+    verschiedenen Ordnern überschreiben sich nicht.
+    """
+    known = {sheet: (sheet_id, digest) for sheet_id, sheet, digest in
+             conn.execute("SELECT id, sheet, hash FROM sheets WHERE workbook = ?", (path,))}
+    workbook = read_workbook(path)
+    updated = []
+    for sheet, grid in workbook.items():
+        digest = sheet_hash(grid)
+        if sheet in known:
+            sheet_id, old_digest = known[sheet]
+            if old_digest == digest:
+                continue
+            conn.execute("DELETE FROM cells WHERE sheet_id = ?", (sheet_id,))
+            conn.execute("UPDATE sheets SET hash = ? WHERE id = ?", (digest, sheet_id))
+        else:
+            sheet_id = conn.execute("INSERT INTO sheets (workbook, sheet, hash) VALUES (?, ?, ?)",
+                                    (path, sheet, digest)).lastrowid
+        conn.executemany("INSERT INTO cells (folded, text, sheet_id, row, col) VALUES (?, ?, ?, ?, ?)",
+                         [(fold(cell.text), cell.text, sheet_id, row, col)
+                          for (row, col), cell in grid.items() if cell.text])
+        updated.append(sheet)
+    removed = [sheet for sheet in known if sheet not in workbook]
+    for sheet in removed:
+        remove_sheet(conn, known[sheet][0])
+    return updated, removed
+
+
+def remove_sheet(conn, sheet_id):
+    conn.execute("DELETE FROM cells WHERE sheet_id = ?", (sheet_id,))
+    conn.execute("DELETE FROM sheets WHERE id = ?", (sheet_id,))
+
+
+def update_index(directory, db_path=INDEX_FILE):
+    """Bringt den Index auf den Stand des Ordners; unveränderte Dateien werden nicht geöffnet
+
+    Liefert (Bericht, Fehler). Eine unlesbare Mappe landet in den Fehlern und
+    behält ihren bisherigen Indexstand; die übrigen werden trotzdem übernommen.
+    """
+    conn = connect(db_path)
+    report = []
+    failed = []
+    try:
+        with conn:
+            stamps = dict(conn.execute("SELECT path, stamp FROM workbooks"))
+            seen = set()
+            for root, _, names in os.walk(directory):
+                for name in sorted(names):
+                    if not is_workbook_file(name):
+                        continue
+                    path = os.path.join(root, name)
+                    seen.add(path)
+                    try:
+                        stamp = _stamp(path)
+                        if stamps.get(path) == stamp:
+                            continue
+                        # read_workbook läuft vor dem ersten Schreibzugriff: ein Fehler hinterlässt nichts
+                        updated, removed = index_workbook(conn, path)
+                    except READ_ERRORS as e:
+                        failed.append((path, str(e) or type(e).__name__))
+                        continue
+                    conn.execute("INSERT OR REPLACE INTO workbooks VALUES (?, ?)", (path, stamp))
+                    report.append((path, updated, removed))
+            for path in set(stamps) - seen:
+                for (sheet_id,) in conn.execute("SELECT id FROM sheets WHERE workbook = ?", (path,)).fetchall():
+                    remove_sheet(conn, sheet_id)
+                conn.execute("DELETE FROM workbooks WHERE path = ?", (path,))
+                report.append((path, [], ['*']))
+    finally:
+        conn.close()
+    return report, failed
+
+
+def build_query(query):
+    """'Gisch kampf' -> '"gisch"* AND "kampf"*' (jedes Wort als Präfix)"""
+    tokens = _TOKEN_RE.findall(fold(query))
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def search(conn, query, limit=50, workbook=None, sheet=None):
+    """Liefert [(Arbeitsmappe, Blatt, Adresse, Text)], beste Treffer zuerst"""
+    match = build_query(query)
+    if not match:
+        return []
+    sql = ("SELECT s.workbook, s.sheet, c.row, c.col, c.text FROM cells c "
+           "JOIN sheets s ON s.id = c.sheet_id WHERE cells MATCH ?")
+    params = [match]
+    if workbook is not None:
+        sql += " AND s.workbook = ?"
+        params.append(workbook)
+    if sheet is not None:
+        sql += " AND s.sheet = ?"
+        params.append(sheet)
+    sql += " ORDER BY bm25(cells) LIMIT ?"
+    params.append(limit)
+    return [(wb, sh, format_address(row, col), text) for wb, sh, row, col, text in conn.execute(sql, params)]
+
+
+if __name__ == "__main__":
+    directory = "FM"
+    args = sys.argv[1:]
+    if args and os.path.isdir(args[0]):
+        directory = args.pop(0)
+
+    report, failed = update_index(directory)
+    for path, updated, removed in report:
+        print(f"{path}: {len(updated)} Blätter neu indiziert, {len(removed)} entfernt")
+    for path, error in failed:
+        print(f"{path}: übersprungen ({error})")
+
+    if args:
+        conn = connect()
+        started = time.perf_counter()
+        hits = search(conn, ' '.join(args))
+        elapsed = (time.perf_counter() - started) * 1000
+        for workbook, sheet, address, text in hits:
+            print(f"{workbook} | {sheet}!{address}: {text[:80]}")
+        print(f"\n{len(hits)} Treffer in {elapsed:.1f} ms")
+        conn.close()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Aliasse für Spieler- und Charakternamen aus character_aliases.json
+
+Blatt-Suffixe (_V2, __V2) und abweichende Schreibweisen (Korbi -> Kobi)
+stehen als Daten in der JSON-Datei; sheet_layouts, identity_resolver und
+extract_all_attributes wenden sie gleich an. normalize_key ist die
+Schlüsselform der Web-App, die supabase_sync und price_table teilen.
+"""
+import json
+import os
+import unicodedata
+
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'character_aliases.json')
+
+_loaded = {}
+
+
+def load_aliases(filepath=ALIASES_FILE):
+    """Liest die Aliasdatei; fehlt sie, ist das ein Fehler (sonst bleiben V2-Blätter still ungepaart)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def normalize(text):
+    """'Kälkor  Flax' -> 'kalkorflax': ohne Akzente, Groß-/Kleinschreibung und Satzzeichen"""
+    text = unicodedata.normalize('NFKD', str(text or '')).casefold()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def normalize_key(value):
+    """Wie normalizeKey in app/api/rulebook/import-default/route.ts"""
+    return (value.strip().lower()
+            .replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss'))
+
+
+def _alias_table(mapping):
+    return {normalize(alias): normalize(target) for alias, target in mapping.items()}
+
+
+def _display_table(mapping):
+    return {normalize(alias): target for alias, target in mapping.items()}
+
+
+class AliasTable:
+    """Wendet character_aliases.json auf Spieler- und Charakternamen an"""
+
+    def __init__(self, aliases):
+        # Längste Suffixe zuerst, damit '__V2' nicht als '_V2' + '_' endet
+        self.suffixes = sorted(aliases.get('sheet_suffixes', []), key=len, reverse=True)
+        self.players = _alias_table(aliases.get('players', {}))
+        self.player_names = _display_table(aliases.get('players', {}))
+        self.characters = _alias_table(aliases.get('characters', {}))
+
+    def strip_suffix(self, name):
+        for suffix in self.suffixes:
+            if name.endswith(suffix):
+                return name[:-len(suffix)]
+        return name
+
+    def player(self, name):
+        key = normalize(self.strip_suffix(name or ''))
+        return self.players.get(key, key)
+
+    def display_player(self, name):
+        """Spielername für die Ausgabe: 'Korbi_V2' -> 'Kobi', 'JJ_' -> 'JJ'"""
+        stripped = self.strip_suffix(name or '').strip('_ ')
+        return self.player_names.get(normalize(stripped), stripped)
+
+    def character(self, name):
+        key = normalize(name)
+        return self.characters.get(key, key)
+
+
+def default_aliases():
+    """AliasTable für character_aliases.json (einmal pro Prozess geladen)"""
+    if ALIASES_FILE not in _loaded:
+        _loaded[ALIASES_FILE] = AliasTable(load_aliases())
+    return _loaded[ALIASES_FILE]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Umrechnung von D6-Würfelcodes in Blips und zurück (wie lib/dice.ts)"""
+import re
+
+# '3D', '3D+1', '3W', '3W+1' sowie die Gesamtwerte der Georg-Blätter 'W3', 'W3+1'
+_STANDARD_RE = re.compile(r'^(\d+)[DW](?:\+(\d+))?$')
+_REVERSED_RE = re.compile(r'^[DW](\d+)(?:\+(\d+))?$')
+
+BLIPS_PER_DIE = 3
+
+# Grundwerte der Attribute wie BASE_VALUES in lib/data.ts
+BASE_VALUES = {
+    'Reflexe': '2D',
+    'Koordination': '2D',
+    'Stärke': '2D',
+    'Wissen': '2D',
+    'Wahrnehmung': '2D',
+    'Ausstrahlung': '2D',
+    'Magie': '0D',
+}
+
+
+def parse_d6_value(value):
+    """Liefert (Würfel, Modifikator) oder None, wenn der Wert kein Würfelcode ist
+
+    Anders als parseD6Value in lib/dice.ts gibt es keinen Rückfall auf '1D',
+    damit fehlerhafte Zellen beim Export auffallen statt still 1D zu werden.
+    """
+    if value is None:
+        return None
+    raw = str(value).strip().upper().replace(' ', '')
+    match = _STANDARD_RE.match(raw) or _REVERSED_RE.match(raw)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2) or 0)
+
+
+def d6_to_blips(value):
+    """'3D+1' -> 10 (Würfel * 3 + Modifikator); None bei ungültigem Wert"""
+    parsed = parse_d6_value(value)
+    if parsed is None:
+        return None
+    dice, modifier = parsed
+    return max(0, dice * BLIPS_PER_DIE + modifier)
+
+
+def format_d6_value(blips):
+    """10 -> '3D+1'; Modifikatoren über 2 werden wie in lib/dice.ts zu Würfeln"""
+    blips = max(0, int(blips))
+    dice, modifier = divmod(blips, BLIPS_PER_DIE)
+    return f"{dice}D" if modifier == 0 else f"{dice}D+{modifier}"
+
+
+def step_cost(step):
+    """Kosten des `step`-ten Schritts über dem Grundwert (1-basiert), wie in lib/data.ts"""
+    return -(-step // 3)
+
+
+def steps_cost(steps):
+    """Gesamtkosten von `steps` Schritten über dem Grundwert"""
+    return sum(step_cost(step) for step in range(1, steps + 1))
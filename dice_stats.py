@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Streaming-Auswertung von dice_rolls-Exporten (Fairness, Explosionen, Glück)
+
+Liest JSON-Arrays, JSON Lines oder CSV zeilenweise und führt Aggregate pro
+Charakter, pro Würfelformel und pro Sitzung (Gruppe + Kalendertag). Der
+Zustand wird in dice_stats_state.json gespeichert; ein neuer Export wird nur
+ab dem letzten Zeitstempel eingelesen und in den Zustand gemischt.
+
+Regeln wie in lib/dice.ts: der erste Würfel ist rot, bei 6 explodiert er
+(exploding_rolls, inklusive des letzten Wurfs unter 6), bei 1 ist der Wurf
+ein kritischer Fehlschlag und zählt nie als Erfolg.
+"""
+import csv
+import json
+import math
+import os
+import re
+import sys
+from functools import lru_cache
+
+from dice_codes import parse_d6_value
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+STATE_FILE = 'dice_stats_state.json'
+READ_SIZE = 64 * 1024
+# Explosionsketten werden für die Theorie bis zu dieser Länge berücksichtigt
+MAX_CHAIN = 12
+SCOPES = ('character', 'formula', 'session')
+_SEPARATORS_RE = re.compile(r'[\s,\[\]]*')
+
+
+def iter_json_records(f):
+    """Objekte aus einem JSON-Array oder JSON Lines, ohne die Datei ganz zu laden"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    while True:
+        pos = _SEPARATORS_RE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                return
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(READ_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+
+
+def _csv_list(text):
+    """'{1,6,3}' (Postgres) oder '[1,6,3]' (JSON) -> [1, 6, 3]"""
+    text = (text or '').strip().strip('{}[]')
+    return [int(part) for part in text.split(',') if part.strip()]
+
+
+def _csv_bool(text):
+    text = (text or '').strip().lower()
+    if text in ('t', 'true', '1'):
+        return True
+    if text in ('f', 'false', '0'):
+        return False
+    return None
+
+
+def _csv_int(text):
+    text = (text or '').strip()
+    return int(text) if text else None
+
+
+def iter_csv_records(f):
+    for row in csv.DictReader(f):
+        yield {
+            **row,
+            'dice_results': _csv_list(row.get('dice_results')),
+            'exploding_rolls': _csv_list(row.get('exploding_rolls')),
+            'red_die_result': _csv_int(row.get('red_die_result')),
+            'modifier': _csv_int(row.get('modifier')) or 0,
+            'result': _csv_int(row.get('result')),
+            'target_value': _csv_int(row.get('target_value')),
+            'success': _csv_bool(row.get('success')),
+            'is_critical_failure': _csv_bool(row.get('is_critical_failure')),
+        }
+
+
+def iter_records(filepath):
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        if filepath.lower().endswith('.csv'):
+            yield from iter_csv_records(f)
+        else:
+            yield from iter_json_records(f)
+
+
+@lru_cache(maxsize=None)
+def _plain_dice(count):
+    """Verteilung der Summe von `count` normalen W6 als {Summe: p}"""
+    dist = {0: 1.0}
+    for _ in range(count):
+        step = {}
+        for total, p in dist.items():
+            for face in range(1, 7):
+                step[total + face] = step.get(total + face, 0.0) + p / 6
+        dist = step
+    return dist
+
+
+@lru_cache(maxsize=None)
+def formula_distribution(dice, modifier):
+    """(Verteilung der Gesamtsumme ohne kritische Fehlschläge, P(kritisch), Erwartungswert)
+
+    Der rote Würfel zeigt 2-5 direkt, bei 6 folgen k weitere Sechsen und ein
+    Abschlusswurf r < 6: Wert 6 * (k + 1) + r.
+    """
+    red = {face: 1 / 6 for face in range(2, 6)}
+    for sixes in range(1, MAX_CHAIN + 1):
+        for last in range(1, 6):
+            red[6 * sixes + last] = red.get(6 * sixes + last, 0.0) + (1 / 6) ** (sixes + 1)
+    rest = _plain_dice(max(dice - 1, 0))
+    totals = {}
+    for red_value, p_red in red.items():
+        for rest_value, p_rest in rest.items():
+            total = red_value + rest_value + modifier
+            totals[total] = totals.get(total, 0.0) + p_red * p_rest
+    critical = 1 / 6
+    expected = sum(total * p for total, p in totals.items()) + critical * (1 + 3.5 * (dice - 1) + modifier)
+    return totals, critical, expected
+
+
+@lru_cache(maxsize=None)
+def success_probability(dice, modifier, target):
+    totals, _, _ = formula_distribution(dice, modifier)
+    return sum(p for total, p in totals.items() if total >= target)
+
+
+def chi_square_sf(x, df):
+    """P(X² >= x) für ganzzahlige Freiheitsgrade (geschlossene Form, ohne SciPy)"""
+    if x <= 0:
+        return 1.0
+    if df % 2 == 0:
+        term = total = 1.0
+        for i in range(1, df // 2):
+            term *= (x / 2) / i
+            total += term
+        return math.exp(-x / 2) * total
+    term = total = 0.0
+    if df > 1:
+        term = total = 1.0
+        for i in range(2, (df + 1) // 2):
+            term *= x / (2 * i - 1)
+            total += term
+    return math.erfc(math.sqrt(x / 2)) + math.sqrt(2 * x / math.pi) * math.exp(-x / 2) * total
+
+
+def face_chi_square(counts):
+    """(Statistik, p-Wert) eines Würfel-Histogramms gegen die Gleichverteilung"""
+    n = sum(counts)
+    if n == 0:
+        return 0.0, 1.0
+    expected = n / len(counts)
+    statistic = sum((observed - expected) ** 2 / expected for observed in counts)
+    return statistic, chi_square_sf(statistic, len(counts) - 1)
+
+
+def new_aggregate():
+    return {
+        'rolls': 0,
+        'red_faces': [0] * 6,
+        'faces': [0] * 6,
+        'chains': {},
+        'critical': 0,
+        'with_target': 0,
+        'successes': 0,
+        'expected_successes': 0.0,
+        'result_sum': 0,
+        'expected_sum': 0.0,
+        'result_squares': 0,
+    }
+
+
+def merge_aggregates(target, source):
+    """Addiert `source` in `target`; Aggregate sind reine Summen und damit mischbar"""
+    for key in ('rolls', 'critical', 'with_target', 'successes', 'expected_successes',
+                'result_sum', 'expected_sum', 'result_squares'):
+        target[key] += source[key]
+    for key in ('red_faces', 'faces'):
+        target[key] = [a + b for a, b in zip(target[key], source[key])]
+    for length, count in source['chains'].items():
+        target['chains'][length] = target['chains'].get(length, 0) + count
+    return target
+
+
+def add_roll(aggregate, roll, expected_mean, expected_success):
+    results = roll.get('dice_results') or []
+    red = roll.get('red_die_result') or (results[0] if results else None)
+    aggregate['rolls'] += 1
+    if red and 1 <= red <= 6:
+        aggregate['red_faces'][red - 1] += 1
+    for face in results:
+        if 1 <= face <= 6:
+            aggregate['faces'][face - 1] += 1
+    chain = str(len(roll.get('exploding_rolls') or []))
+    aggregate['chains'][chain] = aggregate['chains'].get(chain, 0) + 1
+    if roll.get('is_critical_failure'):
+        aggregate['critical'] += 1
+    result = roll.get('result') or 0
+    aggregate['result_sum'] += result
+    aggregate['result_squares'] += result * result
+    aggregate['expected_sum'] += expected_mean
+    if roll.get('target_value') is not None and expected_success is not None:
+        aggregate['with_target'] += 1
+        aggregate['expected_successes'] += expected_success
+        if roll.get('success'):
+            aggregate['successes'] += 1
+
+
+def session_key(roll):
+    """Sitzung = Gruppe + Kalendertag des Zeitstempels"""
+    return f"{roll.get('group_id') or '-'}|{str(roll.get('timestamp') or '')[:10]}"
+
+
+def new_state():
+    return {'watermark': '', 'watermark_ids': [], 'rows': 0, 'skipped': 0,
+            'total': new_aggregate(), **{scope: {} for scope in SCOPES}}
+
+
+def load_state(filepath=STATE_FILE):
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return new_state()
+
+
+def save_state(state, filepath=STATE_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
+
+
+def ingest(state, records):
+    """Mischt neue Würfe in den Zustand; bereits gesehene (Zeitstempel <= Marke) werden übersprungen
+
+    Neue Zeilen werden zuerst in einem frischen Teilzustand gesammelt und
+    erst am Ende gemischt, damit ein abgebrochener Lauf den Zustand nicht halb ändert.
+    """
+    watermark = state['watermark']
+    watermark_ids = set(state['watermark_ids'])
+    batch = new_state()
+    newest = watermark
+    newest_ids = set(watermark_ids)
+    for roll in records:
+        timestamp = str(roll.get('timestamp') or '')
+        if timestamp < watermark or (timestamp == watermark and roll.get('id') in watermark_ids):
+            batch['skipped'] += 1
+            continue
+        parsed = parse_d6_value(roll.get('dice_formula'))
+        if parsed is None:
+            batch['skipped'] += 1
+            continue
+        dice, modifier = parsed
+        _, _, expected_mean = formula_distribution(dice, modifier)
+        target = roll.get('target_value')
+        expected_success = success_probability(dice, modifier, int(target)) if target is not None else None
+        keys = {
+            'character': str(roll.get('character_id') or '-'),
+            'formula': f"{dice}D+{modifier}" if modifier else f"{dice}D",
+            'session': session_key(roll),
+        }
+        add_roll(batch['total'], roll, expected_mean, expected_success)
+        for scope, key in keys.items():
+            if key not in batch[scope]:
+                batch[scope][key] = new_aggregate()
+            add_roll(batch[scope][key], roll, expected_mean, expected_success)
+        batch['rows'] += 1
+        if timestamp > newest:
+            newest = timestamp
+            newest_ids = set()
+        if timestamp == newest:
+            newest_ids.add(roll.get('id'))
+
+    merge_aggregates(state['total'], batch['total'])
+    for scope in SCOPES:
+        for key, aggregate in batch[scope].items():
+            if key in state[scope]:
+                merge_aggregates(state[scope][key], aggregate)
+            else:
+                state[scope][key] = aggregate
+    state['rows'] += batch['rows']
+    state['skipped'] += batch['skipped']
+    state['watermark'] = newest
+    state['watermark_ids'] = sorted(str(i) for i in newest_ids if i is not None)
+    return batch['rows'], batch['skipped']
+
+
+def summarize(aggregate):
+    """Kennzahlen eines Aggregats für den Bericht"""
+    rolls = aggregate['rolls']
+    _, red_p = face_chi_square(aggregate['red_faces'])
+    _, faces_p = face_chi_square(aggregate['faces'])
+    chains = {int(length): count for length, count in aggregate['chains'].items()}
+    return {
+        'rolls': rolls,
+        'red_die_p': red_p,
+        'faces_p': faces_p,
+        'longest_chain': max((length for length, count in chains.items() if count), default=0),
+        'explosion_rate': sum(count for length, count in chains.items() if length) / rolls if rolls else 0.0,
+        'critical_rate': aggregate['critical'] / rolls if rolls else 0.0,
+        'success_rate': aggregate['successes'] / aggregate['with_target'] if aggregate['with_target'] else None,
+        'expected_success_rate': (aggregate['expected_successes'] / aggregate['with_target']
+                                  if aggregate['with_target'] else None),
+        # Glück: durchschnittliche Abweichung des Ergebnisses vom Erwartungswert
+        'luck': (aggregate['result_sum'] - aggregate['expected_sum']) / rolls if rolls else 0.0,
+    }
+
+
+def print_report(state, scope, limit=20):
+    rows = sorted(state[scope].items(), key=lambda item: -item[1]['rolls'])[:limit]
+    print(f"\n{scope:>24s} | Würfe  | Rot p  | Glück | Explos. | Kette | Krit.  | Erfolg (Theorie)")
+    for key, aggregate in rows:
+        s = summarize(aggregate)
+        success = (f"{s['success_rate']:.0%} ({s['expected_success_rate']:.0%})"
+                   if s['success_rate'] is not None else '-')
+        print(f"{key[:24]:>24s} | {s['rolls']:6d} | {s['red_die_p']:.3f}  | {s['luck']:+5.2f} | "
+              f"{s['explosion_rate']:6.1%}  | {s['longest_chain']:5d} | {s['critical_rate']:5.1%}  | {success}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    state_file = STATE_FILE
+    if '--state' in args:
+        index = args.index('--state')
+        state_file = args[index + 1]
+        del args[index:index + 2]
+    state = new_state() if '--reset' in args else load_state(state_file)
+    files = [arg for arg in args if arg != '--reset']
+
+    for filepath in files:
+        added, skipped = ingest(state, iter_records(filepath))
+        print(f"{filepath}: {added} neue Würfe, {skipped} übersprungen")
+    if files:
+        save_state(state, state_file)
+
+    total = summarize(state['total'])
+    print(f"\n{state['rows']} Würfe insgesamt (Stand {state['watermark'] or '-'})")
+    print(f"Roter Würfel: Chi² p = {total['red_die_p']:.3f}, alle Würfel: p = {total['faces_p']:.3f}")
+    for scope in SCOPES:
+        print_report(state, scope)
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Vergleicht die alten Extraktionsskripte mit dem neuen Kern (ods_core + Vorlagen)
+
+Beide Seiten laufen über die FM/-Arbeitsmappen und über erzeugte synthetische
+Mappen. Jede abweichende Zelle bzw. jedes abweichende Feld wird mit Grund
+protokolliert; bekannte Gründe (bewusste Fehlerkorrekturen) gelten als erklärt.
+Zusätzlich wird pro Extraktor das Laufzeitverhältnis alt/neu ausgegeben.
+"""
+import bisect
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+from character_aliases import default_aliases
+from ods_core import TABLE_NS, TABLE_TAG, ROW_TAG, read_workbook, grid_rows, iter_content_chunks
+from sheet_layouts import load_layouts, match_layout, compile_layout, extract_with_layout, extract_skills, convert_w_to_d
+from layout_detect import get_region_map
+from extract_gesinnung_full import read_gesinnung_full, build_gesinnung, gesinnung_result
+from extract_gesinnung import read_gesinnung_complete
+from extract_all_attributes import read_sheet_data, extract_character_complete
+from analyze_skills import analyze_skills
+from analyze_georg_attributes import analyze_georg_sheet
+
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+REPORT_FILE = 'equivalence_report.json'
+TIMING_RUNS = 3
+SYNTHETIC_COUNT = 5
+
+ROW_SHIFT = "Zeilenindex: Altskript zählt table-row-Elemente, der Kern echte Zeilen (number-rows-repeated)"
+SKILL_TOTAL_COLUMN = "Fehlerkorrektur: Gesamtwert steht in Spalte D, das Altskript liest Spalte E"
+EMPTY_SHEET = "Leeres Blatt: der Kern liefert dafür kein Grid, das Altskript einen leeren Datensatz"
+OUTSIDE_BLOCKS = "Zeile liegt außerhalb der Fertigkeitsblöcke der Vorlage (Altskript liest jede Zeile ab 32)"
+ATTRIBUTE_TOTAL_COLUMN = "Fehlerkorrektur: Attributwert steht in Spalte D der Vorlage, das Altskript liest Spalte E"
+NOT_AN_ATTRIBUTE_ROW = "Zeile ist kein Attribut der Vorlage (Altskript nimmt jede belegte Zeile 10-31)"
+TEMPLATE_ATTRIBUTE = "Kern liest Attribute an den Vorlagenadressen, das Altskript sucht D&D-Namen in Spalte E"
+NO_CHARACTER_SHEET = "Blatt passt zu keiner Vorlage: der Kern liefert keinen Charakter, das Altskript einen Datensatz"
+LEGACY_ROW_RANGE = ("Altskript liest feste table-row-Elemente (Attribute 9-30, Fertigkeiten 32-135); "
+                    "in zusammengefassten Blättern liegt die Zeile oder ihre Blocküberschrift außerhalb")
+PLAYER_SUFFIX = "Fehlerkorrektur: Blatt-Suffix und Schreibweise über character_aliases.json ('JJ__V2' -> 'JJ')"
+
+# Elementbereiche, die analyze_georg_sheet bzw. analyze_skills durchlaufen
+LEGACY_ATTRIBUTE_ELEMENTS = range(9, 31)
+LEGACY_SKILL_ELEMENTS = range(32, 136)
+# Spalten, aus denen beide Altskripte Name, Basis, Bonus und Gesamtwert lesen
+LEGACY_COLUMNS = {'name': 0, 'base': 1, 'bonus': 2, 'total': 4}
+
+# Felder, die beide Seiten liefern; Fertigkeiten vergleicht analyze_skills
+CHARACTER_FIELDS = ('name', 'playerName', 'class', 'race', 'level', 'attributes', 'inventory')
+
+
+# --- Hilfen für die Altskripte ---------------------------------------------
+
+def legacy_root(filepath):
+    with zipfile.ZipFile(filepath, 'r') as z:
+        return ET.fromstring(z.read('content.xml'))
+
+
+def legacy_sheets(root):
+    return {sheet.get(TABLE_NS + 'name'): sheet for sheet in root.iter(TABLE_TAG)}
+
+
+def row_element_map(filepath):
+    """{Blatt: [echte Zeile je table-row-Element]} - nur für die Erklärung von Abweichungen"""
+    result = {}
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    sheet_name = None
+    real_row = 0
+    for chunk in iter_content_chunks(filepath):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start' and elem.tag == TABLE_TAG:
+                sheet_name = elem.get(TABLE_NS + 'name')
+                result[sheet_name] = []
+                real_row = 0
+            elif event == 'end' and elem.tag == ROW_TAG:
+                result[sheet_name].append(real_row)
+                real_row += int(elem.get(TABLE_NS + 'number-rows-repeated') or '1')
+                elem.clear()
+    parser.close()
+    return result
+
+
+@contextlib.contextmanager
+def quiet_legacy():
+    """Altskripte drucken viel und schreiben JSON ins Arbeitsverzeichnis - beides umleiten"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(tmp_dir)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def georg_layout():
+    return next(layout for layout in load_layouts() if layout['name'] == 'georg')
+
+
+def sheet_layouts(workbook, cache=None):
+    """{Blatt: kompilierte Vorlage} wie im Kern: feste Vorlage, sonst erkannte Bereichskarte"""
+    if cache is None:
+        cache = {}
+    layouts = {}
+    for sheet_name, grid in workbook.items():
+        layout = match_layout(grid)
+        if layout is None:
+            fingerprint, region_map, _ = get_region_map(grid, cache)
+            if region_map is None:
+                continue
+            layout = compile_layout(fingerprint[:12], region_map)
+        layouts[sheet_name] = layout
+    return layouts
+
+
+def cell_text(workbook, sheet, row, col):
+    grid = workbook.get(sheet)
+    cell = grid.get((row, col)) if grid else None
+    return cell.text if cell else ''
+
+
+def legacy_player_name(sheet_name):
+    """Spielername, wie extract_character_complete ihn aus dem Blattnamen bildet"""
+    return sheet_name.replace('_V2', '').replace('__V2', '').replace('Korbi', 'Kobi')
+
+
+def non_empty_rows(rows):
+    return {(row_idx, col): text for row_idx, row in enumerate(rows) for col, text in enumerate(row) if text}
+
+
+# --- Extraktoren: (alt, neu) liefern jeweils {(Blatt, Zeile, Feld): Wert} ----
+
+def legacy_sheet_data(filepath):
+    result = {}
+    for name, sheet in legacy_sheets(legacy_root(filepath)).items():
+        for (row, col), text in non_empty_rows(read_sheet_data(sheet)).items():
+            result[(name, row, col)] = text
+    return result
+
+
+def core_sheet_data(filepath):
+    result = {}
+    for name, grid in read_workbook(filepath, legacy_columns=True).items():
+        for (row, col), text in non_empty_rows(grid_rows(grid, 15)).items():
+            result[(name, row, col)] = text
+    return result
+
+
+def _flatten_character(name, char):
+    result = {}
+    for key, value in char.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                result[(name, None, f"{key}.{sub_key}")] = sub_value
+        elif isinstance(value, list):
+            result[(name, None, key)] = json.dumps(value, ensure_ascii=False)
+        else:
+            result[(name, None, key)] = value
+    return result
+
+
+def legacy_characters(filepath):
+    result = {}
+    for name, sheet in legacy_sheets(legacy_root(filepath)).items():
+        result.update(_flatten_character(name, extract_character_complete(name, read_sheet_data(sheet))))
+    return result
+
+
+def core_characters(filepath):
+    """Charaktere aus sheet_layouts bzw. layout_detect (Vorlagenadressen)"""
+    workbook = read_workbook(filepath)
+    result = {}
+    for name, layout in sheet_layouts(workbook).items():
+        char = extract_with_layout(name, workbook[name], layout)
+        result.update(_flatten_character(name, {key: char[key] for key in CHARACTER_FIELDS}))
+    return result
+
+
+def _skill_fields(skills):
+    result = {}
+    for skill in skills:
+        for field in ('attribute', 'name', 'base', 'bonus', 'total'):
+            result[('Georg', skill['row'], field)] = skill.get(field, '')
+    return result
+
+
+def legacy_skills(filepath):
+    found = analyze_skills(filepath)
+    return _skill_fields(found[0]) if found else {}
+
+
+def core_skills(filepath):
+    grid = read_workbook(filepath, ['Georg'])['Georg']
+    if not grid:
+        return {}
+    return _skill_fields(extract_skills(grid, georg_layout()))
+
+
+def legacy_georg_attributes(filepath):
+    # Die Vorlage kennt je Attribut nur den Wert; Basis und Bonus vergleicht niemand
+    result = {}
+    for attr in analyze_georg_sheet(filepath) or []:
+        result[('Georg', attr['row'], 'name')] = attr['name']
+        result[('Georg', attr['row'], 'total')] = attr['total']
+    return result
+
+
+def core_georg_attributes(filepath):
+    """Attribute des Blatts Georg über die Vorlage georg"""
+    grid = read_workbook(filepath, ['Georg'])['Georg']
+    if not grid:
+        return {}
+    layout = georg_layout()
+    char = extract_with_layout('Georg', grid, layout)
+    result = {}
+    for attr_name, (row, _) in layout['attributes'].items():
+        result[('Georg', row, 'name')] = attr_name
+        if attr_name in char['attributes']:
+            result[('Georg', row, 'total')] = char['attributes'][attr_name]
+    return result
+
+
+def _gesinnung_fields(result):
+    fields = {}
+    for row_key, entries in (result or {}).items():
+        for col, entry in enumerate(entries):
+            for field, value in entry.items():
+                fields[('Gesinnung', None, f"{row_key}[{col}].{field}")] = value
+    return fields
+
+
+def legacy_gesinnung_full(filepath):
+    found = read_gesinnung_full(filepath)
+    return _gesinnung_fields(gesinnung_result(*found)) if found else {}
+
+
+def _core_gesinnung_rows(filepath):
+    grid = read_workbook(filepath, ['Gesinnung'], legacy_columns=True)['Gesinnung']
+    rows = grid_rows(grid, 3)
+    return {row_idx: row for row_idx, row in enumerate(rows) if any(row)}, len(rows)
+
+
+def core_gesinnung_full(filepath):
+    all_data, row_count = _core_gesinnung_rows(filepath)
+    if not all_data:
+        return {}
+    return _gesinnung_fields(gesinnung_result(*build_gesinnung(all_data, row_count)))
+
+
+def legacy_gesinnung_complete(filepath):
+    found = read_gesinnung_complete(filepath)
+    if not found:
+        return {}
+    gesinnungen, _, all_data = found
+    fields = {('Gesinnung', None, f"gesinnungen.{key}"): value for key, value in gesinnungen.items()}
+    for row_idx, row in all_data.items():
+        for col, text in enumerate(row):
+            if text:
+                fields[('Gesinnung', row_idx, col)] = text
+    return fields
+
+
+def core_gesinnung_complete(filepath):
+    all_data, _ = _core_gesinnung_rows(filepath)
+    fields = {}
+    for quad_row, actual_row in enumerate([0, 2, 4]):
+        if actual_row in all_data:
+            for col in range(3):
+                fields[('Gesinnung', None, f"gesinnungen.{quad_row}-{col}")] = all_data[actual_row][col]
+    for row_idx, row in all_data.items():
+        for col, text in enumerate(row):
+            if text:
+                fields[('Gesinnung', row_idx, col)] = text
+    return fields
+
+
+# Name, Altfunktion, neue Funktion, benötigtes Blatt (None = alle Blätter)
+EXTRACTORS = [
+    ('read_sheet_data', legacy_sheet_data, core_sheet_data, None),
+    ('extract_character_complete', legacy_characters, core_characters, None),
+    ('analyze_skills', legacy_skills, core_skills, 'Georg'),
+    ('analyze_georg_sheet', legacy_georg_attributes, core_georg_attributes, 'Georg'),
+    ('read_gesinnung_full', legacy_gesinnung_full, core_gesinnung_full, 'Gesinnung'),
+    ('read_gesinnung_complete', legacy_gesinnung_complete, core_gesinnung_complete, 'Gesinnung'),
+]
+
+
+# --- Vergleich ---------------------------------------------------------------
+
+def to_real_row(row_map, element_idx):
+    """Echte Zeile zu einem table-row-Elementindex des Altskripts"""
+    return row_map[element_idx] if 0 <= element_idx < len(row_map) else None
+
+
+def to_element_row(row_map, row):
+    """table-row-Elementindex, in dem eine echte Zeile liegt"""
+    element_idx = bisect.bisect_right(row_map, row) - 1
+    return element_idx if element_idx >= 0 else None
+
+
+def skill_block(row):
+    return next((block for block in georg_layout()['skill_blocks'] if block[1] <= row <= block[2]), None)
+
+
+def skill_cell(context, sheet, row, field):
+    """Wert eines Fertigkeitsfelds laut Vorlage georg direkt aus der Mappe"""
+    if field == 'attribute':
+        block = skill_block(row)
+        return block[0] if block else None
+    return cell_text(context['grids'], sheet, row, georg_layout()['skill_columns'][field])
+
+
+def legacy_cell_matches(context, sheet, row, field, value):
+    """Stammt der Wert des Altskripts wirklich aus der Zelle, die es an dieser Zeile liest?"""
+    if field == 'attribute':
+        return value in georg_layout()['attributes']
+    return value == cell_text(context['legacy_grids'], sheet, row, LEGACY_COLUMNS[field])
+
+
+def explain_skills(sheet, row, field, value, legacy_side, new, context):
+    if not legacy_side and value == skill_cell(context, sheet, row, field):
+        # Ohne gelesene Blocküberschrift verwirft das Altskript auch die Fertigkeiten darunter
+        block = skill_block(row)
+        row_map = context['row_map'].get(sheet, [])
+        if any(to_element_row(row_map, check_row) not in LEGACY_SKILL_ELEMENTS
+               for check_row in (row, block[1] - 1 if block else row)):
+            return LEGACY_ROW_RANGE
+    if field == 'total':
+        column_d = cell_text(context['grids'], sheet, row, 3)
+        if not legacy_side and value == column_d:
+            return SKILL_TOTAL_COLUMN
+        if (legacy_side and legacy_cell_matches(context, sheet, row, field, value)
+                and new.get((sheet, row, 'total')) == column_d):
+            return SKILL_TOTAL_COLUMN
+    if (legacy_side and (sheet, row, field) not in new and not context['in_skill_block'](row)
+            and legacy_cell_matches(context, sheet, row, field, value)):
+        return OUTSIDE_BLOCKS
+    return None
+
+
+def explain_georg_attributes(sheet, row, field, value, legacy_side, new, context):
+    attribute_rows = context['attribute_rows']
+    if (not legacy_side and field == 'name' and value == cell_text(context['grids'], sheet, row, 0)
+            and to_element_row(context['row_map'].get(sheet, []), row) not in LEGACY_ATTRIBUTE_ELEMENTS):
+        return LEGACY_ROW_RANGE
+    if field == 'total' and row in attribute_rows:
+        column_d = convert_w_to_d(cell_text(context['grids'], sheet, row, 3))
+        if not legacy_side and value == column_d:
+            return ATTRIBUTE_TOTAL_COLUMN
+        if (legacy_side and legacy_cell_matches(context, sheet, row, field, value)
+                and new.get((sheet, row, 'total')) == column_d):
+            return ATTRIBUTE_TOTAL_COLUMN
+    if (legacy_side and row not in attribute_rows and (sheet, row, field) not in new
+            and legacy_cell_matches(context, sheet, row, field, value)):
+        return NOT_AN_ATTRIBUTE_ROW
+    return None
+
+
+def explain_characters(sheet, row, field, value, legacy_side, new, context):
+    layout = context['sheet_layouts'].get(sheet)
+    if layout is None:
+        return NO_CHARACTER_SHEET if legacy_side else None
+    if not legacy_side and field.startswith('attributes.'):
+        pos = layout['attributes'].get(field.split('.', 1)[1])
+        if pos and value == convert_w_to_d(cell_text(context['grids'], sheet, *pos)):
+            return TEMPLATE_ATTRIBUTE
+    if field == 'playerName':
+        fixed = default_aliases().display_player(sheet)
+        legacy_value, new_value = (value, new.get((sheet, row, field))) if legacy_side else (None, value)
+        if new_value == fixed and (not legacy_side or legacy_value == legacy_player_name(sheet)):
+            return PLAYER_SUFFIX
+    return None
+
+
+EXPLAINERS = {
+    'extract_character_complete': explain_characters,
+    'analyze_skills': explain_skills,
+    'analyze_georg_sheet': explain_georg_attributes,
+}
+
+
+def explain_side(extractor, key, legacy, new, context, legacy_side):
+    """Grund für den Wert einer Seite, geprüft an der Gegenseite bzw. an den Zellen der Mappe"""
+    sheet, row, field = key
+    value = legacy[key] if legacy_side else new[key]
+    if legacy_side and sheet in context['empty_sheets']:
+        return EMPTY_SHEET
+    if row is not None:
+        row_map = context['row_map'].get(sheet, [])
+        # Verschobene Zeile: derselbe Wert muss an der umgerechneten Zeile der Gegenseite stehen
+        other_row, other = (to_real_row(row_map, row), new) if legacy_side else (to_element_row(row_map, row), legacy)
+        if other_row is not None and other_row != row and other.get((sheet, other_row, field)) == value:
+            return ROW_SHIFT
+        if legacy_side:
+            row = other_row
+    explainer = EXPLAINERS.get(extractor)
+    return explainer(sheet, row, field, value, legacy_side, new, context) if explainer else None
+
+
+def explain(extractor, key, legacy, new, context):
+    """Liefert den bekannten Grund einer Abweichung oder None
+
+    Jede Seite, die das Feld liefert, muss für sich erklärt sein.
+    """
+    reasons = [explain_side(extractor, key, legacy, new, context, legacy_side)
+               for legacy_side, values in ((True, legacy), (False, new)) if key in values]
+    if not reasons or None in reasons:
+        return None
+    return reasons[0]
+
+
+def compare(extractor, legacy, new, context):
+    diffs = []
+    for key in sorted(set(legacy) | set(new), key=lambda k: tuple('' if v is None else str(v) for v in k)):
+        legacy_value = legacy.get(key)
+        new_value = new.get(key)
+        if legacy_value == new_value:
+            continue
+        diffs.append({
+            'sheet': key[0],
+            'row': key[1],
+            'field': key[2],
+            'legacy': legacy_value,
+            'new': new_value,
+            'reason': explain(extractor, key, legacy, new, context),
+        })
+    return diffs
+
+
+def best_time(func, filepath, legacy):
+    best = None
+    result = None
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        if legacy:
+            with quiet_legacy():
+                result = func(filepath)
+        else:
+            result = func(filepath)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def check_workbook(filepath):
+    row_map = row_element_map(filepath)
+    layout = georg_layout()
+    blocks = layout['skill_blocks']
+    grids = read_workbook(filepath)
+    context = {
+        'row_map': row_map,
+        'grids': grids,
+        'legacy_grids': read_workbook(filepath, legacy_columns=True),
+        'sheet_layouts': sheet_layouts(grids),
+        'attribute_rows': {row for row, _ in layout['attributes'].values()},
+        'empty_sheets': set(row_map) - set(grids),
+        'in_skill_block': lambda row: row is not None and any(first <= row <= last for _, first, last in blocks),
+    }
+    results = []
+    for name, legacy_func, core_func, needed_sheet in EXTRACTORS:
+        if needed_sheet is not None and needed_sheet not in row_map:
+            continue
+        legacy, legacy_time = best_time(legacy_func, filepath, legacy=True)
+        new, core_time = best_time(core_func, filepath, legacy=False)
+        diffs = compare(name, legacy, new, context)
+        results.append({
+            'extractor': name,
+            'fields': len(set(legacy) | set(new)),
+            'legacy_seconds': round(legacy_time, 4),
+            'core_seconds': round(core_time, 4),
+            'speedup': round(legacy_time / core_time, 2) if core_time else None,
+            'explained': sum(1 for diff in diffs if diff['reason']),
+            'unexplained': sum(1 for diff in diffs if not diff['reason']),
+            'diffs': diffs,
+        })
+    return results
+
+
+# --- Synthetische Arbeitsmappen ----------------------------------------------
+
+_MANIFEST = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" '
+             'manifest:version="1.2">'
+             '<manifest:file-entry manifest:full-path="/" '
+             'manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>'
+             '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+             '</manifest:manifest>')
+
+_CONTENT_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<office:document-content '
+                 'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+                 'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+                 'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+                 'office:version="1.2"><office:body><office:spreadsheet>')
+_CONTENT_TAIL = '</office:spreadsheet></office:body></office:document-content>'
+
+
+def _cell_xml(text, rng, span=1):
+    attrs = f' table:number-columns-spanned="{span}"' if span > 1 else ''
+    if not text:
+        return f'<table:table-cell{attrs}/>'
+    paragraphs = text.split(' ', 1) if ' ' in text and rng.random() < 0.2 else [text]
+    body = ''.join(f'<text:p>{escape(part)}</text:p>' for part in paragraphs)
+    return f'<table:table-cell office:value-type="string"{attrs}>{body}</table:table-cell>'
+
+
+def _row_xml(cells, rng, spanned=False):
+    """Gleiche Nachbarzellen werden wie bei LibreOffice per number-columns-repeated zusammengefasst"""
+    parts = []
+    col = 0
+    while col < len(cells):
+        text = cells[col]
+        if spanned:
+            parts.append(_cell_xml(text, rng, span=2) + '<table:covered-table-cell/>')
+            col += 1
+            continue
+        run = 1
+        while col + run < len(cells) and cells[col + run] == text:
+            run += 1
+        if run > 1:
+            cell = _cell_xml(text, rng)
+            parts.append(cell.replace('<table:table-cell', f'<table:table-cell table:number-columns-repeated="{run}"', 1))
+        else:
+            parts.append(_cell_xml(text, rng))
+        col += run
+    parts.append('<table:table-cell table:number-columns-repeated="1000"/>')
+    return '<table:table-row>' + ''.join(parts) + '</table:table-row>'
+
+
+def _sheet_xml(name, rows, rng, spanned=False, collapse_empty=False):
+    parts = [f'<table:table table:name="{escape(name)}">']
+    height = max(rows) + 1 if rows else 0
+    row_idx = 0
+    while row_idx < height:
+        if row_idx not in rows and collapse_empty:
+            run = 1
+            while row_idx + run < height and row_idx + run not in rows:
+                run += 1
+            parts.append(f'<table:table-row table:number-rows-repeated="{run}">'
+                         '<table:table-cell table:number-columns-repeated="1024"/></table:table-row>')
+            row_idx += run
+            continue
+        parts.append(_row_xml(rows.get(row_idx, []), rng, spanned))
+        row_idx += 1
+    parts.append('<table:table-row table:number-rows-repeated="1048000">'
+                 '<table:table-cell table:number-columns-repeated="1024"/></table:table-row>')
+    parts.append('</table:table>')
+    return ''.join(parts)
+
+
+def _dice(rng):
+    return f"{rng.randint(1, 5)}W" + (f"+{rng.randint(1, 2)}" if rng.random() < 0.3 else '')
+
+
+def synthetic_georg_rows(rng):
+    layout = georg_layout()
+    rows = {
+        0: ['Allgemein'],
+        2: ['Name Karakter', f"Held{rng.randint(1, 99)}", '', '', '', '', 'Name Spieler', 'Georg'],
+        4: ['Klasse', rng.choice(['Krieger', 'Magier', 'Händler']), '', 'Rasse',
+            rng.choice(['Mensch', 'Elf', 'Zwerg']), '', 'Stufe', str(rng.randint(1, 9))],
+        8: ['Attribute'],
+        31: ['Fähigkeiten'],
+    }
+    for attr_name, (row, _) in layout['attributes'].items():
+        rows[row] = [attr_name, _dice(rng), str(rng.randint(0, 2)), _dice(rng)]
+    for attr_name, first_row, last_row in layout['skill_blocks']:
+        rows[first_row - 1] = [attr_name]
+        for row in range(first_row, last_row + 1):
+            if rng.random() < 0.8:
+                rows[row] = [f"Fertigkeit {row}", _dice(rng), str(rng.randint(0, 3)),
+                             f"W{rng.randint(1, 6)}+{rng.randint(0, 2)}",
+                             _dice(rng) if rng.random() < 0.1 else '']
+    return rows
+
+
+def synthetic_gesinnung_rows(rng):
+    names = [['Rechtschaffen gut', 'Neutral gut', 'Chaotisch gut'],
+             ['Rechtschaffen neutral', 'Neutral', 'Chaotisch neutral'],
+             ['Rechtschaffen böse', 'Neutral böse', 'Chaotisch böse']]
+    rows = {0: names[0], 2: names[1], 4: names[2]}
+    row = 6
+    for name in rng.sample([name for triple in names for name in triple], 6):
+        rows[row] = [f"{name}: Beschreibung {rng.randint(1, 1000)} & mehr <Text>"]
+        row += rng.choice([1, 2])
+    return rows
+
+
+def write_synthetic_workbook(filepath, seed):
+    """Erzeugt eine kleine .ods-Mappe mit Georg-, V2-ähnlichem und Gesinnungs-Blatt"""
+    rng = random.Random(seed)
+    collapse = seed % 2 == 1
+    sheets = [
+        _sheet_xml('Georg', synthetic_georg_rows(rng), rng, collapse_empty=collapse),
+        _sheet_xml('Gesinnung', synthetic_gesinnung_rows(rng), rng, spanned=True, collapse_empty=collapse),
+    ]
+    with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo('mimetype'), 'application/vnd.oasis.opendocument.spreadsheet')
+        zf.writestr('META-INF/manifest.xml', _MANIFEST)
+        zf.writestr('content.xml', _CONTENT_HEAD + ''.join(sheets) + _CONTENT_TAIL)
+
+
+# --- Bericht -----------------------------------------------------------------
+
+def print_summary(filepath, results):
+    print(f"\n{filepath}")
+    for result in results:
+        status = 'OK' if not result['unexplained'] else 'ABWEICHUNG'
+        print(f"  {result['extractor']:28s} {status:10s} | {result['fields']:5d} Felder | "
+              f"erklärt {result['explained']:4d} | unerklärt {result['unexplained']:3d} | "
+              f"alt {result['legacy_seconds'] * 1000:7.1f} ms, neu {result['core_seconds'] * 1000:7.1f} ms "
+              f"(x{result['speedup']})")
+        reasons = {}
+        for diff in result['diffs']:
+            reasons[diff['reason']] = reasons.get(diff['reason'], 0) + 1
+        for reason, count in reasons.items():
+            if reason:
+                print(f"      {count:4d}x {reason}")
+        for diff in [diff for diff in result['diffs'] if not diff['reason']][:5]:
+            print(f"      {diff['sheet']} Zeile {diff['row']} {diff['field']}: "
+                  f"{diff['legacy']!r} -> {diff['new']!r}")
+
+
+if __name__ == "__main__":
+    files = sys.argv[1:] or [os.path.join('FM', name) for name in sorted(os.listdir('FM'))
+                             if name.lower().endswith('.ods')]
+    files = [os.path.abspath(filepath) for filepath in files]
+
+    report = {}
+    unexplained = 0
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        for seed in range(SYNTHETIC_COUNT):
+            filepath = os.path.join(synthetic_dir, f"synthetisch_{seed}.ods")
+            write_synthetic_workbook(filepath, seed)
+            files.append(filepath)
+
+        for filepath in files:
+            results = check_workbook(filepath)
+            label = os.path.basename(filepath)
+            report[label] = results
+            unexplained += sum(result['unexplained'] for result in results)
+            print_summary(label, results)
+
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\nBericht in {REPORT_FILE} gespeichert")
+    if unexplained:
+        print(f"{unexplained} unerklärte Abweichungen!")
+        sys.exit(1)
@@ -7,6 +7,8 @@ import json
 import sys
 import re
 
+from character_aliases import AliasTable, load_aliases
+
 if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -143,6 +145,10 @@ if __name__ == "__main__":
         if name and name != 'Spielleiter' and not name.startswith('.'):
             all_sheets[name] = sheet
     
+    # Blatt-Suffixe und Schreibweisen (Korbi -> Kobi) aus character_aliases.json;
+    # fehlt die Datei, bricht load_aliases mit FileNotFoundError ab
+    aliases = AliasTable(load_aliases())
+
     # Extrahiere Basis-Charaktere
     base_chars = {}
     v2_chars = {}
@@ -152,7 +158,7 @@ if __name__ == "__main__":
         char = extract_character_complete(sheet_name, sheet_data)
         
         if '_V2' in sheet_name or '__V2' in sheet_name:
-            base_name = sheet_name.replace('_V2', '').replace('__V2', '').replace('Korbi', 'Kobi')
+            base_name = aliases.display_player(sheet_name)
             v2_chars[base_name] = char
         else:
             base_chars[sheet_name] = char
@@ -57,6 +57,10 @@ def read_gesinnung_full(filepath):
         if any(row_data):
             all_data[row_idx] = row_data
     
+    return build_gesinnung(all_data, len(rows))
+
+def build_gesinnung(all_data, row_count):
+    """Baut Quadrat und Beschreibungen aus {Zeile: [Spalte 0-2]} auf"""
     # Das Gesinnungsquadrat: Zeilen 0, 2, 4
     quadrat_rows = [0, 2, 4]
     gesinnungen = {}
@@ -72,7 +76,7 @@ def read_gesinnung_full(filepath):
     
     # Suche Beschreibungen - sie könnten in den Zeilen danach sein
     # Zeile 6+ scheinen Beschreibungen zu enthalten
-    for row_idx in range(6, min(30, len(rows))):
+    for row_idx in range(6, min(30, row_count)):
         if row_idx in all_data and all_data[row_idx][0]:
             text = all_data[row_idx][0]
             # Versuche, den Gesinnungsnamen am Anfang zu finden
@@ -90,20 +94,25 @@ def read_gesinnung_full(filepath):
     
     return gesinnungen, descriptions
 
+def gesinnung_result(gesinnungen, descriptions):
+    """Formt das Ergebnis in die Struktur von gesinnungen.json um"""
+    result = {}
+    for row in range(3):
+        row_data = []
+        for col in range(3):
+            key = f"{row}-{col}"
+            name = gesinnungen.get(key, "")
+            desc = descriptions.get(key, "")
+            row_data.append({"name": name, "description": desc})
+        result[f"row_{row}"] = row_data
+    return result
+
 if __name__ == "__main__":
     filepath = "Spielleiter-Infos - geheim!.ods"
     gesinnungen, descriptions = read_gesinnung_full(filepath)
     
     if gesinnungen:
-        result = {}
-        for row in range(3):
-            row_data = []
-            for col in range(3):
-                key = f"{row}-{col}"
-                name = gesinnungen.get(key, "")
-                desc = descriptions.get(key, "")
-                row_data.append({"name": name, "description": desc})
-            result[f"row_{row}"] = row_data
+        result = gesinnung_result(gesinnungen, descriptions)
         
         with open('gesinnungen.json', 'w', encoding='utf-8') as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
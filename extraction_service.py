@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Lokaler HTTP-Dienst, der geparste Arbeitsmappen warm im Speicher hält"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import traceback
+import zipfile
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from ods_core import read_workbook, parse_range, grid_rows, is_workbook_file, READ_ERRORS
+from layout_detect import get_region_map
+from sheet_layouts import compile_layout, extract_with_layout
+from extract_gesinnung_full import build_gesinnung, gesinnung_result
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_HEADER_LINES = 100
+# Obergrenze für /sheet/<Blatt>?range=..., gezählt nach Beschneiden auf das belegte Blatt
+MAX_RANGE_CELLS = 200000
+
+
+def file_hash(filepath):
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_gesinnung(filepath):
+    """Gesinnungs-Quadrat; die alten Spalten (ohne verdeckte Zellen) liefert nur ein eigener Lesedurchlauf"""
+    grid = read_workbook(filepath, ['Gesinnung'], legacy_columns=True)['Gesinnung']
+    rows = grid_rows(grid, 3)
+    all_data = {row_idx: row for row_idx, row in enumerate(rows) if any(row)}
+    gesinnungen, descriptions = build_gesinnung(all_data, len(rows))
+    return gesinnung_result(gesinnungen, descriptions)
+
+
+class WorkbookStore:
+    """Hält geparste Arbeitsmappen und lädt sie bei geänderter mtime/Hash neu"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}
+        self.region_cache = {}
+        self.compiled = {}
+        self.failed = {}
+        self.generation = 0
+
+    def refresh(self):
+        """Prüft alle .ods/.fods-Dateien per stat; parst nur bei geändertem Inhalt neu
+
+        Eine Datei, die sich nicht lesen lässt, behält ihren letzten guten
+        Stand (oder fehlt); sie wird erst nach der nächsten Änderung erneut
+        versucht.
+        """
+        seen = set()
+        for entry in os.scandir(self.directory):
+            if not is_workbook_file(entry.name):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            seen.add(entry.name)
+            stamp = (st.st_mtime_ns, st.st_size)
+            current = self.entries.get(entry.name)
+            if (current and current['stamp'] == stamp) or self.failed.get(entry.name) == stamp:
+                continue
+            try:
+                digest = file_hash(entry.path)
+                if current and current['hash'] == digest:
+                    current['stamp'] = stamp
+                    continue
+                sheets = read_workbook(entry.path)
+                gesinnung = read_gesinnung(entry.path) if 'Gesinnung' in sheets else None
+            except READ_ERRORS as e:
+                self.failed[entry.name] = stamp
+                print(f"Überspringe {entry.name}: {e}")
+                continue
+            self.failed.pop(entry.name, None)
+            self.entries[entry.name] = {
+                'path': entry.path,
+                'stamp': stamp,
+                'hash': digest,
+                'sheets': sheets,
+                'gesinnung': gesinnung,
+            }
+            self.generation += 1
+        for name in list(self.failed):
+            if name not in seen:
+                del self.failed[name]
+        for name in list(self.entries):
+            if name not in seen:
+                del self.entries[name]
+                self.generation += 1
+
+    def characters(self):
+        characters = []
+        for workbook_name, entry in sorted(self.entries.items()):
+            for sheet_name, grid in entry['sheets'].items():
+                fingerprint, region_map, _ = get_region_map(grid, self.region_cache)
+                if region_map is None:
+                    continue
+                if fingerprint not in self.compiled:
+                    self.compiled[fingerprint] = compile_layout(fingerprint[:12], region_map)
+                char = extract_with_layout(sheet_name, grid, self.compiled[fingerprint])
+                char['sheet'] = sheet_name
+                char['workbook'] = workbook_name
+                characters.append(char)
+        return characters
+
+    def skills(self, sheet=None):
+        """Fertigkeiten im Format von skills_structure.json (erstes Blatt mit Attributgruppen)"""
+        for char in self.characters():
+            if sheet is not None and char['sheet'] != sheet:
+                continue
+            if sheet is None and not any(skill['attribute'] for skill in char['skills']):
+                continue
+            by_attribute = {}
+            for skill in char['skills']:
+                by_attribute.setdefault(skill['attribute'], []).append(skill)
+            return {'sheet': char['sheet'], 'skills': char['skills'], 'by_attribute': by_attribute}
+        return None
+
+    def gesinnung(self):
+        for entry in self.entries.values():
+            if entry['gesinnung'] is not None:
+                return entry['gesinnung']
+        return None
+
+    def sheet_range(self, sheet, range_str, workbook=None):
+        """Zellen eines Bereichs; der Bereich endet an der letzten belegten Zeile/Spalte des Blatts"""
+        for workbook_name, entry in sorted(self.entries.items()):
+            if workbook is not None and workbook_name != workbook:
+                continue
+            grid = entry['sheets'].get(sheet)
+            if grid is None:
+                continue
+            (first_row, first_col), (last_row, last_col) = parse_range(range_str)
+            # Nur die dünn besetzten Zeilen ansehen, nicht jede Adresse des Bereichs
+            used_row = first_row - 1
+            used_col = first_col - 1
+            for row, row_cells in grid.rows.items():
+                if first_row <= row <= last_row:
+                    cols = [col for col in row_cells if first_col <= col <= last_col]
+                    if cols:
+                        used_row = max(used_row, row)
+                        used_col = max(used_col, max(cols))
+            last_row, last_col = used_row, used_col
+            cells = (last_row - first_row + 1) * (last_col - first_col + 1)
+            if cells > MAX_RANGE_CELLS:
+                raise ValueError(f"Bereich zu groß ({cells} Zellen, höchstens {MAX_RANGE_CELLS})")
+            rows = []
+            for row in range(first_row, last_row + 1):
+                row_cells = grid.row(row)
+                rows.append([row_cells[col].text if col in row_cells else ''
+                             for col in range(first_col, last_col + 1)])
+            return {'workbook': workbook_name, 'sheet': sheet, 'range': range_str.upper(), 'rows': rows}
+        return None
+
+
+class ExtractionService:
+    def __init__(self, directory):
+        self.store = WorkbookStore(directory)
+        self.responses = {}
+        self.response_generation = -1
+
+    def route(self, path, query):
+        """Liefert (Status, Daten) für eine Anfrage"""
+        if path == '/characters':
+            return 200, self.store.characters()
+        if path == '/skills':
+            data = self.store.skills(query.get('sheet', [None])[0])
+            return (200, data) if data is not None else (404, {'error': 'Keine Fertigkeiten gefunden'})
+        if path == '/gesinnung':
+            data = self.store.gesinnung()
+            return (200, data) if data is not None else (404, {'error': "Blatt 'Gesinnung' nicht gefunden"})
+        parts = path.split('/')
+        if len(parts) == 4 and parts[1] == 'sheets' and parts[3] == 'range':
+            range_str = query.get('range', [None])[0]
+            if not range_str:
+                return 400, {'error': 'Parameter range fehlt (z.B. ?range=A1:E10)'}
+            try:
+                data = self.store.sheet_range(unquote(parts[2]), range_str,
+                                              query.get('workbook', [None])[0])
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            return (200, data) if data is not None else (404, {'error': 'Blatt nicht gefunden'})
+        return 404, {'error': 'Unbekannter Pfad'}
+
+    def respond(self, target):
+        """Liefert (Status, Body, ETag); Bodies werden pro Datenstand zwischengespeichert"""
+        self.store.refresh()
+        if self.store.generation != self.response_generation:
+            self.responses = {}
+            self.response_generation = self.store.generation
+        cached = self.responses.get(target)
+        if cached is None:
+            parts = urlsplit(target)
+            status, data = self.route(parts.path.rstrip('/') or '/', parse_qs(parts.query))
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            cached = (status, body, etag)
+            self.responses[target] = cached
+        return cached
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.write_response(writer, 400, b'', None, close=True)
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                close = (headers.get('connection', '').lower() == 'close'
+                         or (version == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive'))
+                if method not in ('GET', 'HEAD'):
+                    await self.write_response(writer, 405, b'', None, close=close)
+                else:
+                    # Bewusst ohne Thread: Treffer kosten nur einen stat()-Durchlauf,
+                    # und der Zwischenspeicher bleibt ohne Sperren konsistent.
+                    try:
+                        status, body, etag = self.respond(target)
+                    except Exception as e:
+                        traceback.print_exc()
+                        status, etag = 500, None
+                        body = json.dumps({'error': f"{type(e).__name__}: {e}"}, ensure_ascii=False).encode('utf-8')
+                    if status == 200 and etag in headers.get('if-none-match', ''):
+                        await self.write_response(writer, 304, b'', etag, close=close)
+                    else:
+                        await self.write_response(writer, status, b'' if method == 'HEAD' else body,
+                                                  etag, close=close, length=len(body))
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def write_response(self, writer, status, body, etag, close=False, length=None):
+        reasons = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                   405: 'Method Not Allowed', 500: 'Internal Server Error'}
+        lines = [f"HTTP/1.1 {status} {reasons.get(status, '')}",
+                 'Content-Type: application/json; charset=utf-8',
+                 f"Content-Length: {len(body) if length is None else length}",
+                 'Cache-Control: no-cache']
+        if etag:
+            lines.append(f"ETag: {etag}")
+        if close:
+            lines.append('Connection: close')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(directory, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    service = ExtractionService(directory)
+    await asyncio.to_thread(service.store.refresh)
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Extraktionsdienst läuft auf http://{host}:{port} ({len(service.store.entries)} Arbeitsmappen)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "FM"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    try:
+        asyncio.run(serve(directory, port=port))
+    except KeyboardInterrupt:
+        print("\nDienst beendet")
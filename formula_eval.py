@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Wertet die table:formula-Zellen einer Arbeitsmappe aus (OpenFormula-Teilmenge)
+
+Jede Formel wird einmal in eine Python-Closure übersetzt. Aus den Referenzen
+entsteht ein Abhängigkeitsgraph, der einmal topologisch sortiert wird.
+Ändert sich eine Eingabe, werden nur die nachgelagerten Zellen neu berechnet.
+
+Unterstützt: + - * / ^ & % = <> < > <= >=, Zellbezüge und Bereiche
+([.B17], [.$D$11], [.J17:.O17], [$Blatt.A1]) sowie IF, CONCATENATE, SUM,
+HLOOKUP, VLOOKUP, COUNTIF, ROUND, ROUNDUP, ROUNDDOWN, RAND, MIN, MAX, ABS,
+INT, AND, OR, NOT.
+"""
+import math
+import random
+import re
+import sys
+import time
+from collections import deque
+
+from ods_core import read_workbook, parse_address, format_address
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<ref>\[[^\]]*\])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<name>[A-Za-z_][\w.]*)
+  | (?P<op><>|<=|>=|[-+*/^&=<>%();])
+''', re.VERBOSE)
+
+_REF_RE = re.compile(r"^\$?(?:'((?:[^']|'')*)'|([^.'\[\]]*))\.(\$?[A-Za-z]+\$?\d+)$")
+
+COMPARISONS = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+# Bereiche bis zu dieser Größe werden zellweise in den Graphen übernommen
+MAX_RANGE_SCAN = 10000
+NUMERIC_TYPES = ('float', 'percentage', 'currency')
+
+
+class FormulaError(Exception):
+    """Fehlerwert einer Zelle (#DIV/0!, #VALUE!, #NAME?, #REF!, #N/A, Err:522)"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def __repr__(self):
+        return f"FormulaError({self.code!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, FormulaError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+
+CYCLE = FormulaError('Err:522')
+
+
+def tokenize(formula):
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        match = _TOKEN_RE.match(formula, pos)
+        if match is None:
+            raise ValueError(f"Unerwartetes Zeichen in Formel: {formula[pos:]!r}")
+        kind = match.lastgroup
+        if kind != 'space':
+            tokens.append((kind, match.group(0)))
+        pos = match.end()
+    return tokens
+
+
+def parse_reference(text, sheet):
+    """'[.$B$3]' -> ('ref', (Blatt, 2, 1)), '[.A1:.B2]' -> ('range', (Blatt, 0, 0, 1, 1))"""
+    parts = text[1:-1].split(':')
+    cells = []
+    for part in parts:
+        match = _REF_RE.match(part)
+        if match is None:
+            raise ValueError(f"Ungültiger Bezug: {text}")
+        quoted, plain, address = match.groups()
+        name = quoted.replace("''", "'") if quoted is not None else plain
+        if name:
+            sheet = name
+        cells.append((sheet,) + parse_address(address))
+    if len(cells) == 1:
+        return 'ref', cells[0]
+    (sheet, r1, c1), (_, r2, c2) = cells
+    return 'range', (sheet, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+
+
+class _Parser:
+    """Rekursiver Abstieg; liefert einen Baum aus Tupeln"""
+
+    def __init__(self, tokens, sheet):
+        self.tokens = tokens
+        self.pos = 0
+        self.sheet = sheet
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise ValueError(f"Erwartet {value or 'Ausdruck'}, gefunden {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Überzähliges Token {self.tokens[self.pos][1]!r}")
+        return node
+
+    def comparison(self):
+        node = self.concat()
+        while self.peek()[1] in COMPARISONS:
+            op = self.take()[1]
+            node = ('cmp', op, node, self.concat())
+        return node
+
+    def concat(self):
+        node = self.additive()
+        while self.peek()[1] == '&':
+            self.take()
+            node = ('concat', node, self.additive())
+        return node
+
+    def additive(self):
+        node = self.term()
+        while self.peek()[1] in ('+', '-'):
+            op = self.take()[1]
+            node = ('arith', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.power()
+        while self.peek()[1] in ('*', '/'):
+            op = self.take()[1]
+            node = ('arith', op, node, self.power())
+        return node
+
+    def power(self):
+        node = self.unary()
+        while self.peek()[1] == '^':
+            self.take()
+            node = ('arith', '^', node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek()[1] in ('-', '+'):
+            op = self.take()[1]
+            operand = self.unary()
+            return ('neg', operand) if op == '-' else operand
+        node = self.primary()
+        while self.peek()[1] == '%':
+            self.take()
+            node = ('arith', '/', node, ('const', 100.0))
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == 'number':
+            return ('const', float(text))
+        if kind == 'string':
+            return ('const', text[1:-1].replace('""', '"'))
+        if kind == 'ref':
+            return parse_reference(text, self.sheet)
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                self.take('(')
+                args = []
+                if self.peek()[1] != ')':
+                    args.append(self.argument())
+                    while self.peek()[1] == ';':
+                        self.take(';')
+                        args.append(self.argument())
+                self.take(')')
+                return ('call', text.upper(), args)
+            if text.upper() in ('TRUE', 'FALSE'):
+                return ('const', text.upper() == 'TRUE')
+            return ('error', '#NAME?')
+        if text == '(':
+            node = self.comparison()
+            self.take(')')
+            return node
+        raise ValueError(f"Unerwartetes Token {text!r}")
+
+    def argument(self):
+        # Leere Argumente wie in IF(A1;;1) zählen als 0
+        if self.peek()[1] in (';', ')'):
+            return ('const', None)
+        return self.comparison()
+
+
+def parse_formula(formula, sheet):
+    """'of:=[.B17]+[.C17]' -> Syntaxbaum"""
+    text = formula[3:] if formula.startswith('of:') else formula
+    if text.startswith('='):
+        text = text[1:]
+    return _Parser(tokenize(text), sheet).parse()
+
+
+def references(node, found=None):
+    """Sammelt alle ('ref', ...) und ('range', ...) eines Syntaxbaums"""
+    if found is None:
+        found = []
+    if node[0] in ('ref', 'range'):
+        found.append(node)
+    elif node[0] == 'call':
+        for arg in node[2]:
+            references(arg, found)
+    elif node[0] in ('cmp', 'arith'):
+        references(node[2], found)
+        references(node[3], found)
+    elif node[0] == 'concat':
+        references(node[1], found)
+        references(node[2], found)
+    elif node[0] == 'neg':
+        references(node[1], found)
+    return found
+
+
+def to_number(value):
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, float):
+        return value
+    try:
+        return float(str(value).replace(',', '.'))
+    except ValueError:
+        raise FormulaError('#VALUE!')
+
+
+def to_text(value):
+    """Zahlen wie LibreOffice im Standardformat (deutsches Gebietsschema)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'WAHR' if value else 'FALSCH'
+    if isinstance(value, float):
+        if value == int(value) and abs(value) < 1e15:
+            return str(int(value))
+        return f'{value:.15g}'.replace('.', ',')
+    return value
+
+
+def compare(op, left, right):
+    """Zahlen < Text < Wahrheitswerte; Text ohne Groß-/Kleinschreibung; leer = 0 bzw. ''"""
+    if left is None:
+        left = '' if isinstance(right, str) else 0.0
+    if right is None:
+        right = '' if isinstance(left, str) else 0.0
+    rank_left = 2 if isinstance(left, bool) else 1 if isinstance(left, str) else 0
+    rank_right = 2 if isinstance(right, bool) else 1 if isinstance(right, str) else 0
+    if rank_left != rank_right:
+        return COMPARISONS[op](rank_left, rank_right)
+    if rank_left == 1:
+        return COMPARISONS[op](left.lower(), right.lower())
+    return COMPARISONS[op](float(left), float(right))
+
+
+def _round(value, digits, mode):
+    factor = 10.0 ** int(digits)
+    # Gleitkomma-Rauschen wie 2.0000000000000004 vor dem Runden entfernen
+    scaled = round(abs(value) * factor, 9)
+    if mode == 'down':
+        scaled = math.floor(scaled)
+    elif mode == 'up':
+        scaled = math.ceil(scaled)
+    else:
+        scaled = math.floor(scaled + 0.5)
+    return math.copysign(scaled / factor, value) if scaled else 0.0
+
+
+def _flatten(values):
+    for value in values:
+        if isinstance(value, list):
+            for row in value:
+                yield from row
+        else:
+            yield value
+
+
+def _criterion(text):
+    """COUNTIF-Kriterium '>0', '<>x', 'abc' -> Prüffunktion"""
+    if not isinstance(text, str):
+        return lambda value: value is not None and compare('=', value, text)
+    match = re.match(r'^(<>|<=|>=|=|<|>)?(.*)$', text)
+    op = match.group(1) or '='
+    operand = match.group(2)
+    try:
+        operand = float(operand.replace(',', '.'))
+    except ValueError:
+        pass
+    return lambda value: value is not None and compare(op, value, operand)
+
+
+def _lookup(value, table, index, approximate, horizontal):
+    lines = table if horizontal else [list(column) for column in zip(*table)]
+    keys = lines[0]
+    index = int(to_number(index)) - 1
+    if not 0 <= index < len(lines):
+        raise FormulaError('#REF!')
+    hit = None
+    for position, key in enumerate(keys):
+        if key is None:
+            continue
+        if compare('=', key, value):
+            hit = position
+            break
+        if approximate and type(key) is type(value) and compare('<', key, value):
+            hit = position
+    if hit is None:
+        raise FormulaError('#N/A')
+    return lines[index][hit]
+
+
+def _if(args):
+    if to_number(args[0]()):
+        return args[1]() if len(args) > 1 else True
+    return args[2]() if len(args) > 2 else False
+
+
+FUNCTIONS = {
+    'SUM': lambda args, rng: sum(to_number(v) for v in _flatten(a() for a in args)
+                                 if not isinstance(v, str)),
+    'MIN': lambda args, rng: min((to_number(v) for v in _flatten(a() for a in args)
+                                  if v is not None and not isinstance(v, str)), default=0.0),
+    'MAX': lambda args, rng: max((to_number(v) for v in _flatten(a() for a in args)
+                                  if v is not None and not isinstance(v, str)), default=0.0),
+    'CONCATENATE': lambda args, rng: ''.join(to_text(a()) for a in args),
+    'ROUND': lambda args, rng: _round(to_number(args[0]()), to_number(args[1]()) if len(args) > 1 else 0, 'half'),
+    'ROUNDUP': lambda args, rng: _round(to_number(args[0]()), to_number(args[1]()) if len(args) > 1 else 0, 'up'),
+    'ROUNDDOWN': lambda args, rng: _round(to_number(args[0]()), to_number(args[1]()) if len(args) > 1 else 0,
+                                          'down'),
+    'ABS': lambda args, rng: abs(to_number(args[0]())),
+    'INT': lambda args, rng: float(math.floor(to_number(args[0]()))),
+    'RAND': lambda args, rng: rng.random(),
+    'AND': lambda args, rng: all(to_number(v) for v in _flatten(a() for a in args) if v is not None),
+    'OR': lambda args, rng: any(to_number(v) for v in _flatten(a() for a in args) if v is not None),
+    'NOT': lambda args, rng: not to_number(args[0]()),
+    'COUNTIF': lambda args, rng: float(sum(1 for v in _flatten([args[0]()]) if _criterion(args[1]())(v))),
+    'HLOOKUP': lambda args, rng: _lookup(args[0](), args[1](), args[2](),
+                                         len(args) < 4 or bool(to_number(args[3]())), True),
+    'VLOOKUP': lambda args, rng: _lookup(args[0](), args[1](), args[2](),
+                                         len(args) < 4 or bool(to_number(args[3]())), False),
+}
+# Diese Funktionen werten ihre Argumente selbst (lazy) aus
+LAZY_FUNCTIONS = {'IF': lambda args, rng: _if(args)}
+VOLATILE = {'RAND'}
+
+
+def _arith(op, left, right):
+    a = to_number(left)
+    b = to_number(right)
+    if op == '+':
+        return a + b
+    if op == '-':
+        return a - b
+    if op == '*':
+        return a * b
+    if op == '/':
+        if b == 0:
+            raise FormulaError('#DIV/0!')
+        return a / b
+    try:
+        return float(a ** b)
+    except (OverflowError, ZeroDivisionError):
+        raise FormulaError('#VALUE!')
+
+
+class FormulaEvaluator:
+    """Hält Werte, übersetzte Formeln und den Abhängigkeitsgraphen einer Arbeitsmappe
+
+    `workbook` ist {Blatt: {(Zeile, Spalte): Cell}} wie von ods_core.read_workbook.
+    Werte: float, str, bool oder None (leer); Fehler als FormulaError.
+    """
+
+    def __init__(self, workbook, seed=None):
+        self.rng = random.Random(seed)
+        self.values = {}
+        self.formulas = {}
+        self.compiled = {}
+        self.volatile = set()
+        self.parse_errors = {}
+        for sheet, grid in workbook.items():
+            for (row, col), cell in grid.items():
+                key = (sheet, row, col)
+                if cell.formula:
+                    self.formulas[key] = cell.formula
+                else:
+                    self.values[key] = self.cell_value(cell)
+        for key, formula in self.formulas.items():
+            try:
+                tree = parse_formula(formula, key[0])
+            except ValueError:
+                self.parse_errors[key] = formula
+                tree = ('error', '#NAME?')
+            self.compiled[key] = self.compile(tree, key)
+            self.formulas[key] = tree
+        self.build_graph()
+
+    @staticmethod
+    def cell_value(cell):
+        if cell.value_type in NUMERIC_TYPES and cell.value:
+            return float(cell.value)
+        if cell.value_type == 'boolean':
+            return cell.value == 'true'
+        return cell.text if cell.text else None
+
+    def compile(self, node, key):
+        """Syntaxbaum -> Closure ohne Argumente"""
+        kind = node[0]
+        values = self.values
+        if kind == 'const':
+            value = node[1]
+            return lambda: value
+        if kind == 'error':
+            error = FormulaError(node[1])
+
+            def raise_error():
+                raise error
+            return raise_error
+        if kind == 'ref':
+            ref = node[1]
+
+            def read():
+                value = values.get(ref)
+                if isinstance(value, FormulaError):
+                    raise value
+                return value
+            return read
+        if kind == 'range':
+            sheet, r1, c1, r2, c2 = node[1]
+
+            def read_range():
+                table = [[values.get((sheet, row, col)) for col in range(c1, c2 + 1)] for row in range(r1, r2 + 1)]
+                for line in table:
+                    for value in line:
+                        if isinstance(value, FormulaError):
+                            raise value
+                return table
+            return read_range
+        if kind == 'neg':
+            operand = self.compile(node[1], key)
+            return lambda: -to_number(operand())
+        if kind == 'arith':
+            op, left, right = node[1], self.compile(node[2], key), self.compile(node[3], key)
+            return lambda: _arith(op, left(), right())
+        if kind == 'cmp':
+            op, left, right = node[1], self.compile(node[2], key), self.compile(node[3], key)
+            return lambda: compare(op, left(), right())
+        if kind == 'concat':
+            left, right = self.compile(node[1], key), self.compile(node[2], key)
+            return lambda: to_text(left()) + to_text(right())
+        if kind == 'call':
+            name, args = node[1], [self.compile(arg, key) for arg in node[2]]
+            if name in VOLATILE:
+                self.volatile.add(key)
+            function = LAZY_FUNCTIONS.get(name) or FUNCTIONS.get(name)
+            if function is None:
+                return self.compile(('error', '#NAME?'), key)
+            rng = self.rng
+            return lambda: function(args, rng)
+        raise ValueError(f"Unbekannter Knoten {kind}")
+
+    def build_graph(self):
+        """Direkte Abhängigkeiten, Bereichs-Abhängigkeiten und topologische Reihenfolge"""
+        self.dependents = {}
+        self.range_dependents = {}
+        formula_cells_by_sheet = {}
+        for sheet, row, col in self.formulas:
+            formula_cells_by_sheet.setdefault(sheet, []).append((row, col))
+        inputs = {}
+        for key, tree in self.formulas.items():
+            needed = set()
+            for kind, target in references(tree):
+                if kind == 'ref':
+                    self.dependents.setdefault(target, set()).add(key)
+                    if target in self.formulas:
+                        needed.add(target)
+                    continue
+                sheet, r1, c1, r2, c2 = target
+                self.range_dependents.setdefault(sheet, []).append((r1, c1, r2, c2, key))
+                if (r2 - r1 + 1) * (c2 - c1 + 1) <= MAX_RANGE_SCAN:
+                    needed.update((sheet, row, col) for row in range(r1, r2 + 1) for col in range(c1, c2 + 1)
+                                  if (sheet, row, col) in self.formulas)
+                else:
+                    needed.update((sheet, row, col) for row, col in formula_cells_by_sheet.get(sheet, ())
+                                  if r1 <= row <= r2 and c1 <= col <= c2)
+            inputs[key] = needed
+
+        # Kahn-Algorithmus; was übrig bleibt, liegt in einem Zyklus
+        waiting = {key: len(needed) for key, needed in inputs.items()}
+        users = {}
+        for key, needed in inputs.items():
+            for target in needed:
+                users.setdefault(target, []).append(key)
+        queue = deque(key for key, count in waiting.items() if count == 0)
+        self.order = []
+        while queue:
+            key = queue.popleft()
+            self.order.append(key)
+            for user in users.get(key, ()):
+                waiting[user] -= 1
+                if waiting[user] == 0:
+                    queue.append(user)
+        self.cycles = [key for key, count in waiting.items() if count > 0]
+        self.position = {key: index for index, key in enumerate(self.order)}
+
+    def evaluate(self, key):
+        try:
+            value = self.compiled[key]()
+        except FormulaError as error:
+            value = error
+        self.values[key] = value
+        return value
+
+    def evaluate_all(self):
+        """Wertet alle Formeln in topologischer Reihenfolge aus; liefert die Anzahl"""
+        for key in self.cycles:
+            self.values[key] = CYCLE
+        for key in self.order:
+            self.evaluate(key)
+        return len(self.order)
+
+    def downstream(self, keys):
+        """Alle Formelzellen, die (transitiv) von `keys` abhängen, in Auswertungsreihenfolge"""
+        seen = set()
+        queue = deque(keys)
+        while queue:
+            key = queue.popleft()
+            found = set(self.dependents.get(key, ()))
+            sheet, row, col = key
+            for r1, c1, r2, c2, user in self.range_dependents.get(sheet, ()):
+                if r1 <= row <= r2 and c1 <= col <= c2:
+                    found.add(user)
+            for user in found:
+                if user not in seen:
+                    seen.add(user)
+                    queue.append(user)
+        return sorted((key for key in seen if key in self.position), key=self.position.__getitem__)
+
+    def set_values(self, changes):
+        """Setzt Eingaben {(Blatt, 'B3'): Wert} und rechnet nur die abhängigen Zellen neu
+
+        Eine überschriebene Formelzelle wird zur Konstanten. Liefert
+        {(Blatt, Zeile, Spalte): (alt, neu)} aller Zellen, deren Wert sich geändert hat.
+        """
+        changed = {}
+        keys = []
+        for (sheet, address), value in changes.items():
+            key = (sheet,) + parse_address(address)
+            if key in self.formulas:
+                del self.formulas[key]
+                self.compiled.pop(key, None)
+                self.volatile.discard(key)
+                if key in self.position:
+                    self.order.remove(key)
+                    self.position = {k: index for index, k in enumerate(self.order)}
+                elif key in self.cycles:
+                    self.cycles.remove(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            old = self.values.get(key)
+            self.values[key] = value
+            if old != value:
+                changed[key] = (old, value)
+            keys.append(key)
+        for key in self.downstream(keys):
+            old = self.values.get(key)
+            new = self.evaluate(key)
+            if old != new:
+                changed[key] = (old, new)
+        return changed
+
+    def recalculate_volatile(self):
+        """Würfelt RAND()-Zellen neu und rechnet deren Abhängige nach"""
+        for key in self.volatile:
+            if key in self.compiled:
+                self.evaluate(key)
+        for key in self.downstream(self.volatile):
+            self.evaluate(key)
+
+    def value(self, sheet, address):
+        return self.values.get((sheet,) + parse_address(address))
+
+    def text(self, sheet, address):
+        value = self.value(sheet, address)
+        return value.code if isinstance(value, FormulaError) else to_text(value)
+
+
+def check_cached(evaluator, workbook):
+    """Vergleicht berechnete Werte mit den in der Datei gespeicherten; liefert Abweichungen"""
+    mismatches = []
+    # Gewürfelte Zellen und alles, was davon abhängt, können nicht übereinstimmen
+    random_cells = set(evaluator.volatile) | set(evaluator.downstream(evaluator.volatile))
+    for key in evaluator.order:
+        if key in random_cells:
+            continue
+        sheet, row, col = key
+        cell = workbook[sheet][(row, col)]
+        value = evaluator.values.get(key)
+        if isinstance(value, FormulaError):
+            ok = cell.text.startswith(('#', 'Err:'))
+        elif cell.value_type in NUMERIC_TYPES:
+            ok = (not isinstance(value, str) and cell.value != ''
+                  and math.isclose(to_number(value), float(cell.value), rel_tol=1e-9, abs_tol=1e-9))
+        elif cell.value_type == 'boolean':
+            ok = bool(value) == (cell.value == 'true')
+        else:
+            ok = to_text(value) == cell.text
+        if not ok:
+            mismatches.append((sheet, format_address(row, col), cell.formula, cell.text, value))
+    return mismatches
+
+
+def parse_change(arg):
+    """'Georg!C38=3' -> (('Georg', 'C38'), 3.0)"""
+    target, _, text = arg.partition('=')
+    sheet, _, address = target.rpartition('!')
+    try:
+        value = float(text.replace(',', '.'))
+    except ValueError:
+        value = text
+    return (sheet.strip("'"), address.upper()), value
+
+
+if __name__ == "__main__":
+    filepath = sys.argv[1] if len(sys.argv) > 1 else "FM/P&P V2 22_05_2021.ods"
+    changes = dict(parse_change(arg) for arg in sys.argv[2:])
+
+    workbook = read_workbook(filepath)
+    started = time.perf_counter()
+    evaluator = FormulaEvaluator(workbook, seed=0)
+    compiled = time.perf_counter()
+    count = evaluator.evaluate_all()
+    evaluated = time.perf_counter()
+    print(f"{count} Formeln übersetzt in {(compiled - started) * 1000:.0f} ms, "
+          f"ausgewertet in {(evaluated - compiled) * 1000:.0f} ms")
+    if evaluator.cycles:
+        print(f"{len(evaluator.cycles)} Zellen in Zirkelbezügen")
+    for key, formula in evaluator.parse_errors.items():
+        print(f"Nicht unterstützt: {key[0]}!{format_address(key[1], key[2])} {formula}")
+
+    mismatches = check_cached(evaluator, workbook)
+    print(f"{len(mismatches)} Abweichungen zu den gespeicherten Werten (ohne RAND-Zellen)")
+    for sheet, address, formula, cached, value in mismatches[:20]:
+        print(f"  {sheet}!{address}: {formula} -> {value!r}, gespeichert {cached!r}")
+
+    if changes:
+        started = time.perf_counter()
+        changed = evaluator.set_values(changes)
+        elapsed = (time.perf_counter() - started) * 1000
+        for (sheet, row, col), (old, new) in sorted(changed.items()):
+            print(f"{sheet}!{format_address(row, col)}: {to_text(old)!r} -> {to_text(new)!r}")
+        print(f"\n{len(changed)} Zellen geändert, neu berechnet in {elapsed:.1f} ms")
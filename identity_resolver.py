@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Ordnet Charakterblätter aus vielen Arbeitsmappen denselben Charakteren zu
+
+Statt alle Paare zu vergleichen, bekommt jeder Datensatz Blockschlüssel
+(normalisierter Spielername, Charaktername, Klasse/Rasse, Namensanfang);
+unscharf verglichen wird nur innerhalb eines Blocks. Treffer werden per
+Union-Find zu Identitäten zusammengefasst, die mit stabilen IDs in
+character_identities.json erhalten bleiben. Aus jeder Identität entsteht
+eine zusammengeführte, deduplizierte Charakterhistorie.
+
+Die Aliasse (Blatt-Suffixe wie _V2, Schreibweisen wie Korbi -> Kobi)
+stehen in character_aliases.json statt im Code.
+"""
+import hashlib
+import json
+import os
+import sys
+from difflib import SequenceMatcher
+
+from character_aliases import AliasTable, load_aliases, normalize
+from ods_core import is_workbook_file
+from sheet_layouts import read_characters_with_layouts
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+IDENTITIES_FILE = 'character_identities.json'
+OUTPUT_FILE = 'character_history.json'
+
+# Gewichte der Felder beim unscharfen Vergleich; fehlende Felder zählen nicht
+FIELD_WEIGHTS = {'player': 0.5, 'name': 0.3, 'class': 0.1, 'race': 0.1}
+MATCH_THRESHOLD = 0.85
+# Größere Blöcke werden nicht paarweise verglichen: unspezifische Schlüssel
+# (Namensanfang, Klasse/Rasse) fallen weg, Spieler- und Namensblöcke werden
+# nur als sortierte Nachbarschaft der Breite NEIGHBOUR_WINDOW verglichen
+MAX_BLOCK_SIZE = 200
+LOW_SELECTIVITY_KEYS = ('anfang', 'klasse')
+NEIGHBOUR_WINDOW = 20
+PREFIX_LENGTH = 3
+
+HISTORY_FIELDS = ('name', 'playerName', 'class', 'race', 'level')
+
+
+def record_key(record):
+    return f"{record['file']}:{record['sheet']}"
+
+
+def prepare(records, aliases):
+    """Normalisierte Vergleichsfelder je Datensatz"""
+    prepared = []
+    for record in records:
+        char = record['character']
+        player = aliases.player(char.get('playerName') or record['sheet'])
+        prepared.append({
+            'player': player,
+            'name': aliases.character(char.get('name')),
+            'class': normalize(char.get('class')),
+            'race': normalize(char.get('race')),
+        })
+    return prepared
+
+
+def blocking_keys(fields):
+    keys = []
+    if fields['player']:
+        keys.append(('spieler', fields['player']))
+        keys.append(('anfang', fields['player'][:PREFIX_LENGTH]))
+    if fields['name']:
+        keys.append(('name', fields['name']))
+    if fields['class'] and fields['race']:
+        keys.append(('klasse', fields['class'], fields['race']))
+    return keys
+
+
+def similarity(left, right):
+    """Gewichtete Ähnlichkeit 0..1 über die Felder, die in beiden Datensätzen belegt sind"""
+    total = weight_sum = 0.0
+    for field, weight in FIELD_WEIGHTS.items():
+        a, b = left[field], right[field]
+        if not a or not b:
+            continue
+        total += weight * (1.0 if a == b else SequenceMatcher(None, a, b).ratio())
+        weight_sum += weight
+    # Nur Klasse/Rasse gleich reicht nicht für eine Identität
+    if weight_sum < FIELD_WEIGHTS['player']:
+        return 0.0
+    return total / weight_sum
+
+
+def names_compatible(left, right):
+    """Jeder Charaktername des einen Clusters muss zu jedem des anderen passen"""
+    return all(a == b or SequenceMatcher(None, a, b).ratio() >= MATCH_THRESHOLD
+               for a in left for b in right)
+
+
+class UnionFind:
+    """Cluster mit Ausschlussmengen und Namen
+
+    Zwei Cluster mit gemeinsamem Sperrschlüssel werden nie vereint, ebenso
+    Cluster mit unvereinbaren Charakternamen. Ein Blatt ohne Namen passt so
+    zu einem Charakter des Spielers, verkettet aber nicht zwei verschiedene.
+    """
+
+    def __init__(self, exclusive, names):
+        self.parent = list(range(len(exclusive)))
+        self.exclusive = [set(keys) for keys in exclusive]
+        self.names = [{name} if name else set() for name in names]
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b or not self.exclusive[a].isdisjoint(self.exclusive[b]):
+            return False
+        if not names_compatible(self.names[a], self.names[b]):
+            return False
+        root, child = min(a, b), max(a, b)
+        self.parent[child] = root
+        self.exclusive[root] |= self.exclusive[child]
+        self.names[root] |= self.names[child]
+        self.exclusive[child] = self.names[child] = None
+        return True
+
+
+def collapse(records, prepared):
+    """Fasst Datensätze mit gleichen normalisierten Feldern zu Vertretern zusammen
+
+    Der k-te Datensatz mit denselben Feldern und demselben Sperrschlüssel
+    landet im k-ten Vertreter, so bleiben zwei gleich aussehende Blätter
+    derselben Vorlage in einer Mappe getrennt.
+    Liefert (Felder je Vertreter, Datensatz-Indizes je Vertreter, Sperrschlüssel je Vertreter).
+    """
+    representatives = {}
+    seen = {}
+    fields_list, members, exclusive = [], [], []
+    for index, (record, fields) in enumerate(zip(records, prepared)):
+        signature = tuple(fields[field] for field in FIELD_WEIGHTS)
+        key = (record['file'], record['character'].get('layout', ''))
+        occurrence = seen.get((signature, key), 0)
+        seen[(signature, key)] = occurrence + 1
+        slot = representatives.get((signature, occurrence))
+        if slot is None:
+            slot = representatives[(signature, occurrence)] = len(fields_list)
+            fields_list.append(fields)
+            members.append([])
+            exclusive.append(set())
+        members[slot].append(index)
+        exclusive[slot].add(key)
+    return fields_list, members, exclusive
+
+
+def block_pairs(members, prepared):
+    """Paare eines Blocks; zu große Blöcke nur als sortierte Nachbarschaft
+
+    Sortiert wird nach allen Vergleichsfeldern, in einem Spieler-Block also
+    nach Charaktername, in einem Namens-Block nach Spieler.
+    """
+    if len(members) <= MAX_BLOCK_SIZE:
+        for position, a in enumerate(members):
+            for b in members[position + 1:]:
+                yield a, b
+        return
+    ordered = sorted(members, key=lambda index: tuple(prepared[index][field] for field in FIELD_WEIGHTS))
+    for position, a in enumerate(ordered):
+        for b in ordered[position + 1:position + 1 + NEIGHBOUR_WINDOW]:
+            yield min(a, b), max(a, b)
+
+
+def resolve(records, aliases):
+    """Liefert (Cluster als Listen von Datensatz-Indizes, Statistik)"""
+    prepared, members, exclusive = collapse(records, prepare(records, aliases))
+    blocks = {}
+    for index, fields in enumerate(prepared):
+        for key in blocking_keys(fields):
+            blocks.setdefault(key, []).append(index)
+
+    # Zwei Blätter derselben Vorlage in einer Mappe sind verschiedene Charaktere
+    clusters = UnionFind(exclusive, [fields['name'] for fields in prepared])
+    compared = set()
+    stats = {'records': len(records), 'unique': len(prepared), 'blocks': len(blocks),
+             'skipped_blocks': 0, 'windowed_blocks': 0, 'comparisons': 0}
+    for key, block in blocks.items():
+        if len(block) < 2:
+            continue
+        if len(block) > MAX_BLOCK_SIZE:
+            if key[0] in LOW_SELECTIVITY_KEYS:
+                stats['skipped_blocks'] += 1
+                continue
+            stats['windowed_blocks'] += 1
+        for a, b in block_pairs(block, prepared):
+            if (a, b) in compared or clusters.find(a) == clusters.find(b):
+                continue
+            compared.add((a, b))
+            stats['comparisons'] += 1
+            if similarity(prepared[a], prepared[b]) >= MATCH_THRESHOLD:
+                clusters.union(a, b)
+
+    groups = {}
+    for index in range(len(prepared)):
+        groups.setdefault(clusters.find(index), []).extend(members[index])
+    return [sorted(group) for group in groups.values()], stats
+
+
+def load_identities(filepath=IDENTITIES_FILE):
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_identities(identities, filepath=IDENTITIES_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(identities, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def assign_ids(records, groups, previous):
+    """Stabile IDs: ein Cluster behält die (kleinste) bisherige ID seiner Mitglieder"""
+    known = {member: identity for identity, entry in previous.items() for member in entry['members']}
+    identities = {}
+    for group in groups:
+        keys = sorted(record_key(records[index]) for index in group)
+        old = sorted({known[key] for key in keys if key in known})
+        identity = next((candidate for candidate in old if candidate not in identities), None)
+        salt = 0
+        while identity is None or identity in identities:
+            # Neue ID aus dem ersten Mitglied; bei Kollision weiter hashen
+            identity = 'c' + hashlib.sha1(f"{keys[0]}#{salt}".encode('utf-8')).hexdigest()[:10]
+            salt += 1
+        identities[identity] = {'members': keys}
+    return identities
+
+
+def _content_hash(char):
+    payload = {key: char.get(key, '') for key in HISTORY_FIELDS}
+    payload['attributes'] = char.get('attributes', {})
+    payload['skills'] = char.get('skills', [])
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def build_history(records, identities, aliases):
+    """Je Identität: zusammengeführter Charakter und deduplizierte Versionen in Eingabereihenfolge
+
+    Spätere Blätter überschreiben frühere Felder, wenn sie belegt sind; die
+    Attribute werden vereinigt (wie merge_character_data für Basis + V2).
+    """
+    position = {record_key(record): index for index, record in enumerate(records)}
+    history = []
+    for identity, entry in identities.items():
+        members = sorted((position[key] for key in entry['members'] if key in position))
+        merged = {'attributes': {}}
+        versions = []
+        seen = set()
+        for index in members:
+            record = records[index]
+            char = record['character']
+            for key in HISTORY_FIELDS:
+                if char.get(key):
+                    merged[key] = char[key]
+            if char.get('playerName'):
+                merged['playerName'] = aliases.display_player(char['playerName'])
+            merged['attributes'].update(char.get('attributes') or {})
+            digest = _content_hash(char)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            versions.append({'file': record['file'], 'sheet': record['sheet'],
+                             'layout': char.get('layout', ''), 'attributes': char.get('attributes', {})})
+        history.append({'id': identity, 'character': merged, 'sheets': entry['members'], 'versions': versions})
+    history.sort(key=lambda item: (item['character'].get('playerName', '').casefold(), item['id']))
+    return history
+
+
+def load_records(paths):
+    """Datensätze {file, sheet, character} aus .ods/.fods oder JSON ({Datei: [Charaktere]} oder Liste)"""
+    records = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if is_workbook_file(name))
+            records.extend(load_records([os.path.join(path, name) for name in names]))
+        elif is_workbook_file(os.path.basename(path)):
+            records.extend({'file': path, 'sheet': char['sheet'], 'character': char}
+                           for char in read_characters_with_layouts(path))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                for filepath, chars in data.items():
+                    records.extend({'file': filepath, 'sheet': char.get('sheet', ''), 'character': char}
+                                   for char in chars or [])
+            else:
+                records.extend({'file': path, 'sheet': char.get('sheet', ''), 'character': char}
+                               for char in data)
+    return records
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ['archive_characters.json']
+    records = load_records(paths)
+    aliases = AliasTable(load_aliases())
+
+    groups, stats = resolve(records, aliases)
+    identities = assign_ids(records, groups, load_identities())
+    save_identities(identities)
+    history = build_history(records, identities, aliases)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+    print(f"{stats['records']} Blätter ({stats['unique']} verschiedene) -> {len(identities)} Charaktere "
+          f"({stats['blocks']} Blöcke, {stats['comparisons']} Vergleiche, "
+          f"{stats['windowed_blocks']} große Blöcke als Nachbarschaft, "
+          f"{stats['skipped_blocks']} unspezifische übersprungen)")
+    for item in history:
+        char = item['character']
+        print(f"  {item['id']}: {char.get('name') or '-'} ({char.get('playerName', '')}) "
+              f"- {len(item['sheets'])} Blätter, {len(item['versions'])} Versionen")
+    print(f"Identitäten in {IDENTITIES_FILE}, Historie in {OUTPUT_FILE}")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Erkennt Attribut-, Fertigkeits- und Kopfbereiche eines Charakterblatts automatisch"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+
+from ods_core import read_workbook, format_address, column_letters
+from sheet_layouts import compile_layout, extract_with_layout
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+# Neben dem Modul, nicht im Arbeitsverzeichnis des jeweiligen Aufrufers
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layout_cache.json')
+
+# Attributnamen beider Blattfamilien (Georg-Blätter und V2-Blätter)
+ATTRIBUTE_NAMES = [
+    'Reflexe', 'Koordination', 'Stärke', 'Wissen', 'Wahrnehmung', 'Ausstrahlung', 'Magie',
+    'Körperkraft', 'Konstitution', 'Gewandheit', 'Fingerfertigkeit', 'Bildung', 'Weisheit',
+    'Entschlossenheit', 'Präsenz', 'Manipulation', 'Gesinnungstreue', 'Karma',
+]
+
+# Beschriftung -> Feld; der Wert steht in der Zelle rechts daneben
+HEADER_LABELS = {
+    'name karakter': 'name',
+    'name charakter': 'name',
+    'name spieler': 'playerName',
+    'klasse': 'class',
+    'rasse': 'race',
+    'stufe': 'level',
+}
+HEADER_LABEL_LENGTH = max(len(label) for label in HEADER_LABELS)
+
+# Spaltenüberschriften im Fertigkeitsbereich (nur V2-Blätter haben welche)
+SKILL_HEADER_LABELS = {
+    'level': 'level',
+    'kosten': 'cost',
+}
+
+SKILLS_LABEL = 'Fähigkeiten'
+ATTRIBUTES_LABEL = 'Attribute'
+
+STRUCTURE_LABELS = set(ATTRIBUTE_NAMES) | {SKILLS_LABEL, ATTRIBUTES_LABEL, 'Allgemein',
+                                           'Name Karakter', 'Name Charakter', 'Klasse'}
+
+# '2W', '3W+1' (Würfelcodes) bzw. 'W4', 'W4+2' (Gesamtwerte der Georg-Blätter)
+DICE_RE = re.compile(r'^(\d+W(\+\d+)?|W\d+(\+\d+)?)$')
+NUMBER_RE = re.compile(r'^-?\d+([.,]\d+)?$')
+
+
+def structure_fingerprint(grid):
+    """Hash über die Lage der Beschriftungen und Würfelspalten, ohne Werte und Fertigkeitsnamen
+
+    Eingehen die Strukturbeschriftungen in Spalte A, die Kopfbeschriftungen
+    mit Zeile und Spalte und je Abschnitt zwischen zwei Beschriftungen die
+    letzte Würfelzeile und die benutzten Würfelspalten. Eingefügte oder
+    gelöschte Zeilen und Spalten und eine am Blockende angefügte Fertigkeit
+    ändern den Fingerabdruck, geänderte Werte nicht.
+
+    Muss billiger bleiben als detect_regions: Würfelcodes werden nur bei
+    kurzen Texten mit 'W' per Regex geprüft, Kopfbeschriftungen per Dict.
+    """
+    labels = []
+    headers = []
+    dice = {}
+    for row, cells in grid.rows.items():
+        for col, cell in cells.items():
+            text = cell.text
+            if col == 0 and text in STRUCTURE_LABELS:
+                labels.append((row, text))
+            elif len(text) > HEADER_LABEL_LENGTH:
+                continue
+            elif ('W' in text or 'w' in text) and DICE_RE.match(text.upper()):
+                dice.setdefault(row, []).append(col)
+            elif text.lower() in HEADER_LABELS:
+                headers.append((row, col, text.lower()))
+    labels.sort()
+    headers.sort()
+    dice_rows = sorted(dice)
+
+    sections = []
+    for i, (row, _) in enumerate(labels):
+        end = labels[i + 1][0] if i + 1 < len(labels) else dice_rows[-1] + 1 if dice_rows else row
+        first = bisect.bisect_right(dice_rows, row)
+        last = bisect.bisect_left(dice_rows, end)
+        columns = sorted({col for dice_row in dice_rows[first:last] for col in dice[dice_row]})
+        sections.append((dice_rows[last - 1] if last > first else None, columns))
+    digest = hashlib.sha1(repr((labels, headers, sections)).encode('utf-8')).hexdigest()
+    return digest
+
+
+def detect_regions(grid):
+    """Findet Kopfzellen, Attributblock und Fertigkeitsblöcke in einem Durchlauf
+
+    Liefert eine Bereichskarte im Format von sheet_layouts.json oder None,
+    wenn das Blatt kein Charakterblatt ist.
+    """
+    fields = {}
+    attribute_rows = {}
+    skills_row = None
+    dice_cols = {}
+    numeric_cols = {}
+    column_a = {}
+
+    for (row, col), cell in grid.items():
+        text = cell.text
+        if col == 0:
+            column_a[row] = text
+            if text == SKILLS_LABEL and skills_row is None:
+                skills_row = row
+            elif text in ATTRIBUTE_NAMES:
+                attribute_rows.setdefault(text, []).append(row)
+        label = HEADER_LABELS.get(text.lower())
+        if label and label not in fields:
+            fields[label] = (row, col + 1)
+        if DICE_RE.match(text.upper()):
+            dice_cols.setdefault(row, []).append(col)
+        elif NUMBER_RE.match(text):
+            numeric_cols.setdefault(row, []).append(col)
+
+    if skills_row is None or not attribute_rows:
+        return None
+
+    # Attributblock: Attributzeilen vor "Fähigkeiten", Wert = rechteste Würfelspalte
+    attributes = {}
+    for name, rows in attribute_rows.items():
+        for row in rows:
+            if row < skills_row and row in dice_cols:
+                attributes[name] = format_address(row, max(dice_cols[row]))
+                break
+    if not attributes:
+        return None
+
+    # Fertigkeitsblöcke: Attributüberschriften nach "Fähigkeiten" (ohne eigene Würfelwerte)
+    skill_dice_rows = sorted(row for row in dice_cols if row > skills_row)
+    if not skill_dice_rows:
+        return None
+    last_row = skill_dice_rows[-1]
+    headers = sorted((row, name) for name, rows in attribute_rows.items() for row in rows
+                     if skills_row < row <= last_row and row not in dice_cols)
+
+    blocks = []
+    if headers:
+        for i, (row, name) in enumerate(headers):
+            end = headers[i + 1][0] - 1 if i + 1 < len(headers) else last_row
+            blocks.append((name, row + 1, end))
+    else:
+        blocks.append(('', skills_row + 1, last_row))
+
+    skill_columns = _detect_skill_columns(grid, skills_row, blocks, dice_cols, numeric_cols)
+
+    return {
+        'description': 'automatisch erkannt',
+        'fields': {key: format_address(*pos) for key, pos in fields.items()},
+        'attributes': attributes,
+        'skill_columns': {key: column_letters(col) for key, col in skill_columns.items()},
+        'skill_blocks': {name: f"A{first + 1}:{column_letters(max(skill_columns.values()))}{end + 1}"
+                         for name, first, end in blocks},
+    }
+
+
+def _detect_skill_columns(grid, skills_row, blocks, dice_cols, numeric_cols):
+    """Bestimmt Basis-, Gesamt- und Zusatzspalten aus der Häufigkeit der Werte"""
+    dice_counts = {}
+    numeric_counts = {}
+    for _, first, end in blocks:
+        for row in range(first, end + 1):
+            for col in dice_cols.get(row, []):
+                dice_counts[col] = dice_counts.get(col, 0) + 1
+            for col in numeric_cols.get(row, []):
+                numeric_counts[col] = numeric_counts.get(col, 0) + 1
+
+    total_col = max(dice_counts, key=lambda col: (dice_counts[col], -col))
+    left = {col: count for col, count in dice_counts.items() if 0 < col < total_col}
+    columns = {'name': 0}
+    if left:
+        columns['base'] = max(left, key=lambda col: (left[col], -col))
+    columns['total'] = total_col
+
+    lower = columns.get('base', 0)
+    extra = sorted(col for col in numeric_counts if lower < col < total_col or 0 < col < lower)
+    header_names = {}
+    for col in extra:
+        cell = grid.get((skills_row, col))
+        key = SKILL_HEADER_LABELS.get(cell.text.lower()) if cell else None
+        if key:
+            header_names[col] = key
+    for col in extra:
+        if col in header_names:
+            columns[header_names[col]] = col
+        elif lower < col < total_col and 'bonus' not in columns:
+            columns['bonus'] = col
+    return columns
+
+
+def load_cache(filepath=CACHE_FILE):
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache, filepath=CACHE_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def get_region_map(grid, cache):
+    """Liefert (Fingerabdruck, Bereichskarte, aus_cache) für ein Blatt
+
+    Blätter mit bekanntem Fingerabdruck werden nicht erneut durchsucht.
+    Auch Nicht-Charakterblätter werden (als None) zwischengespeichert.
+    """
+    fingerprint = structure_fingerprint(grid)
+    if fingerprint in cache:
+        return fingerprint, cache[fingerprint], True
+    region_map = detect_regions(grid)
+    cache[fingerprint] = region_map
+    return fingerprint, region_map, False
+
+
+def read_characters_detected(filepath, cache=None):
+    """Liest alle Charakterblätter über automatisch erkannte Bereichskarten"""
+    return detect_characters(read_workbook(filepath), cache)
+
+
+def detect_characters(workbook, cache=None):
+    """Wie read_characters_detected, aber für ein bereits gelesenes {Blatt: Grid}"""
+    if cache is None:
+        cache = {}
+    compiled = {}
+    characters = []
+    for sheet_name, grid in workbook.items():
+        fingerprint, region_map, cached = get_region_map(grid, cache)
+        if region_map is None:
+            continue
+        if fingerprint not in compiled:
+            compiled[fingerprint] = compile_layout(fingerprint[:12], region_map)
+        char = extract_with_layout(sheet_name, grid, compiled[fingerprint])
+        char['sheet'] = sheet_name
+        char['cached'] = cached
+        characters.append(char)
+    return characters
+
+
+if __name__ == "__main__":
+    filepath = sys.argv[1] if len(sys.argv) > 1 else "P&P V2 22_05_2021.ods"
+    cache = load_cache()
+    characters = read_characters_detected(filepath, cache)
+    save_cache(cache)
+
+    for char in characters:
+        source = 'Cache' if char['cached'] else 'erkannt'
+        print(f"{char['sheet']:12s} | Layout {char['layout']} ({source}) | "
+              f"{len(char['attributes'])} Attribute | {len(char['skills'])} Fertigkeiten")
+
+    print(f"\nBereichskarten in {CACHE_FILE} gespeichert")
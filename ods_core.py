@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Gemeinsamer Streaming-Leser für .ods- und .fods-Dateien (Blätter, Zeilen, Zellen)"""
+import contextlib
+import hashlib
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+import re
+from collections import namedtuple
+from collections.abc import ItemsView, Mapping
+
+TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+
+TABLE_TAG = TABLE_NS + 'table'
+ROW_TAG = TABLE_NS + 'table-row'
+CELL_TAG = TABLE_NS + 'table-cell'
+COVERED_TAG = TABLE_NS + 'covered-table-cell'
+
+# .fods ist dasselbe Dokument als einzelne XML-Datei (office:document statt content.xml)
+WORKBOOK_EXTENSIONS = ('.ods', '.fods')
+FLAT_EXTENSION = '.fods'
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+CHUNK_SIZE = 64 * 1024
+# Entpackte Blöcke, die der Hintergrund-Thread dem Parser voraus sein darf
+PREFETCH_CHUNKS = 8
+
+# Wiederholte Zeilen/Zellen mit Inhalt werden höchstens so oft ausgerollt.
+# Leere Wiederholungen (z.B. number-rows-repeated="1048441") zählen nur den Index hoch.
+MAX_REPEAT = 1000
+
+# Fehler beim Lesen einer einzelnen Arbeitsmappe (halb gespeichert, kein ZIP, gelöscht, leer)
+READ_ERRORS = (OSError, zipfile.BadZipFile, ET.ParseError, KeyError, ValueError)
+
+Cell = namedtuple('Cell', ['text', 'value_type', 'value', 'formula'])
+
+EMPTY_ROW = {}
+
+_ADDRESS_RE = re.compile(r'^\$?([A-Za-z]+)\$?(\d+)$')
+
+
+def column_index(letters):
+    """Wandelt 'A' in 0, 'Z' in 25, 'AA' in 26 um"""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord('A') + 1)
+    return index - 1
+
+
+def column_letters(index):
+    """Wandelt 0 in 'A', 26 in 'AA' um"""
+    letters = ''
+    index += 1
+    while index > 0:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord('A') + rest) + letters
+    return letters
+
+
+def parse_address(address):
+    """Wandelt 'B3' (oder '$B$3') in (Zeile, Spalte) = (2, 1) um, 0-basiert"""
+    match = _ADDRESS_RE.match(address.strip())
+    if not match:
+        raise ValueError(f"Ungültige Zelladresse: {address}")
+    return int(match.group(2)) - 1, column_index(match.group(1))
+
+
+def parse_range(range_str):
+    """Wandelt 'A10:E30' in ((9, 0), (29, 4)) um"""
+    start, _, end = range_str.partition(':')
+    first = parse_address(start)
+    last = parse_address(end) if end else first
+    return first, last
+
+
+def format_address(row, col):
+    """Wandelt (2, 1) in 'B3' um"""
+    return f"{column_letters(col)}{row + 1}"
+
+
+def get_text_from_cell(cell_elem):
+    text_parts = []
+    for p in cell_elem.findall('.//' + TEXT_NS + 'p'):
+        text = ''.join(p.itertext())
+        if text.strip():
+            text_parts.append(text.strip())
+    return ' '.join(text_parts).strip()
+
+
+def is_workbook_file(name):
+    """.ods/.fods, aber keine LibreOffice-Sperrdateien (.~lock...)"""
+    return name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith('.~lock')
+
+
+def _stored_member_range(f, info):
+    """Byte-Bereich eines unkomprimiert gespeicherten Zip-Members in der Datei"""
+    f.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    start = info.header_offset + _LOCAL_HEADER.size + header[-2] + header[-1]
+    return start, start + info.file_size
+
+
+def is_flat_file(filepath):
+    """.fods wird als XML gelesen, alles andere als ZIP (ein kaputtes .ods meldet BadZipFile)"""
+    return str(filepath).lower().endswith(FLAT_EXTENSION)
+
+
+@contextlib.contextmanager
+def open_content(filepath):
+    """Liefert (Puffer, Start, Ende) des Dokuments: content.xml oder die ganze .fods-Datei
+
+    .fods und unkomprimiert gespeicherte content.xml werden per mmap
+    eingeblendet und nicht kopiert; nur ein deflate-Member wird entpackt.
+    Der Puffer unterstützt find(), Slicing und re mit pos/endpos.
+    """
+    with open(filepath, 'rb') as f:
+        if is_flat_file(filepath):
+            if not os.fstat(f.fileno()).st_size:
+                # mmap lehnt leere Dateien mit ValueError ab; leer ist kein Dokument
+                raise ET.ParseError(f"{filepath}: leere Datei")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped, 0, len(mapped)
+            return
+        with zipfile.ZipFile(f) as z:
+            info = z.getinfo('content.xml')
+            if info.compress_type == zipfile.ZIP_STORED:
+                start, end = _stored_member_range(f, info)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped, start, end
+                return
+            content = z.read('content.xml')
+        yield content, 0, len(content)
+
+
+def _read_chunks(filepath):
+    mapped = is_flat_file(filepath)
+    if not mapped:
+        with zipfile.ZipFile(filepath) as z:
+            mapped = z.getinfo('content.xml').compress_type == zipfile.ZIP_STORED
+    if mapped:
+        # Eingeblendet: Blöcke direkt aus der Abbildung schneiden
+        with open_content(filepath) as (buffer, start, end):
+            for pos in range(start, end, CHUNK_SIZE):
+                yield buffer[pos:min(pos + CHUNK_SIZE, end)]
+        return
+    with zipfile.ZipFile(filepath, 'r') as z:
+        with z.open('content.xml') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def iter_content_chunks(filepath, prefetch=PREFETCH_CHUNKS):
+    """Liest content.xml (bzw. eine .fods-Datei) stückweise, ohne das ganze Dokument im Speicher zu halten
+
+    Mit `prefetch` entpackt ein Hintergrund-Thread die Blöcke in eine
+    begrenzte Queue, während der Aufrufer die vorherigen parst (zlib gibt
+    dabei den GIL frei). prefetch=0 liest wie bisher im selben Thread.
+    """
+    if not prefetch:
+        yield from _read_chunks(filepath)
+        return
+    chunks = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        # Blockiert bei voller Queue, gibt aber auf, sobald der Leser abbricht
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for chunk in _read_chunks(filepath):
+                if not put(chunk):
+                    return
+        except BaseException as e:
+            put(e)
+            return
+        put(done)
+
+    thread = threading.Thread(target=produce, name='ods-inflate', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def intern_cell(pool, text, value_type, value, formula):
+    """Liefert für gleichen Inhalt immer dasselbe Cell-Objekt (z.B. die vielen '4W' und '0')"""
+    key = (text, value_type, value, formula)
+    cell = pool.get(key)
+    if cell is None:
+        cell = Cell(*map(sys.intern, key))
+        pool[key] = cell
+    return cell
+
+
+def parse_row(row_elem, legacy_columns=False, pool=None):
+    """Liefert {Spalte: Cell} für alle nicht-leeren Zellen einer Zeile und die Zeilenbreite
+
+    Mit legacy_columns=True werden verdeckte Zellen (covered-table-cell) wie in
+    den alten Skripten nicht mitgezählt, verbundene Zellen rücken also zusammen.
+    Über `pool` teilen sich Zellen gleichen Inhalts ein Cell-Objekt.
+    """
+    if pool is None:
+        pool = {}
+    cells = {}
+    col = 0
+    for cell in row_elem:
+        if cell.tag != CELL_TAG and (legacy_columns or cell.tag != COVERED_TAG):
+            continue
+        repeated = int(cell.get(TABLE_NS + 'number-columns-repeated') or '1')
+        text = get_text_from_cell(cell)
+        formula = cell.get(TABLE_NS + 'formula')
+        value_type = cell.get(OFFICE_NS + 'value-type')
+        if text or formula or value_type:
+            value = (cell.get(OFFICE_NS + 'value')
+                     or cell.get(OFFICE_NS + 'date-value')
+                     or cell.get(OFFICE_NS + 'boolean-value'))
+            data = intern_cell(pool, text, value_type or '', value or '', formula or '')
+            for offset in range(min(repeated, MAX_REPEAT)):
+                cells[col + offset] = data
+        col += repeated
+    return cells, col
+
+
+class _GridItems(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        for row, cells in self._mapping.rows.items():
+            for col, cell in cells.items():
+                yield (row, col), cell
+
+
+class SheetGrid(Mapping):
+    """Dünn besetztes Blatt {(Zeile, Spalte): Cell}, intern als {Zeile: {Spalte: Cell}}
+
+    Verhält sich lesend wie das frühere Dict mit Tupel-Schlüsseln, spart aber
+    pro Zelle Schlüsseltupel und Dict-Eintrag. Leere Zellen belegen nichts;
+    wiederholte Zeilen teilen sich ein Zeilen-Dict und werden nicht verändert.
+    """
+    __slots__ = ('rows', 'size')
+
+    def __init__(self, cells=()):
+        self.rows = {}
+        self.size = 0
+        for (row, col), cell in cells:
+            self.rows.setdefault(row, {})[col] = cell
+            self.size += 1
+
+    def add_row(self, row_idx, cells):
+        """Übernimmt ein Zeilen-Dict {Spalte: Cell} ohne Kopie"""
+        self.size += len(cells) - len(self.rows.get(row_idx, EMPTY_ROW))
+        self.rows[row_idx] = cells
+
+    def row(self, row_idx):
+        return self.rows.get(row_idx, EMPTY_ROW)
+
+    def __getitem__(self, key):
+        try:
+            return self.rows[key[0]][key[1]]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return self.rows.get(key[0], EMPTY_ROW).get(key[1], default)
+
+    def __contains__(self, key):
+        return key[1] in self.rows.get(key[0], EMPTY_ROW)
+
+    def __iter__(self):
+        for row, cells in self.rows.items():
+            for col in cells:
+                yield row, col
+
+    def __len__(self):
+        return self.size
+
+    def items(self):
+        return _GridItems(self)
+
+    def __repr__(self):
+        return f"SheetGrid({self.size} Zellen, {len(self.rows)} Zeilen)"
+
+
+def iter_rows(filepath, sheets=None, legacy_columns=False):
+    """Liefert (Blattname, Zeilenindex, {Spalte: Cell}) für jede nicht-leere Zeile
+
+    Der Zeilenindex entspricht der echten Tabellenzeile (0-basiert), d.h.
+    number-rows-repeated wird mitgezählt. Mit `sheets` lassen sich die
+    gewünschten Blätter einschränken; alle anderen werden nur überlesen.
+    """
+    return iter_chunk_rows(iter_content_chunks(filepath), sheets, legacy_columns)
+
+
+def iter_chunk_rows(chunks, sheets=None, legacy_columns=False):
+    """Wie iter_rows, aber für beliebige Byte-Blöcke eines content.xml-Dokuments"""
+    wanted = set(sheets) if sheets is not None else None
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    pool = {}
+    sheet_name = None
+    row_idx = 0
+
+    def handle(events):
+        nonlocal sheet_name, row_idx
+        for event, elem in events:
+            if event == 'start':
+                if elem.tag == TABLE_TAG:
+                    sheet_name = elem.get(TABLE_NS + 'name')
+                    row_idx = 0
+                continue
+            if elem.tag == ROW_TAG:
+                repeated = int(elem.get(TABLE_NS + 'number-rows-repeated') or '1')
+                if wanted is None or sheet_name in wanted:
+                    cells, _ = parse_row(elem, legacy_columns, pool)
+                    if cells:
+                        for offset in range(min(repeated, MAX_REPEAT)):
+                            yield sheet_name, row_idx + offset, cells
+                row_idx += repeated
+                elem.clear()
+            elif elem.tag == TABLE_TAG:
+                elem.clear()
+                sheet_name = None
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from handle(parser.read_events())
+    parser.close()
+    yield from handle(parser.read_events())
+
+
+def list_sheets(filepath):
+    """Liefert alle Blattnamen in Dokumentreihenfolge"""
+    names = []
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    for chunk in iter_content_chunks(filepath):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start' and elem.tag == TABLE_TAG:
+                names.append(elem.get(TABLE_NS + 'name'))
+            elif event == 'end' and elem.tag in (ROW_TAG, TABLE_TAG):
+                elem.clear()
+    parser.close()
+    return names
+
+
+def read_workbook(filepath, sheets=None, legacy_columns=False):
+    """Liest die Arbeitsmappe als {Blattname: SheetGrid}, adressiert über (Zeile, Spalte)"""
+    workbook = {}
+    if sheets is not None:
+        for name in sheets:
+            workbook[name] = SheetGrid()
+    for sheet_name, row_idx, cells in iter_rows(filepath, sheets, legacy_columns):
+        grid = workbook.get(sheet_name)
+        if grid is None:
+            grid = workbook[sheet_name] = SheetGrid()
+        grid.add_row(row_idx, cells)
+    return workbook
+
+
+def cell_text(grid, address):
+    """Liest den Text einer Zelle per Adresse ('B3') aus einem Blatt-Grid"""
+    cell = grid.get(parse_address(address))
+    return cell.text if cell else ''
+
+
+def sheet_hash(grid):
+    """Inhaltshash eines Blatt-Grids (Position, Text, Typ, Wert, Formel)"""
+    digest = hashlib.sha1()
+    for key in sorted(grid):
+        digest.update(repr((key, tuple(grid[key]))).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def grid_rows(grid, width=None):
+    """Wandelt ein Grid in die aufgefüllten Zeilenlisten der alten Skripte um
+
+    Ohne `width` reichen die Zeilen bis zur letzten belegten Spalte des Blatts;
+    die festen Breiten der alten Skripte (10, 15, 20) gibt man explizit an.
+    """
+    if not grid:
+        return []
+    height = max(row for row, _ in grid) + 1
+    if width is None:
+        width = max(col for _, col in grid) + 1
+    rows = [[''] * width for _ in range(height)]
+    for (row, col), cell in grid.items():
+        if col < width:
+            rows[row][col] = cell.text
+    return rows
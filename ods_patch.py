@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Ändert einzelne Zellen einer .ods-Datei, ohne content.xml neu zu serialisieren
+
+Die Zielzellen werden über Byte-Offsets gefunden (expat), nur ihre Bytes
+werden ersetzt. Alle anderen ZIP-Einträge werden roh kopiert und bleiben
+byte-identisch. Abhängige Formelzellen behalten ihren zwischengespeicherten
+Wert, bis LibreOffice neu berechnet.
+"""
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+import xml.parsers.expat
+from xml.sax.saxutils import quoteattr
+
+from ods_core import parse_address
+from ods_writer import cell_xml
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+_ROOT_RE = re.compile(rb'<office:document-content\b[^>]*>')
+_TABLE_START_RE = re.compile(rb'<table:table[\s>]')
+_TABLE_END = b'</table:table>'
+_NAME_RE = re.compile(rb'table:name="([^"]*)"')
+# Start-Tag inklusive Attributwerten, die '>' enthalten dürfen
+_START_TAG_RE = re.compile(rb'<[^>"\']*(?:"[^"]*"[^>"\']*|\'[^\']*\'[^>"\']*)*>')
+_COL_REPEAT_RE = re.compile(rb'\s+table:number-columns-repeated="\d+"')
+_ROW_REPEAT_RE = re.compile(rb'\s+table:number-rows-repeated="\d+"')
+
+# Attribute, die den alten Wert beschreiben und beim Ersetzen entfallen
+VALUE_ATTRS = {'office:value-type', 'office:value', 'office:date-value', 'office:time-value',
+               'office:boolean-value', 'office:string-value', 'office:currency', 'calcext:value-type',
+               'table:formula', 'table:number-columns-repeated'}
+
+CELL = 'table:table-cell'
+COVERED = 'table:covered-table-cell'
+ROW = 'table:table-row'
+
+_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<4sHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<4sHHHHIIH')
+
+
+def sheet_spans(content):
+    """Liefert den Wurzel-Tag und {Blattname: (Start, Ende)} als Byte-Offsets"""
+    root = _ROOT_RE.search(content)
+    if root is None:
+        raise ValueError("Kein office:document-content gefunden")
+    spans = {}
+    pos = root.end()
+    while True:
+        start = _TABLE_START_RE.search(content, pos)
+        if start is None:
+            break
+        end = content.find(_TABLE_END, start.start()) + len(_TABLE_END)
+        name = _NAME_RE.search(content, start.start(), content.find(b'>', start.start()))
+        spans[name.group(1).decode('utf-8') if name else ''] = (start.start(), end)
+        pos = end
+    return root.group(0), spans
+
+
+def set_repeat(tag, pattern, attr, count):
+    """Setzt bzw. entfernt das Wiederholungsattribut in einem Start-Tag"""
+    tag = pattern.sub(b'', tag)
+    if count == 1:
+        return tag
+    name_end = re.match(rb'<[\w:.-]+', tag).end()
+    return tag[:name_end] + f' {attr}="{count}"'.encode('utf-8') + tag[name_end:]
+
+
+def element_with_repeat(element, tag_len, pattern, attr, count):
+    return set_repeat(element[:tag_len], pattern, attr, count) + element[tag_len:]
+
+
+def new_cell(attrs, value):
+    """Neue Zellbytes; Stil und Verbund-Attribute der alten Zelle bleiben erhalten"""
+    kept = ''.join(f' {key}={quoteattr(val)}' for key, val in attrs.items() if key not in VALUE_ATTRS)
+    xml = cell_xml(value)
+    return (xml[:len('<table:table-cell')] + kept + xml[len('<table:table-cell'):]).encode('utf-8')
+
+
+class _SheetScanner:
+    """Sammelt für die Zielzeilen eines Blatts die Byte-Bereiche aller Zellen"""
+
+    def __init__(self, fragment, offset, targets):
+        self.fragment = fragment
+        self.offset = offset
+        self.targets = targets
+        self.target_rows = sorted({row for row, _ in targets})
+        self.rows = []
+        self.row = 0
+        self.current = None
+        self.cell = None
+        self.depth = 0
+
+    def _tag_end(self, start):
+        return _START_TAG_RE.match(self.fragment, start).end()
+
+    def _element_end(self, element, pos):
+        # Leere Elemente (<.../>) enden mit ihrem Start-Tag
+        if self.fragment[element['tag_end'] - 2:element['tag_end']] == b'/>':
+            return element['tag_end']
+        return self.fragment.index(b'>', pos) + 1
+
+    def start(self, name, attrs):
+        self.depth += 1
+        pos = self.parser.CurrentByteIndex - self.offset
+        if name == ROW and self.current is None:
+            repeat = int(attrs.get('table:number-rows-repeated', '1'))
+            if any(self.row <= row < self.row + repeat for row in self.target_rows):
+                self.current = {'start': pos, 'tag_end': self._tag_end(pos), 'first_row': self.row,
+                                'repeat': repeat, 'cells': [], 'col': 0, 'depth': self.depth}
+            else:
+                self.row += repeat
+        elif self.current is not None and name in (CELL, COVERED) and self.depth == self.current['depth'] + 1:
+            repeat = int(attrs.get('table:number-columns-repeated', '1'))
+            self.cell = {'start': pos, 'tag_end': self._tag_end(pos), 'name': name, 'attrs': attrs,
+                         'col': self.current['col'], 'repeat': repeat}
+            self.current['col'] += repeat
+
+    def end(self, name):
+        self.depth -= 1
+        if self.current is None:
+            return
+        pos = self.parser.CurrentByteIndex - self.offset
+        if self.cell is not None and name in (CELL, COVERED) and self.depth == self.current['depth']:
+            cell = self.cell
+            cell['end'] = self._element_end(cell, pos)
+            self.current['cells'].append(cell)
+            self.cell = None
+        elif name == ROW and self.depth == self.current['depth'] - 1:
+            self.current['end'] = self._element_end(self.current, pos)
+            self.current['close_start'] = pos
+            self.rows.append(self.current)
+            self.row += self.current['repeat']
+            self.current = None
+
+    def scan(self, root_tag):
+        self.parser = xml.parsers.expat.ParserCreate()
+        self.parser.StartElementHandler = self.start
+        self.parser.EndElementHandler = self.end
+        self.parser.Parse(root_tag + self.fragment + b'</office:document-content>', True)
+        return self.rows
+
+
+def patch_row(fragment, row, row_targets):
+    """Ersetzt die Zellen einer (ggf. wiederholten) Zeile; liefert die neuen Bytes"""
+    row_bytes = fragment[row['start']:row['end']]
+    tag_len = row['tag_end'] - row['start']
+    pieces = []
+    current = row['first_row']
+    last = row['first_row'] + row['repeat']
+    for target_row in sorted(row_targets):
+        if target_row > current:
+            pieces.append(element_with_repeat(row_bytes, tag_len, _ROW_REPEAT_RE,
+                                              'table:number-rows-repeated', target_row - current))
+        pieces.append(_patched_single_row(fragment, row, row_targets[target_row]))
+        current = target_row + 1
+    if current < last:
+        pieces.append(element_with_repeat(row_bytes, tag_len, _ROW_REPEAT_RE,
+                                          'table:number-rows-repeated', last - current))
+    return b''.join(pieces)
+
+
+def _patched_single_row(fragment, row, col_values):
+    out = [set_repeat(fragment[row['start']:row['tag_end']], _ROW_REPEAT_RE, 'table:number-rows-repeated', 1)]
+    pos = row['tag_end']
+    remaining = dict(col_values)
+    for cell in row['cells']:
+        hits = sorted(col for col in remaining if cell['col'] <= col < cell['col'] + cell['repeat'])
+        if not hits:
+            continue
+        if cell['name'] == COVERED:
+            raise ValueError(f"Zelle in Spalte {hits[0]} ist Teil eines Zellverbunds")
+        out.append(fragment[pos:cell['start']])
+        element = fragment[cell['start']:cell['end']]
+        tag_len = cell['tag_end'] - cell['start']
+        current = cell['col']
+        for col in hits:
+            if col > current:
+                out.append(element_with_repeat(element, tag_len, _COL_REPEAT_RE,
+                                               'table:number-columns-repeated', col - current))
+            out.append(new_cell(cell['attrs'], remaining.pop(col)))
+            current = col + 1
+        if current < cell['col'] + cell['repeat']:
+            out.append(element_with_repeat(element, tag_len, _COL_REPEAT_RE,
+                                           'table:number-columns-repeated', cell['col'] + cell['repeat'] - current))
+        pos = cell['end']
+    out.append(fragment[pos:row['close_start']])
+    if remaining:
+        # Spalten hinter der letzten definierten Zelle anhängen
+        col = row['cells'][-1]['col'] + row['cells'][-1]['repeat'] if row['cells'] else 0
+        for target_col in sorted(remaining):
+            if target_col > col:
+                gap = target_col - col
+                out.append(b'<table:table-cell/>' if gap == 1 else
+                           f'<table:table-cell table:number-columns-repeated="{gap}"/>'.encode('utf-8'))
+            out.append(new_cell({}, remaining[target_col]))
+            col = target_col + 1
+    out.append(fragment[row['close_start']:row['end']])
+    return b''.join(out)
+
+
+def patch_content(content, edits):
+    """Wendet alle Änderungen {(Blatt, 'B3'): Wert} in einem Durchgang auf content.xml an"""
+    root_tag, spans = sheet_spans(content)
+    by_sheet = {}
+    for (sheet, address), value in edits.items():
+        if sheet not in spans:
+            raise KeyError(f"Blatt '{sheet}' nicht gefunden")
+        row, col = parse_address(address)
+        by_sheet.setdefault(sheet, {})[(row, col)] = value
+
+    replacements = []
+    for sheet, targets in by_sheet.items():
+        start, end = spans[sheet]
+        fragment = content[start:end]
+        rows = _SheetScanner(fragment, len(root_tag), targets).scan(root_tag)
+        found = set()
+        for row in rows:
+            row_targets = {}
+            for (target_row, col), value in targets.items():
+                if row['first_row'] <= target_row < row['first_row'] + row['repeat']:
+                    row_targets.setdefault(target_row, {})[col] = value
+                    found.add(target_row)
+            replacements.append((start + row['start'], start + row['end'], patch_row(fragment, row, row_targets)))
+        missing = {row for row, _ in targets} - found
+        if missing:
+            raise ValueError(f"Zeile {min(missing) + 1} liegt hinter dem Ende von Blatt '{sheet}'")
+
+    out = []
+    pos = 0
+    for start, end, data in sorted(replacements):
+        out.append(content[pos:start])
+        out.append(data)
+        pos = end
+    out.append(content[pos:])
+    return b''.join(out)
+
+
+def _read_zip(data):
+    """Liefert [(Name, Central-Header-Felder, Rohbereich des lokalen Eintrags)] und den Kommentar"""
+    eocd = data.rfind(b'PK\x05\x06')
+    if eocd < 0:
+        raise ValueError("Kein gültiges ZIP-Archiv")
+    _, _, _, _, count, cd_size, cd_offset, comment_len = _END_RECORD.unpack_from(data, eocd)
+    if count == 0xFFFF or cd_offset == 0xFFFFFFFF:
+        raise ValueError("ZIP64-Archive werden nicht unterstützt")
+    entries = []
+    pos = cd_offset
+    for _ in range(count):
+        fields = _CENTRAL_HEADER.unpack_from(data, pos)
+        name_len, extra_len, comment = fields[10], fields[11], fields[12]
+        name = data[pos + 46:pos + 46 + name_len]
+        tail = data[pos + 46:pos + 46 + name_len + extra_len + comment]
+        entries.append([name, list(fields), tail])
+        pos += 46 + name_len + extra_len + comment
+    # Lokaler Eintrag reicht bis zum nächsten (inkl. Datendeskriptor)
+    offsets = sorted(entry[1][16] for entry in entries) + [cd_offset]
+    for entry in entries:
+        start = entry[1][16]
+        entry.append(data[start:offsets[offsets.index(start) + 1]])
+    return entries, data[eocd + 22:eocd + 22 + comment_len]
+
+
+def patch_workbook(filepath, edits, output=None):
+    """Patcht die Zellen und schreibt das Archiv neu; nur content.xml wird neu komprimiert"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    entries, comment = _read_zip(data)
+    out = bytearray()
+    central = bytearray()
+    for name, fields, tail, local in entries:
+        offset = len(out)
+        if name == b'content.xml':
+            header = _LOCAL_HEADER.unpack_from(local, 0)
+            raw = local[30 + header[9] + header[10]:]
+            content = zlib.decompressobj(-15).decompress(raw) if fields[4] == 8 else raw[:fields[8]]
+            content = patch_content(content, edits)
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            compressed = compressor.compress(content) + compressor.flush()
+            crc = zlib.crc32(content)
+            # Neuer lokaler Eintrag ohne Datendeskriptor und ohne Extra-Feld
+            out += _LOCAL_HEADER.pack(b'PK\x03\x04', 20, 0, 8, fields[5], fields[6], crc,
+                                      len(compressed), len(content), len(name), 0)
+            out += name + compressed
+            tail = name + tail[len(name) + fields[11]:]
+            fields[2:5] = [20, 0, 8]
+            fields[7:10] = [crc, len(compressed), len(content)]
+            fields[11] = 0
+        else:
+            out += local
+        fields[16] = offset
+        central += _CENTRAL_HEADER.pack(*fields) + tail
+    cd_offset = len(out)
+    out += central
+    out += _END_RECORD.pack(b'PK\x05\x06', 0, 0, len(entries), len(entries), len(central), cd_offset, len(comment))
+    out += comment
+
+    target = output or filepath
+    tmp_path = target + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(out)
+    os.replace(tmp_path, target)
+
+
+def parse_value(text):
+    """Kommandozeilenwert: Zahl, falls möglich, sonst Text"""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_edit(arg):
+    """'Georg!C38=3' -> (('Georg', 'C38'), 3)"""
+    target, _, value = arg.partition('=')
+    sheet, _, address = target.rpartition('!')
+    return (sheet.strip("'"), address.upper()), parse_value(value)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Aufruf: python ods_patch.py DATEI.ods 'Blatt!B3=Wert' ... [--output ZIEL.ods]")
+        exit(1)
+    args = sys.argv[2:]
+    output = None
+    if '--output' in args:
+        index = args.index('--output')
+        output = args[index + 1]
+        del args[index:index + 2]
+    edits = dict(parse_edit(arg) for arg in args)
+
+    started = time.perf_counter()
+    patch_workbook(sys.argv[1], edits, output)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{len(edits)} Zellen in {output or sys.argv[1]} geändert ({elapsed:.1f} ms)")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Schreibt .ods-Dateien gestreamt: content.xml entsteht Zeile für Zeile direkt im ZIP"""
+import json
+import re
+import sys
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from ods_core import Cell
+from sheet_layouts import load_layouts
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+MIMETYPE = 'application/vnd.oasis.opendocument.spreadsheet'
+
+MANIFEST = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" '
+            'manifest:version="1.2">\n'
+            f' <manifest:file-entry manifest:full-path="/" manifest:version="1.2" manifest:media-type="{MIMETYPE}"/>\n'
+            ' <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>\n'
+            '</manifest:manifest>\n')
+
+CONTENT_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<office:document-content '
+                'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+                'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+                'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+                'xmlns:of="urn:oasis:names:tc:opendocument:xmlns:of:1.2" '
+                'office:version="1.2"><office:body><office:spreadsheet>')
+CONTENT_TAIL = '</office:spreadsheet></office:body></office:document-content>'
+
+# Puffergröße, ab der in den ZIP-Strom geschrieben wird
+FLUSH_SIZE = 64 * 1024
+DEFAULT_COLUMNS = 16
+# office:value-type -> Attribut, das den Wert trägt
+VALUE_ATTRIBUTES = {'date': 'date-value', 'time': 'time-value', 'boolean': 'boolean-value'}
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]*?:/\\]')
+
+
+def cell_xml(value):
+    """Eine Zelle als XML; None/'' wird zur leeren Zelle"""
+    if value is None or value == '':
+        return '<table:table-cell/>'
+    if isinstance(value, Cell):
+        attrs = ''
+        if value.formula:
+            attrs += f' table:formula={quoteattr(value.formula)}'
+        if value.value_type:
+            attrs += f' office:value-type="{value.value_type}"'
+            if value.value and value.value_type not in ('string',):
+                key = VALUE_ATTRIBUTES.get(value.value_type, 'value')
+                attrs += f' office:{key}={quoteattr(value.value)}'
+        text = value.text
+    elif isinstance(value, bool):
+        attrs = f' office:value-type="boolean" office:boolean-value="{str(value).lower()}"'
+        text = 'WAHR' if value else 'FALSCH'
+    elif isinstance(value, (int, float)):
+        attrs = f' office:value-type="float" office:value="{value!r}"'
+        text = str(value)
+    else:
+        attrs = ' office:value-type="string"'
+        text = str(value)
+    paragraphs = ''.join(f'<text:p>{escape(line)}</text:p>' for line in text.split('\n')) if text else ''
+    return f'<table:table-cell{attrs}>{paragraphs}</table:table-cell>'
+
+
+def safe_sheet_name(name, used):
+    """Blattnamen ohne verbotene Zeichen, höchstens 31 Zeichen und eindeutig"""
+    base = _INVALID_SHEET_CHARS.sub('_', str(name)).strip("' ")[:31] or 'Blatt'
+    candidate = base
+    counter = 2
+    while candidate.lower() in used:
+        suffix = f" ({counter})"
+        candidate = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+class OdsWriter:
+    """Streaming-Writer: mimetype (unkomprimiert, zuerst), Manifest, dann content.xml
+
+    Leere Zellen- und Zeilenläufe werden per number-columns-repeated bzw.
+    number-rows-repeated zusammengefasst; im Speicher liegt nie mehr als
+    ein Puffer von FLUSH_SIZE Bytes.
+    """
+
+    def __init__(self, filepath):
+        self.zf = zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED)
+        info = zipfile.ZipInfo('mimetype')
+        info.compress_type = zipfile.ZIP_STORED
+        self.zf.writestr(info, MIMETYPE)
+        self.zf.writestr('META-INF/manifest.xml', MANIFEST)
+        self.stream = self.zf.open('content.xml', 'w')
+        self.buffer = []
+        self.buffered = 0
+        self.sheet_names = set()
+        self.in_sheet = False
+        self.pending_empty_rows = 0
+        self._write(CONTENT_HEAD)
+
+    def _write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write(''.join(self.buffer).encode('utf-8'))
+            self.buffer = []
+            self.buffered = 0
+
+    def start_sheet(self, name, columns=DEFAULT_COLUMNS):
+        """Beginnt ein neues Blatt; liefert den tatsächlich verwendeten Namen"""
+        if self.in_sheet:
+            self.end_sheet()
+        sheet_name = safe_sheet_name(name, self.sheet_names)
+        self._write(f'<table:table table:name={quoteattr(sheet_name)}>'
+                    f'<table:table-column table:number-columns-repeated="{columns}"/>')
+        self.in_sheet = True
+        return sheet_name
+
+    def _flush_empty_rows(self):
+        if self.pending_empty_rows:
+            repeat = (f' table:number-rows-repeated="{self.pending_empty_rows}"'
+                      if self.pending_empty_rows > 1 else '')
+            self._write(f'<table:table-row{repeat}><table:table-cell/></table:table-row>')
+            self.pending_empty_rows = 0
+
+    def write_row(self, values=()):
+        """Schreibt eine Zeile; leere Zeilen werden gesammelt und zusammengefasst"""
+        values = list(values)
+        while values and (values[-1] is None or values[-1] == ''):
+            values.pop()
+        if not values:
+            self.pending_empty_rows += 1
+            return
+        self._flush_empty_rows()
+        parts = ['<table:table-row>']
+        empty_run = 0
+        for value in values:
+            if value is None or value == '':
+                empty_run += 1
+                continue
+            if empty_run:
+                parts.append(f'<table:table-cell table:number-columns-repeated="{empty_run}"/>'
+                             if empty_run > 1 else '<table:table-cell/>')
+                empty_run = 0
+            parts.append(cell_xml(value))
+        parts.append('</table:table-row>')
+        self._write(''.join(parts))
+
+    def write_grid(self, grid):
+        """Schreibt ein Grid {(Zeile, Spalte): Cell} wie von ods_core.read_workbook"""
+        rows = {}
+        for (row, col), cell in grid.items():
+            rows.setdefault(row, {})[col] = cell
+        current = 0
+        for row in sorted(rows):
+            self.pending_empty_rows += row - current
+            cells = rows[row]
+            self.write_row([cells.get(col) for col in range(max(cells) + 1)])
+            current = row + 1
+
+    def end_sheet(self):
+        # Nachlaufende Leerzeilen tragen keine Information und entfallen
+        self.pending_empty_rows = 0
+        self._write('</table:table>')
+        self.in_sheet = False
+
+    def close(self):
+        if self.in_sheet:
+            self.end_sheet()
+        if not self.sheet_names:
+            self.start_sheet('Tabelle1')
+            self.end_sheet()
+        self._write(CONTENT_TAIL)
+        self.flush()
+        self.stream.close()
+        self.zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Beschriftung links neben den Kopffeldern der Vorlage georg
+FIELD_LABELS = {'name': 'Name Karakter', 'playerName': 'Name Spieler', 'class': 'Klasse',
+                'race': 'Rasse', 'level': 'Stufe'}
+
+
+def georg_cells(char):
+    """Zellen {(Zeile, Spalte): Wert} an den Adressen der Vorlage georg
+
+    None, wenn ein Attribut oder eine Fertigkeit dort keinen Platz hat
+    (fremde Attributnamen, volle Fertigkeitsblöcke).
+    """
+    layout = next(layout for layout in load_layouts() if layout['name'] == 'georg')
+    attributes = char.get('attributes') or char.get('stats') or {}
+    if any(attr_name not in layout['attributes'] for attr_name in attributes):
+        return None
+
+    cells = {pos: text for pos, text in layout['match']}
+    values = dict(char, **{'class': char.get('class') or char.get('type', '')})
+    for key, (row, col) in layout['fields'].items():
+        cells[(row, col - 1)] = FIELD_LABELS.get(key, key)
+        cells[(row, col)] = values.get(key, '')
+    if char.get('maxHP') is not None:
+        cells[(6, 0)] = 'Trefferpunkte'
+        cells[(6, 1)] = char['maxHP']
+    for attr_name, (row, col) in layout['attributes'].items():
+        cells[(row, 0)] = attr_name
+        if attr_name in attributes:
+            cells[(row, col)] = str(attributes[attr_name]).replace('D', 'W')
+
+    columns = layout['skill_columns']
+    blocks = {attribute: (first, last) for attribute, first, last in layout['skill_blocks']}
+    cells[(min(first for first, _ in blocks.values()) - 3, 0)] = 'Fähigkeiten'
+    for attribute, (first, _) in blocks.items():
+        cells[(first - 1, 0)] = attribute
+    next_row = {attribute: first for attribute, (first, _) in blocks.items()}
+    for skill in char.get('skills') or []:
+        attribute = skill.get('attribute', '')
+        if attribute not in blocks or next_row[attribute] > blocks[attribute][1]:
+            return None
+        row = next_row[attribute]
+        next_row[attribute] += 1
+        cells[(row, columns['name'])] = skill.get('name', '')
+        cells[(row, columns['bonus'])] = skill.get('bonusDice', '')
+
+    inventory = char.get('inventory') or []
+    if inventory:
+        row = max(last for _, last in blocks.values()) + 2
+        cells[(row, 0)] = 'Inventar'
+        for offset, item in enumerate(inventory, 1):
+            cells[(row + offset, 0)] = item.get('name', '') if isinstance(item, dict) else str(item)
+    return cells
+
+
+def write_character_sheet(writer, char):
+    """Ein Charakter bzw. Gegner als Blatt
+
+    Passt er in die Vorlage georg, stehen Kopf, Attribute (D11, D14, ...) und
+    Fertigkeiten an deren Adressen, so dass sheet_layouts ihn wieder liest.
+    Sonst entsteht eine freie Liste ohne die Georg-Ankerzellen.
+    """
+    writer.start_sheet(char.get('name') or char.get('playerName') or 'NPC')
+    cells = georg_cells(char)
+    if cells is not None:
+        writer.write_grid(cells)
+        return
+
+    # A1 bleibt leer: ohne Anker "Allgemein" hält keiner das Blatt für die Vorlage georg
+    writer.write_row()
+    writer.write_row()
+    writer.write_row(['Name Karakter', char.get('name', ''), '', '', '', '',
+                      'Name Spieler', char.get('playerName', '')])
+    writer.write_row()
+    writer.write_row(['Klasse', char.get('class') or char.get('type', ''), '',
+                      'Rasse', char.get('race', ''), '', 'Stufe', char.get('level', '')])
+    writer.write_row()
+    if char.get('maxHP') is not None:
+        writer.write_row(['Trefferpunkte', char['maxHP']])
+    else:
+        writer.write_row()
+    writer.write_row()
+    writer.write_row(['Attribute'])
+    writer.write_row()
+    for attr_name, code in (char.get('attributes') or char.get('stats') or {}).items():
+        writer.write_row([attr_name, '', '', str(code).replace('D', 'W')])
+    writer.write_row()
+    writer.write_row(['Fähigkeiten', 'Attribut', 'Bonuswürfel'])
+    for skill in char.get('skills') or []:
+        writer.write_row([skill.get('name', ''), skill.get('attribute', ''), skill.get('bonusDice', '')])
+    inventory = char.get('inventory') or []
+    if inventory:
+        writer.write_row()
+        writer.write_row(['Inventar'])
+        for item in inventory:
+            writer.write_row([item.get('name', '') if isinstance(item, dict) else str(item)])
+
+
+def iter_records(filepath):
+    """Liest .json (Liste) oder .jsonl (Zeile für Zeile, konstanter Speicher)"""
+    if filepath.endswith('.jsonl'):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else 'characters_final.json'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'charaktere_export.ods'
+    count = 0
+    with OdsWriter(target) as writer:
+        for record in iter_records(source):
+            write_character_sheet(writer, record)
+            count += 1
+    print(f"{count} Blätter in {target} geschrieben")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Minimaler PostgREST-kompatibler Stub-Server zum lokalen Testen von supabase_sync.py"""
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+
+class StubState:
+    """In-Memory-Tabellen {Tabelle: {Schlüssel: Zeile}} plus Anfragezähler"""
+
+    def __init__(self):
+        self.tables = {}
+        self.requests = []
+        self.fail_next = 0
+        self.null_rows = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _table(self):
+        parts = urlsplit(self.path)
+        segments = parts.path.strip('/').split('/')
+        if len(segments) != 3 or segments[:2] != ['rest', 'v1']:
+            return None, None
+        return segments[2], parse_qs(parts.query)
+
+    def do_GET(self):
+        table, _ = self._table()
+        if table is None:
+            return self._send(404, {'message': 'not found'})
+        with self.state.lock:
+            rows = list(self.state.tables.get(table, {}).values())
+        self._send(200, rows)
+
+    def do_POST(self):
+        table, query = self._table()
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if table is None:
+            return self._send(404, {'message': 'not found'})
+        if not self.headers.get('apikey'):
+            return self._send(401, {'message': 'No API key found in request'})
+        with self.state.lock:
+            self.state.requests.append((table, length))
+            if self.state.fail_next > 0:
+                self.state.fail_next -= 1
+                return self._send(503, {'message': 'simulated outage'})
+        rows = json.loads(body.decode('utf-8'))
+        if isinstance(rows, dict):
+            rows = [rows]
+        conflict = query.get('on_conflict', [''])[0].split(',')
+        merge = 'resolution=merge-duplicates' in (self.headers.get('Prefer') or '')
+        with self.state.lock:
+            target = self.state.tables.setdefault(table, {})
+            for row in rows:
+                key = tuple(row.get(column) for column in conflict)
+                if None in key:
+                    # Wie PostgreSQL: NULL ist zu nichts gleich, die Zeile kollidiert nie
+                    self.state.null_rows += 1
+                    key = ('NULL', self.state.null_rows)
+                if key in target and not merge:
+                    return self._send(409, {'message': 'duplicate key value violates unique constraint'})
+                target[key] = {**target.get(key, {}), **row}
+        self._send(201)
+
+
+def start_stub(host='127.0.0.1', port=0):
+    """Startet den Stub in einem Hintergrund-Thread; liefert (Server, Zustand, Basis-URL)"""
+    state = StubState()
+    handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 54321
+    server, state, url = start_stub(port=port)
+    print(f"PostgREST-Stub läuft auf {url} - Abbruch mit Strg+C")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\nStub beendet")
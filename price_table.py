@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Kompiliert die Preisliste data/economy.json in eine indizierte Tabelle (Kupfer als Integer)"""
+import hashlib
+import json
+import os
+import re
+import sys
+
+from character_aliases import normalize_key
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+ECONOMY_FILE = os.path.join('data', 'economy.json')
+CACHE_FILE = '.price_table_cache.json'
+
+# "10 Kupfer (cp) = 1 Silber (sp)"
+_LADDER_RE = re.compile(r'(\d+)\s+\S+\s+\((\w+)\)\s*=\s*1\s+\S+\s+\((\w+)\)')
+# "2-5 cp", "15 gp", "5 cp - 1 sp"
+_PRICE_RE = re.compile(r'^(\d+)\s*(\w+)?\s*(?:-\s*(\d+)\s*(\w+))?\s*(.*)$')
+_BULLET_RE = re.compile(r'^[•\-*]\s*(.+?):\s*(.+)$')
+_QUANTITY_RE = re.compile(r'^(?:(\d+)\s*[x×]\s*)?(.+?)(?:\s*[x×]\s*(\d+))?$')
+
+
+def file_hash(filepath):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def parse_ladder(lines):
+    """Liest die Währungsleiter aus dem Text; liefert {Kürzel: Wert in Kupfer}"""
+    steps = {}
+    for line in lines:
+        match = _LADDER_RE.search(line)
+        if match:
+            steps[match.group(2)] = (int(match.group(1)), match.group(3))
+    # Die kleinste Einheit ist die, die nie als "1 X" auf der rechten Seite steht
+    targets = {target for _, target in steps.values()}
+    factors = {unit: 1 for unit in steps if unit not in targets}
+    changed = True
+    while changed:
+        changed = False
+        for unit, (amount, target) in steps.items():
+            if unit in factors and target not in factors:
+                factors[target] = factors[unit] * amount
+                changed = True
+    return factors
+
+
+def parse_price(text, factors):
+    """'5 cp - 1 sp' -> (5, 10, ''); Anmerkungen wie '(Spende)' landen im dritten Wert"""
+    match = _PRICE_RE.match(text.strip())
+    if not match:
+        return None
+    low, low_unit, high, high_unit, note = match.groups()
+    if high is None:
+        unit = low_unit
+        if unit not in factors:
+            return None
+        return int(low) * factors[unit], int(low) * factors[unit], note.strip()
+    if high_unit not in factors:
+        return None
+    low_factor = factors.get(low_unit, factors[high_unit]) if low_unit else factors[high_unit]
+    return int(low) * low_factor, int(high) * factors[high_unit], note.strip()
+
+
+def item_aliases(name):
+    """'Dolch/Knüppel' -> Dolch, Knüppel; 'Seil (15m)' -> Seil (15m), Seil"""
+    aliases = []
+    for part in [name] + name.split('/'):
+        part = part.strip()
+        for alias in (part, re.sub(r'\s*\(.*?\)', '', part).strip()):
+            key = normalize_key(alias)
+            if key and key not in aliases:
+                aliases.append(key)
+    return aliases
+
+
+def compile_price_table(text):
+    """Parst den Freitext einmal in {'currencies', 'items', 'index'}"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    factors = parse_ladder(lines)
+    items = []
+    index = {}
+    section = ''
+    for line in lines:
+        if _LADDER_RE.search(line):
+            continue
+        bullet = _BULLET_RE.match(line)
+        if not bullet:
+            section = line
+            continue
+        name, price_text = bullet.groups()
+        price = parse_price(price_text, factors)
+        if price is None:
+            continue
+        min_copper, max_copper, note = price
+        item_id = len(items)
+        items.append({'name': name.strip(), 'section': section, 'min': min_copper, 'max': max_copper,
+                      'note': note})
+        for alias in item_aliases(name):
+            index.setdefault(alias, item_id)
+    return {'currencies': factors, 'items': items, 'index': index}
+
+
+def load_price_table(filepath=ECONOMY_FILE, cache_path=CACHE_FILE):
+    """Liefert die kompilierte Tabelle; neu geparst wird nur bei geändertem Datei-Hash"""
+    digest = file_hash(filepath)
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('hash') == digest:
+            return PriceTable(cached['table'])
+    with open(filepath, 'r', encoding='utf-8') as f:
+        table = compile_price_table(f.read())
+    if cache_path:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'hash': digest, 'table': table}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return PriceTable(table)
+
+
+def format_copper(copper, factors=None):
+    """1234 -> '1 pp 2 gp 3 sp 4 cp'"""
+    factors = factors or {'cp': 1, 'sp': 10, 'gp': 100, 'pp': 1000}
+    parts = []
+    for unit, factor in sorted(factors.items(), key=lambda item: -item[1]):
+        amount, copper = divmod(copper, factor)
+        if amount:
+            parts.append(f"{amount} {unit}")
+    return ' '.join(parts) or '0 cp'
+
+
+class PriceTable:
+    def __init__(self, table):
+        self.currencies = table['currencies']
+        self.items = table['items']
+        self.index = table['index']
+        self._resolved = {}
+
+    def lookup(self, name):
+        """Liefert den Eintrag zu einem Gegenstandsnamen oder None"""
+        key = normalize_key(name)
+        item_id = self.index.get(key)
+        if item_id is None:
+            item_id = self.index.get(normalize_key(re.sub(r'\s*\(.*?\)', '', name)))
+        return self.items[item_id] if item_id is not None else None
+
+    def _resolve(self, line):
+        """Zerlegt '3x Dolch' / {'name': ..., 'quantity': ...} in (Schlüssel, Menge)"""
+        if isinstance(line, dict):
+            quantity = line.get('quantity') or 1
+            return str(line.get('name') or ''), int(quantity)
+        match = _QUANTITY_RE.match(str(line).strip())
+        quantity = int(match.group(1) or match.group(3) or 1)
+        return match.group(2), quantity
+
+    def value_lines(self, lines):
+        """Bewertet viele Zeilen auf einmal; jeder Name wird nur einmal nachgeschlagen
+
+        Liefert (Minimum, Maximum, [nicht gefundene Namen]) in Kupfer.
+        """
+        quantities = {}
+        for line in lines:
+            name, quantity = self._resolve(line)
+            quantities[name] = quantities.get(name, 0) + quantity
+        total_min = total_max = 0
+        unpriced = []
+        for name, quantity in quantities.items():
+            if name not in self._resolved:
+                self._resolved[name] = self.lookup(name)
+            item = self._resolved[name]
+            if item is None:
+                unpriced.append(name)
+                continue
+            total_min += item['min'] * quantity
+            total_max += item['max'] * quantity
+        return total_min, total_max, unpriced
+
+    def value_inventories(self, entities):
+        """Bewertet die inventory-Listen extrahierter Charaktere oder Gegner"""
+        return [(entity.get('name'),) + self.value_lines(entity.get('inventory') or [])
+                for entity in entities]
+
+
+if __name__ == "__main__":
+    table = load_price_table()
+    print(f"{len(table.items)} Preise, Währungen: "
+          + ', '.join(f"{unit}={factor}cp" for unit, factor in table.currencies.items()))
+
+    for filepath in ('characters_final.json', 'standard_enemies.json'):
+        if not os.path.exists(filepath):
+            continue
+        with open(filepath, 'r', encoding='utf-8') as f:
+            entities = json.load(f)
+        print(f"\n{filepath}:")
+        for name, low, high, unpriced in table.value_inventories(entities):
+            if not low and not high and not unpriced:
+                continue
+            value = format_copper(low, table.currencies)
+            if high != low:
+                value += ' - ' + format_copper(high, table.currencies)
+            extra = f" (ohne Preis: {', '.join(unpriced)})" if unpriced else ''
+            print(f"  {name}: {value}{extra}")
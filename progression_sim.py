@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Monte-Carlo-Simulation der Charakterentwicklung über verdiente Blips (earned_blips)
+
+Jede Kampagne vergibt pro Sitzung Blips und lässt jeden Charakter nach
+einer Strategie Schritte kaufen. Kosten wie in lib/data.ts: der i-te
+Schritt über dem Grundwert kostet ceil(i / 3) Blips. Der Zustand eines
+Blocks von Kampagnen liegt in flachen Integer-Arrays (Kampagne x Charakter
+x Wert) statt in Dicts; die Blöcke laufen parallel in einem Prozesspool.
+"""
+import json
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from dice_codes import BASE_VALUES, d6_to_blips, format_d6_value, step_cost
+from bestiary_variants import SOURCES as BESTIARY_SOURCES, normalize_enemy
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+CHARACTERS_FILE = 'characters_final.json'
+SKILLS_FILE = 'skills_structure.json'
+OUTPUT_FILE = 'progression_report.json'
+
+STRATEGIES = ('fokus', 'breit', 'attribute', 'zufall')
+# Kampagnen pro Prozessauftrag; feste Blockgröße hält Ergebnisse unabhängig von der Prozesszahl
+BLOCK_SIZE = 250
+PERCENTILES = (10, 50, 90)
+
+
+def load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_party(characters, skills_structure):
+    """Bringt die Charaktere auf ein gemeinsames Wertelayout
+
+    Liefert (Wertnamen, Attribut-Index je Wert, Grund-Blips je Wert,
+    [(Name, Startschritte je Wert)]). Fertigkeiten ohne eigene Angaben im
+    Charakter kommen aus skills_structure.json (Bonus = Schritte).
+    """
+    attribute_names = list(BASE_VALUES)
+    for char in characters:
+        for name, code in (char.get('attributes') or {}).items():
+            if name not in attribute_names and d6_to_blips(code) is not None:
+                attribute_names.append(name)
+    skill_rows = [skill for skill in skills_structure.get('skills', [])
+                  if skill.get('name', '').strip('… ') and skill.get('attribute') in attribute_names]
+
+    names = attribute_names + [skill['name'] for skill in skill_rows]
+    attribute_of = list(range(len(attribute_names))) + [attribute_names.index(skill['attribute'])
+                                                        for skill in skill_rows]
+    base = [d6_to_blips(BASE_VALUES.get(name, '2D')) for name in attribute_names] + [0] * len(skill_rows)
+
+    party = []
+    for index, char in enumerate(characters):
+        label = char.get('name') or char.get('playerName') or f"Charakter {index + 1}"
+        steps = []
+        attributes = char.get('attributes') or {}
+        for position, name in enumerate(attribute_names):
+            blips = d6_to_blips(attributes.get(name)) if name in attributes else None
+            steps.append(max(0, blips - base[position]) if blips is not None else 0)
+        own_skills = {skill.get('name'): skill for skill in char.get('skills') or []}
+        for skill in skill_rows:
+            if skill['name'] in own_skills:
+                own = own_skills[skill['name']]
+                steps.append(int(own.get('bonusDice') or 0) * 3 + int(own.get('bonusSteps') or 0))
+            else:
+                try:
+                    steps.append(max(0, int(skill.get('bonus') or 0)))
+                except ValueError:
+                    steps.append(0)
+        party.append((label, steps))
+    return names, attribute_of, base, party
+
+
+def bestiary_power(enemies):
+    """Stärkster Würfelvorrat im Bestiarium (Attribut + Bonuswürfel) in Blips"""
+    best = 0
+    for enemy in map(normalize_enemy, enemies):
+        attributes = {name: d6_to_blips(code) or 0 for name, code in enemy['attributes'].items()}
+        pools = list(attributes.values())
+        for skill in enemy['skills']:
+            pools.append(attributes.get(skill.get('attribute'), 0) + int(skill.get('bonusDice') or 0) * 3)
+        best = max([best] + pools)
+    return best
+
+
+def simulate_block(args):
+    """Simuliert einen Block von Kampagnen; liefert Gruppenstärke [Sitzung][Kampagne]
+
+    Zustand: steps[(c * N + n) * S + s] und budget[c * N + n] als flache Arrays.
+    """
+    (block_seed, campaigns, sessions, rate, spread, strategies,
+     attribute_of, base, start_steps) = args
+    rng = random.Random(block_seed)
+    members = len(start_steps)
+    size = len(base)
+    # Attribute verweisen auf sich selbst, Fertigkeiten auf ihr Attribut
+    attribute_count = sum(1 for index, attribute in enumerate(attribute_of) if attribute == index)
+    steps = array('i', [value for _ in range(campaigns) for member in start_steps for value in member])
+    budget = array('i', [0] * (campaigns * members))
+    plan = [rng.choice(strategies) for _ in range(campaigns * members)]
+    power = []
+
+    for _ in range(sessions):
+        session_power = []
+        for campaign in range(campaigns):
+            # Gruppenbelohnung wie "Alle belohnen" im Spielleiter-Journal
+            group_reward = max(0, round(rng.uniform(rate - spread, rate + spread)))
+            total_power = 0
+            for member in range(members):
+                slot = campaign * members + member
+                offset = slot * size
+                budget[slot] += group_reward
+                strategy = plan[slot]
+                # Kaufen, solange der nächste gewählte Schritt bezahlbar ist
+                while True:
+                    if strategy == 'fokus':
+                        # Fertigkeit mit dem größten Vorrat weiter ausbauen
+                        choice = max(range(attribute_count, size),
+                                     key=lambda s: base[attribute_of[s]] + steps[offset + attribute_of[s]]
+                                     + steps[offset + s])
+                    elif strategy == 'attribute':
+                        choice = min(range(attribute_count), key=lambda s: steps[offset + s])
+                    elif strategy == 'breit':
+                        choice = min(range(size), key=lambda s: steps[offset + s])
+                    else:
+                        choice = rng.randrange(size)
+                    cost = step_cost(steps[offset + choice] + 1)
+                    if cost > budget[slot]:
+                        break
+                    budget[slot] -= cost
+                    steps[offset + choice] += 1
+                best = 0
+                for s in range(size):
+                    attribute = attribute_of[s]
+                    pool = base[attribute] + steps[offset + attribute]
+                    if s != attribute:
+                        pool += steps[offset + s]
+                    if pool > best:
+                        best = pool
+                total_power += best
+            session_power.append(total_power / members)
+        power.append(session_power)
+    return power
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def simulate(party_layout, campaigns, sessions, rate, spread=1.0, strategies=STRATEGIES, seed=42, workers=None):
+    """Verteilt die Kampagnen blockweise auf Prozesse; liefert Perzentile je Sitzung"""
+    _, attribute_of, base, party = party_layout
+    start_steps = [steps for _, steps in party]
+    jobs = []
+    for block, first in enumerate(range(0, campaigns, BLOCK_SIZE)):
+        count = min(BLOCK_SIZE, campaigns - first)
+        jobs.append((seed * 100003 + block, count, sessions, rate, spread, tuple(strategies),
+                     attribute_of, base, start_steps))
+    per_session = [[] for _ in range(sessions)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for power in pool.map(simulate_block, jobs):
+            for session, values in enumerate(power):
+                per_session[session].extend(values)
+    report = []
+    for session, values in enumerate(per_session, 1):
+        values.sort()
+        report.append({'session': session,
+                       **{f"p{p}": percentile(values, p) for p in PERCENTILES}})
+    return report
+
+
+if __name__ == "__main__":
+    campaigns = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 42
+
+    layout = build_party(load_json(CHARACTERS_FILE), load_json(SKILLS_FILE))
+    enemies = []
+    for filepath in BESTIARY_SOURCES:
+        enemies.extend(load_json(filepath))
+    top_enemy = bestiary_power(enemies)
+
+    started = time.perf_counter()
+    report = simulate(layout, campaigns, sessions, rate, seed=seed)
+    elapsed = time.perf_counter() - started
+
+    outgrown = next((row['session'] for row in report if row['p50'] > top_enemy), None)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'campaigns': campaigns, 'sessions': sessions, 'rate': rate, 'seed': seed,
+                   'party': [name for name, _ in layout[3]], 'bestiary_top_blips': top_enemy,
+                   'outgrown_at_session': outgrown, 'sessions_report': report}, f, ensure_ascii=False, indent=2)
+
+    print(f"{campaigns} Kampagnen x {sessions} Sitzungen ({len(layout[3])} Charaktere, "
+          f"{rate:g} Blips/Sitzung) in {elapsed:.1f} s")
+    print(f"Stärkster Gegner im Bestiarium: {format_d6_value(top_enemy)}")
+    for row in report:
+        if row['session'] in (1, sessions) or row['session'] % 5 == 0:
+            print(f"  Sitzung {row['session']:3d}: "
+                  + "  ".join(f"p{p} {format_d6_value(row[f'p{p}']):7s}" for p in PERCENTILES))
+    if outgrown:
+        print(f"Die Gruppe (Median) übertrifft den stärksten Gegner ab Sitzung {outgrown}")
+    else:
+        print("Die Gruppe (Median) übertrifft den stärksten Gegner in keiner Sitzung")
+    print(f"Bericht in {OUTPUT_FILE} gespeichert")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Erkennt die RAND()-Würfelspalten der Arbeitsmappe als Wurftabellen und würfelt sie neu
+
+Das Spielleiter-Blatt würfelt einen gemeinsamen Würfelvorrat
+(=ROUNDUP(RAND()*6;0)), den jede Fertigkeitszeile je nach Würfelzahl
+per IF und SUM aufsummiert. Jede Summe ist linear in den Würfeln:
+Summe = Gewichte · Würfel + Versatz. Die Gewichte werden einmal über den
+Formel-Evaluator bestimmt, danach ist das Neuwürfeln vieler Sitzungen eine
+einzige Matrixmultiplikation (NumPy, falls installiert).
+"""
+import json
+import random
+import sys
+import time
+
+from ods_core import read_workbook, format_address
+from formula_eval import FormulaEvaluator, FormulaError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+OUTPUT_FILE = 'roll_tables.json'
+
+
+def die_sides(tree):
+    """ROUNDUP(RAND()*n;0) -> n, sonst None"""
+    if tree[0] != 'call' or tree[1] not in ('ROUNDUP', 'CEILING') or not tree[2]:
+        return None
+    product = tree[2][0]
+    if product[0] != 'arith' or product[1] != '*':
+        return None
+    for rand, factor in ((product[2], product[3]), (product[3], product[2])):
+        if rand[:2] == ('call', 'RAND') and factor[0] == 'const' and isinstance(factor[1], float):
+            return int(factor[1])
+    return None
+
+
+def find_dice(evaluator):
+    """[(Zelle, Seiten)] aller Würfelzellen, sortiert nach Blatt/Zeile/Spalte"""
+    dice = []
+    for key in sorted(evaluator.volatile):
+        sides = die_sides(evaluator.formulas[key])
+        if sides:
+            dice.append((key, sides))
+    return dice
+
+
+def _sinks(evaluator, cells):
+    """Zellen aus `cells`, die von keiner anderen Zelle aus `cells` gelesen werden"""
+    read = set()
+    for key in cells:
+        read.update(user for user in evaluator.dependents.get(key, ()) if user in cells)
+    by_sheet = {}
+    for sheet, row, col in cells:
+        by_sheet.setdefault(sheet, []).append((row, col))
+    for sheet, ranges in evaluator.range_dependents.items():
+        for r1, c1, r2, c2, user in ranges:
+            if user in cells and any(r1 <= row <= r2 and c1 <= col <= c2 for row, col in by_sheet.get(sheet, ())):
+                # Bereichsbezug: alle Zellen im Bereich werden gelesen
+                read.update((sheet, row, col) for row, col in by_sheet[sheet]
+                            if r1 <= row <= r2 and c1 <= col <= c2)
+    return [key for key in cells if key not in read]
+
+
+def _numbers(evaluator, keys):
+    values = []
+    for key in keys:
+        value = evaluator.values.get(key)
+        if isinstance(value, (FormulaError, str)) or value is None:
+            values.append(None)
+        else:
+            values.append(float(value))
+    return values
+
+
+def extract_roll_tables(workbook):
+    """Liefert {'dice': [...], 'tables': [...]} für eine Arbeitsmappe {Blatt: Grid}
+
+    Jede Tabelle nennt ihre Summenzelle, die Beschriftung aus Spalte A,
+    die Gewichte je Würfel und den festen Versatz (z.B. Pips).
+    """
+    evaluator = FormulaEvaluator(workbook, seed=0)
+    evaluator.evaluate_all()
+    dice = find_dice(evaluator)
+    if not dice:
+        return {'dice': [], 'tables': []}
+    die_keys = [key for key, _ in dice]
+    totals = sorted(_sinks(evaluator, set(evaluator.downstream(die_keys))))
+
+    def probe(die_values):
+        evaluator.set_values({(sheet, format_address(row, col)): value
+                              for (sheet, row, col), value in zip(die_keys, die_values)})
+        return _numbers(evaluator, totals)
+
+    # Endliche Differenzen: alle Würfel 0 -> Versatz, ein Würfel 1 -> dessen Gewicht
+    offsets = probe([0.0] * len(dice))
+    weights = []
+    for index in range(len(dice)):
+        unit = [0.0] * len(dice)
+        unit[index] = 1.0
+        weights.append([None if value is None or base is None else value - base
+                        for value, base in zip(probe(unit), offsets)])
+    # Linearität mit einem gemischten Wurf gültiger Augenzahlen (2-6) prüfen
+    check = [float(index % 5 + 2) for index in range(len(dice))]
+    checked = probe(check)
+
+    tables = []
+    for position, key in enumerate(totals):
+        offset = offsets[position]
+        column = [weights[index][position] for index in range(len(dice))]
+        if offset is None or checked[position] is None or None in column:
+            continue
+        expected = offset + sum(weight * value for weight, value in zip(column, check))
+        if abs(expected - checked[position]) > 1e-9:
+            continue
+        used = [index for index, weight in enumerate(column) if weight]
+        # Reine Kopien eines Würfels ohne Summe sind keine Wurftabelle
+        if not used or (len(used) == 1 and column[used[0]] == 1 and offset == 0):
+            continue
+        sheet, row, col = key
+        label = workbook[sheet].get((row, 0))
+        tables.append({
+            'sheet': sheet,
+            'address': format_address(row, col),
+            'label': label.text if label else '',
+            'weights': [int(weight) if weight == int(weight) else weight for weight in column],
+            'offset': int(offset) if offset == int(offset) else offset,
+        })
+    return {
+        'dice': [{'sheet': sheet, 'address': format_address(row, col), 'sides': sides}
+                 for (sheet, row, col), sides in dice],
+        'tables': tables,
+    }
+
+
+def roll_sessions(structure, sessions, seed=None):
+    """Würfelt `sessions` Sitzungen; liefert eine Matrix Sitzungen x Tabellen
+
+    Mit NumPy ein Zufallsaufruf und eine Matrixmultiplikation, sonst Listen.
+    """
+    sides = [die['sides'] for die in structure['dice']]
+    weights = [table['weights'] for table in structure['tables']]
+    offsets = [table['offset'] for table in structure['tables']]
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        rolls = rng.integers(1, np.array(sides) + 1, size=(sessions, len(sides)))
+        return rolls @ np.array(weights, dtype=float).T + np.array(offsets, dtype=float)
+    rng = random.Random(seed)
+    # Ohne NumPy: nur die tatsächlich verwendeten Würfel je Tabelle summieren
+    sparse = [[(index, weight) for index, weight in enumerate(row) if weight] for row in weights]
+    results = []
+    for _ in range(sessions):
+        rolls = [rng.randint(1, count) for count in sides]
+        results.append([sum(weight * rolls[index] for index, weight in terms) + offset
+                        for terms, offset in zip(sparse, offsets)])
+    return results
+
+
+def summarize(structure, results):
+    """[(Tabelle, Mittelwert, Minimum, Maximum)] über alle Sitzungen"""
+    if np is not None:
+        results = np.asarray(results)
+        return [(table, float(results[:, index].mean()), float(results[:, index].min()),
+                 float(results[:, index].max())) for index, table in enumerate(structure['tables'])]
+    summary = []
+    for index, table in enumerate(structure['tables']):
+        column = [row[index] for row in results]
+        summary.append((table, sum(column) / len(column), min(column), max(column)))
+    return summary
+
+
+if __name__ == "__main__":
+    filepath = sys.argv[1] if len(sys.argv) > 1 else "FM/P&P V2 22_05_2021.ods"
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+
+    structure = extract_roll_tables(read_workbook(filepath))
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(structure, f, ensure_ascii=False, indent=2)
+    print(f"{len(structure['dice'])} Würfel, {len(structure['tables'])} Wurftabellen in {OUTPUT_FILE} gespeichert")
+    if not structure['tables']:
+        exit(0)
+
+    started = time.perf_counter()
+    results = roll_sessions(structure, sessions, seed)
+    elapsed = (time.perf_counter() - started) * 1000
+    backend = 'NumPy' if np is not None else 'Python'
+    print(f"{sessions} Sitzungen gewürfelt in {elapsed:.1f} ms ({backend})")
+    for table, mean, low, high in summarize(structure, results)[:10]:
+        print(f"  {table['sheet']}!{table['address']:6s} {table['label'][:25]:25s} "
+              f"Ø {mean:5.1f}  ({low:.0f}-{high:.0f})")
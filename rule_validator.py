@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Prüft extrahierte Charaktere gegen die Regeln des Punktekaufs
+
+Alle noch nicht geprüften Charaktere werden in Spalten (Attribute,
+Fertigkeiten) zerlegt und jede Regel läuft einmal über die ganze Spalte.
+Ergebnisse werden pro Inhaltshash des Charakters in .rule_cache.json
+gespeichert; unveränderte Charaktere werden beim nächsten Lauf nicht
+erneut geprüft.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from dice_codes import BASE_VALUES, d6_to_blips, steps_cost
+from ods_core import format_address, is_workbook_file
+from sheet_layouts import load_layouts, read_characters_with_layouts
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+CACHE_FILE = '.rule_cache.json'
+SKILLS_FILE = 'skills_structure.json'
+OUTPUT_FILE = 'rule_violations.json'
+# Bei Regeländerungen erhöhen, damit der Cache verworfen wird
+RULES_VERSION = 1
+
+# Standardwerte von getCharacterCreationSettings() in lib/data.ts
+CREATION_SETTINGS = {
+    'maxAttributePoints': 7,
+    'maxSkillPoints': 8,
+    'maxSkillDicePerSkill': 2,
+    'defaultStartBlips': 67,
+}
+# Bonus einer Fertigkeit in Blips: höchstens maxSkillDicePerSkill Würfel plus 2 Pips
+MAX_SKILL_BONUS = CREATION_SETTINGS['maxSkillDicePerSkill'] * 3 + 2
+
+ERROR = 'fehler'
+HINT = 'hinweis'
+
+# Nur Werte wie '3D', '2W+1' sind Würfelcodes; Trefferpunkte ('28'), Schadensboni
+# ('+2') und Beschriftungen ('(z.B. Musik)') stehen in denselben Spalten
+DICE_LIKE = re.compile(r'^\s*\d+\s*[DdWw]')
+
+
+def character_hash(char):
+    payload = json.dumps([RULES_VERSION, char], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_cache(filepath=CACHE_FILE):
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache, filepath=CACHE_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
+
+
+def skill_attributes(skills_structure):
+    """Fertigkeitsname -> Attribut laut skills_structure.json (Platzhalter '…' ausgenommen)"""
+    return {skill['name']: skill['attribute'] for skill in skills_structure.get('skills', [])
+            if skill.get('name', '').strip('… ')}
+
+
+def _int(value):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def build_columns(characters, layouts):
+    """Zerlegt die Charaktere in Spalten; jede Zeile trägt den Index des Charakters"""
+    attributes = {'char': [], 'name': [], 'code': [], 'address': []}
+    skills = {'char': [], 'name': [], 'attribute': [], 'base': [], 'bonus': [], 'total': [],
+              'row': [], 'columns': []}
+    for index, char in enumerate(characters):
+        layout = layouts.get(char.get('layout'))
+        expected = layout['attributes'] if layout else {name: None for name in char.get('attributes', {})}
+        for name, pos in expected.items():
+            attributes['char'].append(index)
+            attributes['name'].append(name)
+            attributes['code'].append(char.get('attributes', {}).get(name))
+            attributes['address'].append(format_address(*pos) if pos else None)
+        columns = layout['skill_columns'] if layout else {}
+        for skill in char.get('skills') or []:
+            skills['char'].append(index)
+            skills['name'].append(skill.get('name', ''))
+            skills['attribute'].append(skill.get('attribute', ''))
+            skills['base'].append(skill.get('base', ''))
+            skills['bonus'].append(skill.get('bonus'))
+            skills['total'].append(skill.get('total', ''))
+            skills['row'].append(skill.get('row'))
+            skills['columns'].append(columns)
+    return attributes, skills
+
+
+def _skill_address(skills, position, key):
+    col = skills['columns'][position].get(key)
+    row = skills['row'][position]
+    return format_address(row, col) if col is not None and row is not None else None
+
+
+def check_attribute_codes(attributes, skills, characters, context):
+    blips = [d6_to_blips(code) for code in attributes['code']]
+    return [(attributes['char'][i], attributes['address'][i], 'wuerfelcode', ERROR,
+             f"Attribut {attributes['name'][i]}: ungültiger Würfelcode {attributes['code'][i]!r}")
+            for i, value in enumerate(blips) if value is None]
+
+
+def check_skill_codes(attributes, skills, characters, context):
+    found = []
+    for key in ('base', 'total'):
+        for i, code in enumerate(skills[key]):
+            if code and DICE_LIKE.match(str(code)) and d6_to_blips(code) is None:
+                found.append((skills['char'][i], _skill_address(skills, i, key), 'wuerfelcode', ERROR,
+                              f"Fertigkeit {skills['name'][i]}: ungültiger Würfelcode {code!r} ({key})"))
+    return found
+
+
+def check_bonus_range(attributes, skills, characters, context):
+    found = []
+    for i, bonus in enumerate(skills['bonus']):
+        if bonus is None or bonus == '':
+            continue
+        value = _int(bonus)
+        if value is None or not 0 <= value <= MAX_SKILL_BONUS:
+            found.append((skills['char'][i], _skill_address(skills, i, 'bonus'), 'bonus_bereich', ERROR,
+                          f"Fertigkeit {skills['name'][i]}: Bonus {bonus!r} außerhalb 0-{MAX_SKILL_BONUS}"))
+    return found
+
+
+def check_skill_totals(attributes, skills, characters, context):
+    """Gesamt = Basis + Bonus (in Blips), wie die Formeln im Georg-Blatt"""
+    found = []
+    for i, total in enumerate(skills['total']):
+        bonus = _int(skills['bonus'][i]) if skills['bonus'][i] not in (None, '') else None
+        base = d6_to_blips(skills['base'][i])
+        total_blips = d6_to_blips(total)
+        if bonus is None or base is None or total_blips is None:
+            continue
+        if base + bonus != total_blips:
+            found.append((skills['char'][i], _skill_address(skills, i, 'total'), 'gesamtwert', ERROR,
+                          f"Fertigkeit {skills['name'][i]}: Gesamt {total} passt nicht zu "
+                          f"Basis {skills['base'][i]} + Bonus {bonus}"))
+    return found
+
+
+def check_skill_attributes(attributes, skills, characters, context):
+    """Attributzuordnung laut skills_structure.json und Basis = Attributwert"""
+    attribute_blips = {}
+    for i, name in enumerate(attributes['name']):
+        attribute_blips[(attributes['char'][i], name)] = d6_to_blips(attributes['code'][i])
+    expected = context['skill_attributes']
+    found = []
+    for i, name in enumerate(skills['name']):
+        attribute = skills['attribute'][i]
+        if not attribute:
+            continue
+        if name in expected and expected[name] != attribute:
+            found.append((skills['char'][i], _skill_address(skills, i, 'name'), 'attribut_zuordnung', ERROR,
+                          f"Fertigkeit {name}: steht unter {attribute}, laut {SKILLS_FILE} {expected[name]}"))
+        base = d6_to_blips(skills['base'][i])
+        attribute_value = attribute_blips.get((skills['char'][i], attribute))
+        if base is not None and attribute_value is not None and base != attribute_value:
+            found.append((skills['char'][i], _skill_address(skills, i, 'base'), 'basis_attribut', ERROR,
+                          f"Fertigkeit {name}: Basis {skills['base'][i]} weicht von {attribute} ab"))
+    return found
+
+
+def check_point_totals(attributes, skills, characters, context):
+    """Blip-Budget wie calculateCharacterPoints(); Attributpunkte als Hinweis (Erstellungsgrenze)"""
+    used_blips = [0] * len(characters)
+    attribute_dice = [0] * len(characters)
+    for i, name in enumerate(attributes['name']):
+        if name not in BASE_VALUES:
+            continue
+        value = d6_to_blips(attributes['code'][i])
+        if value is None:
+            continue
+        base = d6_to_blips(BASE_VALUES[name])
+        used_blips[attributes['char'][i]] += steps_cost(max(0, value - base))
+        attribute_dice[attributes['char'][i]] += max(0, value // 3 - base // 3)
+    for i, bonus in enumerate(skills['bonus']):
+        value = _int(bonus) if bonus not in (None, '') else None
+        if value is not None and value > 0:
+            used_blips[skills['char'][i]] += steps_cost(value)
+
+    found = []
+    for index, char in enumerate(characters):
+        budget = CREATION_SETTINGS['defaultStartBlips'] + int(char.get('earnedBlips') or 0)
+        if used_blips[index] > budget:
+            found.append((index, None, 'blip_budget', ERROR,
+                          f"{used_blips[index]} Blips verbraucht, Budget {budget}"))
+        if attribute_dice[index] > CREATION_SETTINGS['maxAttributePoints']:
+            found.append((index, None, 'attributpunkte', HINT,
+                          f"{attribute_dice[index]} Attributwürfel über Grundwert "
+                          f"(Erstellung: höchstens {CREATION_SETTINGS['maxAttributePoints']})"))
+    return found
+
+
+RULES = [
+    check_attribute_codes,
+    check_skill_codes,
+    check_bonus_range,
+    check_skill_totals,
+    check_skill_attributes,
+    check_point_totals,
+]
+
+
+def validate(characters, skills_structure, cache=None):
+    """Liefert pro Charakter eine Liste von Verstößen; geprüft wird nur, was nicht im Cache ist"""
+    if cache is None:
+        cache = {}
+    layouts = {layout['name']: layout for layout in load_layouts()}
+    hashes = [character_hash(char) for char in characters]
+    pending = [index for index, digest in enumerate(hashes) if digest not in cache]
+
+    if pending:
+        batch = [characters[index] for index in pending]
+        attributes, skills = build_columns(batch, layouts)
+        context = {'skill_attributes': skill_attributes(skills_structure)}
+        results = [[] for _ in batch]
+        for rule in RULES:
+            for position, address, rule_name, severity, message in rule(attributes, skills, batch, context):
+                results[position].append({'address': address, 'rule': rule_name,
+                                          'severity': severity, 'message': message})
+        for position, index in enumerate(pending):
+            cache[hashes[index]] = results[position]
+
+    report = []
+    for index, char in enumerate(characters):
+        report.append({
+            'sheet': char.get('sheet', ''),
+            'name': char.get('name') or char.get('playerName', ''),
+            'violations': cache[hashes[index]],
+        })
+    return report, len(pending), {digest: cache[digest] for digest in hashes}
+
+
+def load_characters(path):
+    """Charaktere aus .ods/.fods (über sheet_layouts) oder JSON (Liste oder {Datei: Liste})"""
+    if is_workbook_file(os.path.basename(path)):
+        characters = read_characters_with_layouts(path)
+        for char in characters:
+            char['sheet'] = f"{os.path.basename(path)}:{char['sheet']}"
+        return characters
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [char for chars in data.values() for char in chars]
+    return data
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ["FM/P&P V2 22_05_2021.ods"]
+    characters = []
+    for path in paths:
+        characters.extend(load_characters(path))
+    with open(SKILLS_FILE, 'r', encoding='utf-8') as f:
+        skills_structure = json.load(f)
+
+    started = time.perf_counter()
+    cache = load_cache()
+    report, checked, cache = validate(characters, skills_structure, cache)
+    save_cache(cache)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    errors = hints = 0
+    for entry in report:
+        for violation in entry['violations']:
+            if violation['severity'] == ERROR:
+                errors += 1
+            else:
+                hints += 1
+            where = f"{entry['sheet']}!{violation['address']}" if violation['address'] else entry['sheet']
+            print(f"[{violation['severity']}] {where}: {violation['message']}")
+    print(f"\n{len(characters)} Charaktere ({checked} neu geprüft) in {elapsed:.1f} ms: "
+          f"{errors} Fehler, {hints} Hinweise - Bericht in {OUTPUT_FILE}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Extrahiert Charaktere über deklarative Blatt-Layouts (direkte Zelladressen)"""
+import json
+import os
+import re
+import sys
+
+from character_aliases import default_aliases
+from ods_core import read_workbook, parse_address, parse_range, column_index
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+LAYOUTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sheet_layouts.json')
+
+_compiled_layouts = {}
+
+
+def convert_w_to_d(value):
+    if not value:
+        return ''
+    result = re.sub(r'(\d+)W', r'\1D', str(value), flags=re.IGNORECASE)
+    return result.upper()
+
+
+def compile_layout(name, layout):
+    """Wandelt die Adressen eines Layouts einmalig in (Zeile, Spalte)-Tupel um"""
+    blocks = []
+    for attribute, range_str in layout.get('skill_blocks', {}).items():
+        (first_row, _), (last_row, _) = parse_range(range_str)
+        blocks.append((attribute, first_row, last_row))
+    return {
+        'name': name,
+        'description': layout.get('description', ''),
+        'match': [(parse_address(addr), text) for addr, text in layout.get('match', {}).items()],
+        'fields': {key: parse_address(addr) for key, addr in layout.get('fields', {}).items()},
+        'attributes': {key: parse_address(addr) for key, addr in layout.get('attributes', {}).items()},
+        'skill_columns': {key: column_index(col) for key, col in layout.get('skill_columns', {}).items()},
+        'skill_blocks': blocks,
+    }
+
+
+def load_layouts(filepath=LAYOUTS_FILE):
+    """Lädt und kompiliert die Layout-Vorlagen (einmal pro Datei)"""
+    if filepath not in _compiled_layouts:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        _compiled_layouts[filepath] = [compile_layout(name, layout) for name, layout in raw.items()]
+    return _compiled_layouts[filepath]
+
+
+def _text(grid, pos):
+    cell = grid.get(pos)
+    return cell.text if cell else ''
+
+
+def match_layout(grid, layouts=None):
+    """Wählt die erste Vorlage, deren Ankerzellen alle passen (sonst None)"""
+    if layouts is None:
+        layouts = load_layouts()
+    for layout in layouts:
+        if all(_text(grid, pos).startswith(text) for pos, text in layout['match']):
+            return layout
+    return None
+
+
+def extract_skills(grid, layout):
+    """Liest die Fertigkeiten blockweise aus den Vorlagen-Bereichen"""
+    columns = layout['skill_columns']
+    name_col = columns.get('name', 0)
+    skills = []
+    for attribute, first_row, last_row in layout['skill_blocks']:
+        for row in range(first_row, last_row + 1):
+            name = _text(grid, (row, name_col))
+            if not name:
+                continue
+            skill = {'row': row, 'attribute': attribute, 'name': name}
+            for key, col in columns.items():
+                if key != 'name':
+                    skill[key] = _text(grid, (row, col))
+            skills.append(skill)
+    return skills
+
+
+def extract_with_layout(sheet_name, grid, layout):
+    """Liest einen Charakter ausschließlich über die Adressen der Vorlage"""
+    char = {
+        'name': '',
+        # Blatt-Suffixe und Schreibweisen laut character_aliases.json ('JJ__V2' -> 'JJ', 'Korbi_V2' -> 'Kobi')
+        'playerName': default_aliases().display_player(sheet_name),
+        'class': '',
+        'race': '',
+        'level': '',
+        'attributes': {},
+        'inventory': [],
+    }
+    for key, pos in layout['fields'].items():
+        value = _text(grid, pos)
+        if value:
+            char[key] = value
+
+    for attr_name, pos in layout['attributes'].items():
+        dice_value = convert_w_to_d(_text(grid, pos))
+        if re.match(r'^\d+D(\+\d+)?$', dice_value):
+            char['attributes'][attr_name] = dice_value
+
+    char['skills'] = extract_skills(grid, layout)
+    char['layout'] = layout['name']
+    return char
+
+
+def read_characters_with_layouts(filepath, layouts=None):
+    """Liest alle Charakterblätter, für die eine Vorlage passt"""
+    if layouts is None:
+        layouts = load_layouts()
+    workbook = read_workbook(filepath)
+    characters = []
+    for sheet_name, grid in workbook.items():
+        layout = match_layout(grid, layouts)
+        if layout is None:
+            continue
+        char = extract_with_layout(sheet_name, grid, layout)
+        char['sheet'] = sheet_name
+        characters.append(char)
+    return characters
+
+
+if __name__ == "__main__":
+    filepath = sys.argv[1] if len(sys.argv) > 1 else "P&P V2 22_05_2021.ods"
+    characters = read_characters_with_layouts(filepath)
+
+    print(f"Gefundene Charakterblätter: {len(characters)}\n")
+
+    for char in characters:
+        print(f"Blatt: {char['sheet']} (Layout: {char['layout']})")
+        print(f"Name: {char['name']}")
+        print(f"Spieler: {char['playerName']}")
+        print(f"Attribute: {char['attributes']}")
+        print(f"Fertigkeiten: {len(char['skills'])}")
+        print()
+
+    with open('characters_layout.json', 'w', encoding='utf-8') as f:
+        json.dump(characters, f, ensure_ascii=False, indent=2)
+
+    print("Charaktere in characters_layout.json gespeichert")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Inhaltsadressierter Speicher für Blätter aus archivierten Arbeitsmappen-Snapshots
+
+Jedes table:table wird über seine Rohbytes gehasht; Grid und Extraktion
+liegen genau einmal unter diesem Hash. Ein Snapshot ist nur noch ein
+Manifest {Blattname: Hash}.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from xml.sax.saxutils import unescape
+
+from ods_core import Cell, SheetGrid, iter_chunk_rows, is_workbook_file, open_content
+from layout_detect import get_region_map, load_cache, save_cache
+from sheet_layouts import compile_layout, extract_with_layout
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+STORE_DIR = '.sheet_store'
+
+_ROOT_RE = re.compile(rb'<(office:document(?:-content)?)\b[^>]*>')
+_TABLE_START_RE = re.compile(rb'<table:table[\s>]')
+_TABLE_END = b'</table:table>'
+_NAME_RE = re.compile(rb'table:name="([^"]*)"')
+
+
+def file_hash(filepath):
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_sheets(content, begin=0, limit=None):
+    """Liefert den Wurzel-Tag und [(Blattname, Rohbytes)] eines content.xml oder .fods
+
+    `content` darf auch eine mmap sein; gesucht wird nur in [begin, limit),
+    kopiert werden nur die Bytes der einzelnen Blätter.
+    """
+    if limit is None:
+        limit = len(content)
+    root = _ROOT_RE.search(content, begin, limit)
+    if root is None:
+        raise ValueError("Kein office:document-content gefunden")
+    sheets = []
+    pos = root.end()
+    while True:
+        start = _TABLE_START_RE.search(content, pos, limit)
+        if start is None:
+            break
+        end = content.find(_TABLE_END, start.start(), limit)
+        if end < 0:
+            raise ValueError("Nicht geschlossenes table:table")
+        end += len(_TABLE_END)
+        raw = content[start.start():end]
+        name = _NAME_RE.search(raw[:raw.find(b'>') + 1])
+        sheet_name = unescape(name.group(1).decode('utf-8'), {'&quot;': '"', '&apos;': "'"}) if name else ''
+        sheets.append((sheet_name, raw))
+        pos = end
+    return root.group(0), sheets
+
+
+def parse_sheet(root_tag, raw):
+    """Parst ein einzelnes Blatt; der Wurzel-Tag liefert die Namensraum-Deklarationen"""
+    closing = b'</' + _ROOT_RE.match(root_tag).group(1) + b'>'
+    chunks = (root_tag, raw, closing)
+    grid = SheetGrid()
+    for _, row_idx, cells in iter_chunk_rows(chunks):
+        grid.add_row(row_idx, cells)
+    return grid
+
+
+def extract_sheet(sheet_name, grid, region_cache, compiled):
+    fingerprint, region_map, _ = get_region_map(grid, region_cache)
+    if region_map is None:
+        return None
+    if fingerprint not in compiled:
+        compiled[fingerprint] = compile_layout(fingerprint[:12], region_map)
+    char = extract_with_layout(sheet_name, grid, compiled[fingerprint])
+    char['sheet'] = sheet_name
+    return char
+
+
+class SheetStore:
+    """objects/<ab>/<hash>.json.gz enthält Grid und Extraktion, manifests/ die Snapshots"""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.manifests_dir = os.path.join(directory, 'manifests')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        self.region_cache = load_cache(os.path.join(directory, 'layout_cache.json'))
+        self.compiled = {}
+        self.stats = {'parsed': 0, 'reused': 0, 'snapshots_skipped': 0}
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest + '.json.gz')
+
+    def _write_atomic(self, filepath, data, compress=False):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        tmp_path = filepath + '.tmp'
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        with open(tmp_path, 'wb') as f:
+            f.write(gzip.compress(payload) if compress else payload)
+        os.replace(tmp_path, filepath)
+
+    def has(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    def load_object(self, digest):
+        with gzip.open(self._object_path(digest), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_grid(self, digest):
+        return SheetGrid(((row, col), Cell(text, value_type, value, formula))
+                         for row, col, text, value_type, value, formula in self.load_object(digest)['cells'])
+
+    def put_sheet(self, sheet_name, root_tag, raw):
+        """Speichert ein Blatt, falls sein Hash noch unbekannt ist; liefert den Hash"""
+        digest = hashlib.sha1(raw).hexdigest()
+        if self.has(digest):
+            self.stats['reused'] += 1
+            return digest
+        grid = parse_sheet(root_tag, raw)
+        cells = [[row, col] + list(cell) for (row, col), cell in sorted(grid.items())]
+        self._write_atomic(self._object_path(digest), {
+            'name': sheet_name,
+            'cells': cells,
+            'character': extract_sheet(sheet_name, grid, self.region_cache, self.compiled),
+        }, compress=True)
+        self.stats['parsed'] += 1
+        return digest
+
+    def _manifest_path(self, snapshot_hash):
+        return os.path.join(self.manifests_dir, snapshot_hash + '.json')
+
+    def add_snapshot(self, filepath):
+        """Legt das Manifest eines Snapshots an; bekannte Dateien werden gar nicht geöffnet"""
+        snapshot_hash = file_hash(filepath)
+        manifest_path = self._manifest_path(snapshot_hash)
+        if os.path.exists(manifest_path):
+            self.stats['snapshots_skipped'] += 1
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        with open_content(filepath) as (content, begin, limit):
+            root_tag, sheets = split_sheets(content, begin, limit)
+        manifest = {
+            'file': os.path.basename(filepath),
+            'hash': snapshot_hash,
+            'sheets': [[name, self.put_sheet(name, root_tag, raw)] for name, raw in sheets],
+        }
+        self._write_atomic(manifest_path, manifest)
+        return manifest
+
+    def characters(self, manifest):
+        """Extrahierte Charaktere eines Snapshots aus den gespeicherten Objekten"""
+        return [obj['character'] for obj in (self.load_object(digest) for _, digest in manifest['sheets'])
+                if obj['character'] is not None]
+
+    def close(self):
+        save_cache(self.region_cache, os.path.join(self.directory, 'layout_cache.json'))
+
+
+def archive_files(directory):
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if is_workbook_file(name):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+if __name__ == "__main__":
+    archive = sys.argv[1] if len(sys.argv) > 1 else "FM"
+    store = SheetStore()
+    results = {}
+    try:
+        for filepath in archive_files(archive):
+            manifest = store.add_snapshot(filepath)
+            results[filepath] = store.characters(manifest)
+            print(f"{filepath}: {len(manifest['sheets'])} Blätter, {len(results[filepath])} Charaktere")
+    finally:
+        store.close()
+
+    print(f"\nNeu geparste Blätter: {store.stats['parsed']}, "
+          f"wiederverwendet: {store.stats['reused']}, "
+          f"unveränderte Snapshots: {store.stats['snapshots_skipped']}")
+
+    with open('archive_characters.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("Daten in archive_characters.json gespeichert")
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Exportiert alle extrahierten Spieldaten in eine indizierte SQLite-Datenbank"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from dice_codes import d6_to_blips
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+DATABASE_FILE = 'game_data.sqlite'
+
+# Quelle -> Art der Daten
+DEFAULT_SOURCES = [
+    ('characters_final.json', 'characters'),
+    ('characters_layout.json', 'characters'),
+    ('skills_structure.json', 'skills'),
+    ('standard_enemies.json', 'enemies'),
+    ('fallcrest_bestiary.json', 'enemies'),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+  path TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  hash TEXT NOT NULL,
+  rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS characters (
+  id INTEGER PRIMARY KEY,
+  source TEXT NOT NULL,
+  sheet TEXT,
+  name TEXT,
+  player_name TEXT,
+  class_name TEXT,
+  race TEXT,
+  level INTEGER
+);
+CREATE TABLE IF NOT EXISTS character_attributes (
+  character_id INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
+  attribute TEXT NOT NULL,
+  code TEXT NOT NULL,
+  blips INTEGER
+);
+CREATE TABLE IF NOT EXISTS character_skills (
+  character_id INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
+  skill TEXT NOT NULL,
+  attribute TEXT,
+  base_code TEXT,
+  base_blips INTEGER,
+  bonus INTEGER,
+  total_code TEXT,
+  total_blips INTEGER,
+  sheet_row INTEGER
+);
+CREATE TABLE IF NOT EXISTS skills (
+  id INTEGER PRIMARY KEY,
+  source TEXT NOT NULL,
+  skill TEXT NOT NULL,
+  attribute TEXT,
+  base_code TEXT,
+  base_blips INTEGER,
+  bonus INTEGER,
+  total_code TEXT,
+  total_blips INTEGER,
+  sheet_row INTEGER
+);
+CREATE TABLE IF NOT EXISTS enemies (
+  id INTEGER PRIMARY KEY,
+  source TEXT NOT NULL,
+  name TEXT NOT NULL,
+  type TEXT,
+  race TEXT,
+  level INTEGER,
+  max_hp INTEGER,
+  special TEXT,
+  description TEXT
+);
+CREATE TABLE IF NOT EXISTS enemy_attributes (
+  enemy_id INTEGER NOT NULL REFERENCES enemies(id) ON DELETE CASCADE,
+  attribute TEXT NOT NULL,
+  code TEXT NOT NULL,
+  blips INTEGER
+);
+CREATE TABLE IF NOT EXISTS enemy_skills (
+  enemy_id INTEGER NOT NULL REFERENCES enemies(id) ON DELETE CASCADE,
+  skill TEXT NOT NULL,
+  attribute TEXT,
+  bonus_dice INTEGER,
+  bonus_blips INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_characters_name ON characters(name);
+CREATE INDEX IF NOT EXISTS idx_characters_source ON characters(source);
+CREATE INDEX IF NOT EXISTS idx_character_attributes_attr ON character_attributes(attribute, blips);
+CREATE INDEX IF NOT EXISTS idx_character_attributes_char ON character_attributes(character_id);
+CREATE INDEX IF NOT EXISTS idx_character_skills_skill ON character_skills(skill, bonus);
+CREATE INDEX IF NOT EXISTS idx_character_skills_char ON character_skills(character_id);
+CREATE INDEX IF NOT EXISTS idx_skills_skill ON skills(skill);
+CREATE INDEX IF NOT EXISTS idx_skills_attribute ON skills(attribute);
+CREATE INDEX IF NOT EXISTS idx_skills_source ON skills(source);
+CREATE INDEX IF NOT EXISTS idx_enemies_name ON enemies(name);
+CREATE INDEX IF NOT EXISTS idx_enemies_source ON enemies(source);
+CREATE INDEX IF NOT EXISTS idx_enemy_attributes_attr ON enemy_attributes(attribute, blips);
+CREATE INDEX IF NOT EXISTS idx_enemy_attributes_enemy ON enemy_attributes(enemy_id);
+CREATE INDEX IF NOT EXISTS idx_enemy_skills_skill ON enemy_skills(skill);
+CREATE INDEX IF NOT EXISTS idx_enemy_skills_enemy ON enemy_skills(enemy_id);
+"""
+
+
+def file_hash(filepath):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def connect(db_path=DATABASE_FILE):
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _next_id(conn, table):
+    return (conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+
+def insert_characters(conn, source, characters):
+    next_id = _next_id(conn, 'characters')
+    parents, attributes, skills = [], [], []
+    for char in characters:
+        char_id = next_id
+        next_id += 1
+        parents.append((char_id, source, char.get('sheet'), char.get('name'), char.get('playerName'),
+                        char.get('class'), char.get('race'), to_int(char.get('level'))))
+        for attr, code in (char.get('attributes') or {}).items():
+            attributes.append((char_id, attr, code, d6_to_blips(code)))
+        for skill in char.get('skills') or []:
+            skills.append((char_id, skill.get('name'), skill.get('attribute'),
+                           skill.get('base'), d6_to_blips(skill.get('base')), to_int(skill.get('bonus')),
+                           skill.get('total'), d6_to_blips(skill.get('total')), skill.get('row')))
+    conn.executemany("INSERT INTO characters VALUES (?, ?, ?, ?, ?, ?, ?, ?)", parents)
+    conn.executemany("INSERT INTO character_attributes VALUES (?, ?, ?, ?)", attributes)
+    conn.executemany("INSERT INTO character_skills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", skills)
+    return len(parents)
+
+
+def insert_skills(conn, source, structure):
+    next_id = _next_id(conn, 'skills')
+    rows = []
+    for offset, skill in enumerate(structure.get('skills', [])):
+        rows.append((next_id + offset, source, skill.get('name'), skill.get('attribute'),
+                     skill.get('base'), d6_to_blips(skill.get('base')), to_int(skill.get('bonus')),
+                     skill.get('total'), d6_to_blips(skill.get('total')), skill.get('row')))
+    conn.executemany("INSERT INTO skills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def insert_enemies(conn, source, enemies):
+    """Nimmt beide Formate an: standard_enemies.json (attributes/skills) und fallcrest_bestiary.json (stats)"""
+    next_id = _next_id(conn, 'enemies')
+    parents, attributes, skills = [], [], []
+    for enemy in enemies:
+        enemy_id = next_id
+        next_id += 1
+        parents.append((enemy_id, source, enemy.get('name'), enemy.get('type'), enemy.get('race'),
+                        to_int(enemy.get('level')), to_int(enemy.get('maxHP')), enemy.get('special'),
+                        enemy.get('description') or enemy.get('desc')))
+        for attr, code in (enemy.get('attributes') or enemy.get('stats') or {}).items():
+            attributes.append((enemy_id, attr, code, d6_to_blips(code)))
+        for skill in enemy.get('skills') or []:
+            bonus_dice = to_int(skill.get('bonusDice'))
+            skills.append((enemy_id, skill.get('name'), skill.get('attribute'), bonus_dice,
+                           bonus_dice * 3 if bonus_dice is not None else None))
+    conn.executemany("INSERT INTO enemies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", parents)
+    conn.executemany("INSERT INTO enemy_attributes VALUES (?, ?, ?, ?)", attributes)
+    conn.executemany("INSERT INTO enemy_skills VALUES (?, ?, ?, ?, ?)", skills)
+    return len(parents)
+
+
+INSERTERS = {
+    'characters': ('characters', insert_characters),
+    'skills': ('skills', insert_skills),
+    'enemies': ('enemies', insert_enemies),
+}
+
+
+def export(sources=DEFAULT_SOURCES, db_path=DATABASE_FILE):
+    """Aktualisiert nur Quellen, deren Hash sich geändert hat - alles in einer Transaktion"""
+    conn = connect(db_path)
+    known = {path: digest for path, digest in conn.execute("SELECT path, hash FROM sources")}
+    report = []
+    try:
+        with conn:
+            for path, kind in sources:
+                table, inserter = INSERTERS[kind]
+                if not os.path.exists(path):
+                    if path in known:
+                        conn.execute(f"DELETE FROM {table} WHERE source = ?", (path,))
+                        conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+                        report.append((path, 'entfernt', 0))
+                    continue
+                digest = file_hash(path)
+                if known.get(path) == digest:
+                    report.append((path, 'unverändert', None))
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                conn.execute(f"DELETE FROM {table} WHERE source = ?", (path,))
+                count = inserter(conn, path, data)
+                conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)", (path, kind, digest, count))
+                report.append((path, 'aktualisiert', count))
+    finally:
+        conn.close()
+    return report
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DATABASE_FILE
+    for path, status, count in export(db_path=db_path):
+        suffix = f" ({count} Einträge)" if count is not None else ''
+        print(f"{path}: {status}{suffix}")
+    print(f"\nDaten in {db_path} gespeichert")
+    print("Beispiel: SELECT e.name FROM enemies e JOIN enemy_attributes a ON a.enemy_id = e.id "
+          "WHERE a.attribute = 'Stärke' AND a.blips >= 9")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Synchronisiert extrahierte Charaktere und Fertigkeiten per Diff nach Supabase"""
+import hashlib
+import http.client
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit, quote
+
+from character_aliases import normalize_key
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+SNAPSHOT_FILE = '.sync_snapshot.json'
+BATCH_SIZE = 100
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Tabelle -> Spalten des UNIQUE-Constraints (on_conflict)
+CONFLICT_COLUMNS = {
+    'characters': ['group_id', 'player_name', 'name'],
+    'rulebook_skills': ['name', 'attribute'],
+}
+
+
+def character_rows(characters, group_id):
+    """Formt characters_final.json in Zeilen der Tabelle characters um"""
+    rows = []
+    for char in characters:
+        player_name = char.get('playerName')
+        if not player_name:
+            continue
+        level = str(char.get('level') or '').strip()
+        rows.append({
+            'group_id': group_id,
+            'name': char.get('name') or '',
+            'player_name': player_name,
+            'class_name': char.get('class') or None,
+            'race': char.get('race') or None,
+            'level': int(level) if level.isdigit() else 1,
+            'attributes': char.get('attributes') or {},
+            'skills': char.get('skills') or [],
+            'inventory': char.get('inventory') or [],
+        })
+    return rows
+
+
+def rulebook_rows(skills_structure, descriptions):
+    """Formt skills_structure.json + Beschreibungen in Zeilen von rulebook_skills um
+
+    Entspricht dem Import in app/api/rulebook/import-default: nur Fertigkeiten
+    mit Beschreibung, Platzhalter '…' werden übersprungen.
+    """
+    attribute_map = {}
+    for skill in skills_structure.get('skills', []):
+        name = str(skill.get('name') or '').strip()
+        attribute = str(skill.get('attribute') or '').strip()
+        if not name or not attribute or name == '…':
+            continue
+        attribute_map[normalize_key(name)] = attribute
+    rows = []
+    for name, description in descriptions.items():
+        attribute = attribute_map.get(normalize_key(name))
+        if not attribute:
+            continue
+        rows.append({
+            'name': str(name).strip(),
+            'attribute': attribute,
+            'description': str(description).strip(),
+            'source_group_id': None,
+            'source_player_name': 'Rule-Book-Master',
+        })
+    return rows
+
+
+def row_key(table, row):
+    return '|'.join(str(row.get(column)) for column in CONFLICT_COLUMNS[table])
+
+
+def row_hash(row):
+    return hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def diff_rows(table, rows, snapshot):
+    """Liefert nur neue oder geänderte Zeilen sowie die Schlüssel entfernter Zeilen
+
+    Doppelte Schlüssel werden zusammengefasst (die letzte Zeile gewinnt), da
+    PostgREST eine Zeile pro Upsert-Anfrage nur einmal ändern kann.
+    """
+    previous = snapshot.get(table, {})
+    latest = {}
+    for row in rows:
+        latest[row_key(table, row)] = row
+    changed = [row for key, row in latest.items() if previous.get(key) != row_hash(row)]
+    removed = [key for key in previous if key not in latest]
+    return changed, removed
+
+
+def load_snapshot(filepath=SNAPSHOT_FILE):
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_snapshot(snapshot, filepath=SNAPSHOT_FILE):
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+class RestSession:
+    """Keep-Alive-Verbindungspool für die PostgREST-API mit Retry und Backoff"""
+
+    def __init__(self, base_url, api_key, pool_size=4, timeout=30):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pool = []
+        self.requests_sent = 0
+
+    def _connect(self):
+        if self.pool:
+            return self.pool.pop()
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        if len(self.pool) < self.pool_size:
+            self.pool.append(conn)
+        else:
+            conn.close()
+
+    def request(self, method, path, payload=None, headers=None):
+        """Sendet eine Anfrage; wiederholt Netzwerkfehler und 429/5xx mit Backoff"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else None
+        all_headers = {
+            'apikey': self.api_key,
+            'Authorization': f"Bearer {self.api_key}",
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive',
+        }
+        all_headers.update(headers or {})
+        for attempt in range(MAX_RETRIES + 1):
+            conn = self._connect()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=all_headers)
+                response = conn.getresponse()
+                data = response.read()
+                self.requests_sent += 1
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._release(conn)
+                if response.status not in RETRY_STATUS:
+                    return response.status, data
+                error = f"HTTP {response.status}"
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                error = str(e)
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"{method} {path} fehlgeschlagen nach {attempt + 1} Versuchen: {error}")
+            delay = BACKOFF_BASE * (2 ** attempt) * (1 + random.random() * 0.25)
+            print(f"  Versuch {attempt + 1} fehlgeschlagen ({error}), warte {delay:.1f}s")
+            time.sleep(delay)
+
+    def upsert(self, table, rows):
+        conflict = ','.join(CONFLICT_COLUMNS[table])
+        status, data = self.request(
+            'POST', f"/rest/v1/{quote(table)}?on_conflict={conflict}", rows,
+            {'Prefer': 'resolution=merge-duplicates,return=minimal'})
+        if status >= 300:
+            raise RuntimeError(f"Upsert in {table} fehlgeschlagen: HTTP {status} {data[:200]!r}")
+
+    def close(self):
+        for conn in self.pool:
+            conn.close()
+        self.pool = []
+
+
+def sync_table(session, table, rows, snapshot, batch_size=BATCH_SIZE, snapshot_file=SNAPSHOT_FILE):
+    """Schickt nur geänderte Zeilen in Batches; der Snapshot wird nach jedem Batch fortgeschrieben"""
+    changed, removed = diff_rows(table, rows, snapshot)
+    table_snapshot = snapshot.setdefault(table, {})
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        session.upsert(table, batch)
+        for row in batch:
+            table_snapshot[row_key(table, row)] = row_hash(row)
+        save_snapshot(snapshot, snapshot_file)
+    return len(changed), removed
+
+
+def sync(base_url, api_key, group_id, characters, skills_structure, descriptions,
+         snapshot_file=SNAPSHOT_FILE, batch_size=BATCH_SIZE):
+    """Ohne group_id wird characters übersprungen
+
+    NULL-Werte kollidieren in UNIQUE(group_id, player_name, name) nie; jeder
+    geänderte Charakter würde sonst als weitere Zeile eingefügt.
+    """
+    snapshot = load_snapshot(snapshot_file)
+    session = RestSession(base_url, api_key)
+    tables = [('rulebook_skills', rulebook_rows(skills_structure, descriptions))]
+    if group_id:
+        tables.insert(0, ('characters', character_rows(characters, group_id)))
+    results = {}
+    try:
+        for table, rows in tables:
+            results[table] = (len(rows),) + sync_table(session, table, rows, snapshot,
+                                                       batch_size, snapshot_file)
+    finally:
+        session.close()
+    return results, session.requests_sent
+
+
+def load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    base_url = os.environ.get('NEXT_PUBLIC_SUPABASE_URL')
+    api_key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+    group_id = os.environ.get('SYNC_GROUP_ID') or None
+    snapshot_file = SNAPSHOT_FILE
+    stub = None
+
+    if '--stub' in sys.argv:
+        from postgrest_stub import start_stub
+        stub, _, base_url = start_stub()
+        api_key = 'stub'
+        snapshot_file = '.sync_snapshot.stub.json'
+        print(f"Verwende lokalen PostgREST-Stub auf {base_url}")
+
+    if not base_url or not api_key:
+        print("Fehler: NEXT_PUBLIC_SUPABASE_URL und SUPABASE_SERVICE_ROLE_KEY fehlen (oder --stub verwenden)")
+        sys.exit(1)
+
+    characters = load_json('characters_final.json')
+    skills_structure = load_json('skills_structure.json')
+    descriptions = load_json(os.path.join('Extern', 'skill_descriptions.json')).get('descriptions', {})
+
+    if not group_id:
+        print("Warnung: SYNC_GROUP_ID fehlt - Tabelle characters wird übersprungen")
+
+    results, requests_sent = sync(base_url, api_key, group_id, characters, skills_structure, descriptions,
+                                  snapshot_file)
+    for table, (total, sent, removed) in results.items():
+        print(f"{table}: {sent} von {total} Zeilen übertragen")
+        if removed:
+            print(f"  {len(removed)} Zeilen fehlen in der neuen Extraktion (nicht gelöscht): {', '.join(removed[:5])}")
+    print(f"HTTP-Anfragen: {requests_sent}")
+
+    if stub is not None:
+        stub.shutdown()
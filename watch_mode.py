@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Beobachtet einen Ordner mit .ods-Dateien und extrahiert nach jedem Speichern neu"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from ods_core import read_workbook, grid_rows, is_workbook_file, sheet_hash, READ_ERRORS
+from layout_detect import get_region_map, load_cache, save_cache
+from sheet_layouts import compile_layout, extract_with_layout
+from extract_gesinnung_full import build_gesinnung, gesinnung_result
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+POLL_INTERVAL = 0.1
+# LibreOffice schreibt eine Temp-Datei und benennt sie dann um; erst wenn
+# Größe und mtime so lange stabil sind, wird die Datei gelesen.
+DEBOUNCE_SECONDS = 0.3
+
+
+def write_json_atomic(filepath, data):
+    """Schreibt JSON in eine eigene Temp-Datei und ersetzt das Ziel atomar"""
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(filepath) + '.',
+                                    suffix='.tmp', dir=os.path.dirname(filepath) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class CharacterExtractor:
+    """Charakterblätter über erkannte Bereichskarten, inkrementell pro Blatt"""
+    name = 'characters'
+    output = 'characters_layout.json'
+
+    def __init__(self):
+        self.region_cache = load_cache()
+        self.compiled = {}
+        self.results = {}
+
+    def affected(self, changed_sheets):
+        return bool(changed_sheets)
+
+    def update(self, workbook_name, path, workbook, changed_sheets, removed_sheets):
+        for sheet_name in removed_sheets:
+            self.results.pop((workbook_name, sheet_name), None)
+        for sheet_name in changed_sheets:
+            grid = workbook[sheet_name]
+            fingerprint, region_map, _ = get_region_map(grid, self.region_cache)
+            if region_map is None:
+                self.results.pop((workbook_name, sheet_name), None)
+                continue
+            if fingerprint not in self.compiled:
+                self.compiled[fingerprint] = compile_layout(fingerprint[:12], region_map)
+            char = extract_with_layout(sheet_name, grid, self.compiled[fingerprint])
+            char['sheet'] = sheet_name
+            char['workbook'] = workbook_name
+            self.results[(workbook_name, sheet_name)] = char
+        save_cache(self.region_cache)
+
+    def forget(self, workbook_name):
+        """Entfernt die Charaktere einer gelöschten Mappe; True, wenn es welche gab"""
+        keys = [key for key in self.results if key[0] == workbook_name]
+        for key in keys:
+            del self.results[key]
+        return bool(keys)
+
+    def data(self):
+        return [self.results[key] for key in sorted(self.results)]
+
+
+class GesinnungExtractor:
+    """Gesinnungs-Quadrat aus dem Blatt 'Gesinnung'"""
+    name = 'gesinnung'
+    output = 'gesinnungen.json'
+    sheet = 'Gesinnung'
+
+    def __init__(self):
+        self.result = None
+        self.source = None
+
+    def affected(self, changed_sheets):
+        return self.sheet in changed_sheets
+
+    def update(self, workbook_name, path, workbook, changed_sheets, removed_sheets):
+        if self.sheet not in workbook:
+            # Blatt entfernt: das alte Quadrat nicht erneut ausschreiben
+            if self.sheet in removed_sheets:
+                self.forget(workbook_name)
+            return
+        # Das Quadrat besteht aus verbundenen Zellen; die Spalten werden wie im
+        # alten Skript ohne verdeckte Zellen gezählt. Aus `workbook` lässt sich
+        # das nicht ableiten: Cell kennt keine Spannweite, und eine verdeckte
+        # Zelle ist dort von einer leeren nicht zu unterscheiden. Der zweite
+        # Lesedurchgang läuft nur, wenn sich das Blatt 'Gesinnung' geändert hat.
+        grid = read_workbook(path, [self.sheet], legacy_columns=True)[self.sheet]
+        rows = grid_rows(grid, 3)
+        all_data = {row_idx: row for row_idx, row in enumerate(rows) if any(row)}
+        gesinnungen, descriptions = build_gesinnung(all_data, len(rows))
+        self.result = gesinnung_result(gesinnungen, descriptions)
+        self.source = workbook_name
+
+    def forget(self, workbook_name):
+        # Die Ausgabedatei bleibt stehen, bis eine andere Mappe ein Quadrat liefert
+        if self.source == workbook_name:
+            self.result = self.source = None
+        return False
+
+    def data(self):
+        return self.result
+
+
+class WorkbookWatcher:
+    def __init__(self, directory, output_dir='.', extractors=None):
+        self.directory = directory
+        self.output_dir = output_dir
+        self.extractors = extractors if extractors is not None else [CharacterExtractor(), GesinnungExtractor()]
+        self.file_stats = {}
+        self.pending = {}
+        self.sheet_hashes = {}
+        self.busy = set()
+        # Extraktoren und Cache sind nicht threadsicher: immer nur eine Mappe zugleich
+        self.lock = asyncio.Lock()
+
+    def scan(self):
+        """Liefert {Pfad: (mtime_ns, Größe)} aller .ods-Dateien (ohne Lock-Dateien)"""
+        stats = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return stats
+        for entry in entries:
+            if not is_workbook_file(entry.name):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            stats[entry.path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def process(self, path):
+        """Liest eine Arbeitsmappe und führt nur die betroffenen Extraktoren aus"""
+        workbook_name = os.path.basename(path)
+        started = time.perf_counter()
+        if not os.path.exists(path):
+            self.sheet_hashes.pop(workbook_name, None)
+            updated = self.write_outputs([extractor for extractor in self.extractors
+                                          if extractor.forget(workbook_name)])
+            print(f"{workbook_name}: gelöscht, aktualisiert: {', '.join(updated) or '-'}")
+            return workbook_name, [], updated
+        if path.lower().endswith('.ods') and not zipfile.is_zipfile(path):
+            # Noch mitten im Schreiben - beim nächsten stabilen Stand erneut versuchen
+            raise zipfile.BadZipFile(f"{workbook_name} ist (noch) kein gültiges ZIP")
+
+        workbook = read_workbook(path)
+        old_hashes = self.sheet_hashes.get(workbook_name, {})
+        new_hashes = {name: sheet_hash(grid) for name, grid in workbook.items()}
+        changed = [name for name, digest in new_hashes.items() if old_hashes.get(name) != digest]
+        removed = [name for name in old_hashes if name not in new_hashes]
+        self.sheet_hashes[workbook_name] = new_hashes
+
+        affected = [extractor for extractor in self.extractors
+                    if extractor.affected(set(changed) | set(removed))]
+        for extractor in affected:
+            extractor.update(workbook_name, path, workbook, changed, removed)
+        updated = self.write_outputs(affected)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{workbook_name}: {len(changed)} geänderte Blätter, "
+              f"aktualisiert: {', '.join(updated) or '-'} ({elapsed:.0f} ms)")
+        return workbook_name, changed, updated
+
+    def write_outputs(self, extractors):
+        updated = []
+        for extractor in extractors:
+            data = extractor.data()
+            if data is not None:
+                write_json_atomic(os.path.join(self.output_dir, extractor.output), data)
+                updated.append(extractor.name)
+        return updated
+
+    async def handle(self, path):
+        self.busy.add(path)
+        try:
+            async with self.lock:
+                await asyncio.to_thread(self.process, path)
+        except READ_ERRORS as e:
+            # Kein erneuter Versuch auf Verdacht: erst wenn sich mtime oder Größe
+            # ändern, stellt run() die Datei wieder in die Warteschlange
+            print(f"Überspringe {os.path.basename(path)}: {e}")
+        finally:
+            self.busy.discard(path)
+
+    async def run(self, stop_event=None):
+        """Pollt den Ordner und verarbeitet Dateien, sobald sie stabil sind"""
+        self.file_stats = self.scan()
+        for path in self.file_stats:
+            await self.handle(path)
+        tasks = set()
+        while stop_event is None or not stop_event.is_set():
+            await asyncio.sleep(POLL_INTERVAL)
+            now = time.monotonic()
+            stats = self.scan()
+            for path in set(stats) | set(self.file_stats):
+                if stats.get(path) != self.file_stats.get(path):
+                    self.pending[path] = now
+            self.file_stats = stats
+            for path, changed_at in list(self.pending.items()):
+                if now - changed_at < DEBOUNCE_SECONDS or path in self.busy:
+                    continue
+                del self.pending[path]
+                task = asyncio.create_task(self.handle(path))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "FM"
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "."
+    print(f"Beobachte {directory} (Ausgabe nach {output_dir}) - Abbruch mit Strg+C")
+    try:
+        asyncio.run(WorkbookWatcher(directory, output_dir).run())
+    except KeyboardInterrupt:
+        print("\nBeobachtung beendet")
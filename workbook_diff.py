@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Zellgenauer Vergleich zweier Versionen einer Arbeitsmappe
+
+Blätter werden über den Namen zugeordnet, Zeilen über ihren Inhaltshash
+(LCS), damit eingefügte Zeilen nicht alle folgenden als geändert melden.
+"""
+import difflib
+import hashlib
+import json
+import sys
+
+from ods_core import iter_rows, format_address, read_workbook
+
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+# Größere Mittelstücke (Zeilen alt x neu) werden mit difflib statt exakter LCS ausgerichtet
+LCS_LIMIT = 1000000
+
+
+def row_hash(cells):
+    return hashlib.sha1(repr(sorted(cells.items())).encode('utf-8')).digest()
+
+
+def read_sheet_rows(filepath):
+    """{Blatt: [(Zeile, Hash, {Spalte: Cell})]} direkt aus dem Zeilenstrom"""
+    sheets = {}
+    for sheet_name, row_idx, cells in iter_rows(filepath):
+        sheets.setdefault(sheet_name, []).append((row_idx, row_hash(cells), cells))
+    return sheets
+
+
+def lcs_pairs(old_hashes, new_hashes):
+    """Liefert die Indexpaare (alt, neu) der längsten gemeinsamen Teilfolge"""
+    prefix = 0
+    while prefix < min(len(old_hashes), len(new_hashes)) and old_hashes[prefix] == new_hashes[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < min(len(old_hashes), len(new_hashes)) - prefix
+           and old_hashes[-1 - suffix] == new_hashes[-1 - suffix]):
+        suffix += 1
+    pairs = [(i, i) for i in range(prefix)]
+    old_mid = old_hashes[prefix:len(old_hashes) - suffix]
+    new_mid = new_hashes[prefix:len(new_hashes) - suffix]
+
+    if old_mid and new_mid:
+        if len(old_mid) * len(new_mid) <= LCS_LIMIT:
+            # Klassische DP-Tabelle, nur über das geänderte Mittelstück
+            lengths = [[0] * (len(new_mid) + 1) for _ in range(len(old_mid) + 1)]
+            for i in range(len(old_mid) - 1, -1, -1):
+                for j in range(len(new_mid) - 1, -1, -1):
+                    if old_mid[i] == new_mid[j]:
+                        lengths[i][j] = lengths[i + 1][j + 1] + 1
+                    else:
+                        lengths[i][j] = max(lengths[i + 1][j], lengths[i][j + 1])
+            i = j = 0
+            while i < len(old_mid) and j < len(new_mid):
+                if old_mid[i] == new_mid[j]:
+                    pairs.append((prefix + i, prefix + j))
+                    i += 1
+                    j += 1
+                elif lengths[i + 1][j] >= lengths[i][j + 1]:
+                    i += 1
+                else:
+                    j += 1
+        else:
+            matcher = difflib.SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+            for block in matcher.get_matching_blocks():
+                pairs.extend((prefix + block.a + k, prefix + block.b + k) for k in range(block.size))
+
+    pairs.extend((len(old_hashes) - suffix + k, len(new_hashes) - suffix + k) for k in range(suffix))
+    return pairs
+
+
+def diff_cells(sheet, old_row, old_cells, new_row, new_cells):
+    changes = []
+    for col in sorted(set(old_cells) | set(new_cells)):
+        old_cell = old_cells.get(col)
+        new_cell = new_cells.get(col)
+        if old_cell == new_cell:
+            continue
+        changes.append({
+            'sheet': sheet,
+            'old_address': format_address(old_row, col) if old_row is not None else None,
+            'address': format_address(new_row, col) if new_row is not None else None,
+            'old': old_cell.text if old_cell else None,
+            'new': new_cell.text if new_cell else None,
+            'old_formula': old_cell.formula if old_cell else '',
+            'new_formula': new_cell.formula if new_cell else '',
+        })
+    return changes
+
+
+def diff_sheet(sheet, old_rows, new_rows):
+    """Vergleicht zwei Blätter; Zeilen zwischen zwei LCS-Treffern werden paarweise verglichen"""
+    pairs = lcs_pairs([h for _, h, _ in old_rows], [h for _, h, _ in new_rows])
+    changes = []
+    moved = 0
+    old_pos = new_pos = 0
+    for old_idx, new_idx in pairs + [(len(old_rows), len(new_rows))]:
+        old_gap = old_rows[old_pos:old_idx]
+        new_gap = new_rows[new_pos:new_idx]
+        for k in range(max(len(old_gap), len(new_gap))):
+            old_row, _, old_cells = old_gap[k] if k < len(old_gap) else (None, None, {})
+            new_row, _, new_cells = new_gap[k] if k < len(new_gap) else (None, None, {})
+            changes.extend(diff_cells(sheet, old_row, old_cells, new_row, new_cells))
+        if old_idx < len(old_rows) and old_rows[old_idx][0] != new_rows[new_idx][0]:
+            moved += 1
+        old_pos, new_pos = old_idx + 1, new_idx + 1
+    return changes, moved
+
+
+def diff_workbooks(old_path, new_path):
+    old_sheets = read_sheet_rows(old_path)
+    new_sheets = read_sheet_rows(new_path)
+    result = {
+        'added_sheets': [name for name in new_sheets if name not in old_sheets],
+        'removed_sheets': [name for name in old_sheets if name not in new_sheets],
+        'moved_rows': {},
+        'changes': [],
+    }
+    for sheet in new_sheets:
+        if sheet not in old_sheets:
+            continue
+        changes, moved = diff_sheet(sheet, old_sheets[sheet], new_sheets[sheet])
+        result['changes'].extend(changes)
+        if moved:
+            result['moved_rows'][sheet] = moved
+    return result
+
+
+def changed_sheets(diff):
+    """(geänderte, entfernte) Blätter - genau die Eingabe von extractor.update() in watch_mode"""
+    changed = list(diff['added_sheets'])
+    for change in diff['changes']:
+        if change['sheet'] not in changed:
+            changed.append(change['sheet'])
+    return changed, list(diff['removed_sheets'])
+
+
+def reextract(diff, workbook_name, new_path, extractors):
+    """Führt die Extraktoren nur für die laut Diff geänderten Blätter aus"""
+    changed, removed = changed_sheets(diff)
+    if not changed and not removed:
+        return []
+    workbook = read_workbook(new_path, changed)
+    updated = []
+    for extractor in extractors:
+        if extractor.affected(set(changed) | set(removed)):
+            extractor.update(workbook_name, new_path, workbook, changed, removed)
+            updated.append(extractor.name)
+    return updated
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Aufruf: python workbook_diff.py ALT.ods NEU.ods [--json]")
+        exit(1)
+    diff = diff_workbooks(sys.argv[1], sys.argv[2])
+
+    if '--json' in sys.argv:
+        changed, removed = changed_sheets(diff)
+        print(json.dumps({**diff, 'changed_sheets': changed}, ensure_ascii=False, indent=2))
+        exit(0)
+
+    for name in diff['added_sheets']:
+        print(f"+ Blatt {name}")
+    for name in diff['removed_sheets']:
+        print(f"- Blatt {name}")
+    for sheet, moved in diff['moved_rows'].items():
+        print(f"  {sheet}: {moved} unveränderte Zeilen verschoben")
+    for change in diff['changes']:
+        where = change['address'] or change['old_address']
+        if change['old_address'] and change['address'] and change['old_address'] != change['address']:
+            where = f"{change['address']} (vorher {change['old_address']})"
+        print(f"{change['sheet']}!{where}: {change['old']!r} -> {change['new']!r}")
+    print(f"\n{len(diff['changes'])} geänderte Zellen")